@@ -224,11 +224,65 @@ def get_bot_status(task_id):
         if os.path.exists(pid_path): os.remove(pid_path)
         return "stopped"
 
+# --- BROWSER POOL ---
+def get_pool_settings():
+    return load_config(config_path=os.path.join(scrapper_root, "config.yaml")).settings
+
+def ensure_browser_pool():
+    """Havuz açıksa ve servis çalışmıyorsa paylaşılan tarayıcı havuzunu başlatır."""
+    settings = get_pool_settings()
+    if not settings.browser_pool_enabled:
+        return False
+    pid_path = os.path.join(scrapper_root, "browser_pool.pid")
+    if os.path.exists(pid_path):
+        try:
+            with open(pid_path, "r") as f:
+                if psutil.pid_exists(int(f.read().strip())):
+                    return True
+        except Exception:
+            pass
+    log_path = os.path.join(scrapper_root, "browser_pool.log")
+    env = os.environ.copy()
+    env["PYTHONUTF8"] = "1"
+    env["PYTHONUNBUFFERED"] = "1"
+    out = open(log_path, "a", encoding="utf-8")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(scrapper_root, "cli.py"), "pool"],
+        cwd=scrapper_root,
+        stdout=out,
+        stderr=out,
+        env=env,
+        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
+    )
+    with open(pid_path, "w") as f:
+        f.write(str(process.pid))
+    # Botlar bağlanmadan önce servisin portu açması için kısa bekleme
+    time.sleep(3)
+    return True
+
+def fetch_browser_pool_stats():
+    """Havuz doluluk metriklerini döner; havuz kapalı veya ulaşılamıyorsa None."""
+    settings = get_pool_settings()
+    if not settings.browser_pool_enabled:
+        return None
+    import asyncio
+    from src.utils.browser_pool import pool_request
+    try:
+        return asyncio.run(pool_request({'command': 'stats'}, settings.browser_pool_host,
+                                        settings.browser_pool_port, timeout=2.0))
+    except Exception:
+        return None
+
 def start_bot(task_id, target_url, force=False):
     current_status = get_bot_status(task_id)
     if current_status == "running":
         return False, "Bu bot zaten çalışıyor."
     try:
+        try:
+            ensure_browser_pool()
+        except Exception as e:
+            # Havuz başlatılamazsa bot kendi tarayıcısını açar
+            print(f"Browser pool başlatılamadı: {e}")
         pid_file = f"bot_{task_id}.pid"
         pid_path = os.path.join(scrapper_root, pid_file)
         script_path = os.path.join(scrapper_root, "main.py")
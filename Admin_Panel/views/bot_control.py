@@ -16,7 +16,8 @@ from Admin_Panel.core.engine import (
     update_task_url, update_task_shift, update_task_active_status,
     seed_default_tasks, extract_keyword_from_url,
     fetch_all_task_stats, get_all_bot_statuses,
-    update_task_search_params # YENİLER
+    update_task_search_params, # YENİLER
+    fetch_browser_pool_stats
 )
 from Admin_Panel.styles.main_styles import apply_bot_card_styles
 
@@ -37,6 +38,7 @@ def render_bot_control():
         tasks = fetch_tasks()
         all_task_stats = fetch_all_task_stats()
         running_bot_ids = get_all_bot_statuses()
+        pool_stats = fetch_browser_pool_stats()
         
         # 3. PREPARE CONSTANTS (Moved here to be in scope)
         from datetime import time as dt_time
@@ -58,7 +60,12 @@ def render_bot_control():
         with c3:
             st.metric("AKTİF BOTLAR", stats.get("active_bots", 0), "Şu An Çalışan")
         with c4:
-            st.metric("SİSTEM DURUMU", "NORMAL", "Sunucu Yükü: %12") # Örnek statik veri
+            if pool_stats:
+                pool_memory = sum(b.get("memory_mb", 0) for b in pool_stats.get("browsers", []))
+                st.metric("TARAYICI HAVUZU", f"{pool_stats.get('active_leases', 0)}/{pool_stats.get('capacity', 0)}",
+                          f"%{pool_stats.get('utilisation', 0) * 100:.0f} Doluluk · {pool_memory:.0f} MB")
+            else:
+                st.metric("SİSTEM DURUMU", "NORMAL", "Sunucu Yükü: %12") # Örnek statik veri
         st.markdown('</div>', unsafe_allow_html=True)
 
         # --- TASKS ---
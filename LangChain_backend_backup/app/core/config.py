@@ -43,6 +43,54 @@ class Settings(BaseSettings):
     fal_base_url: str = "https://fal.run"
     fal_model_path: str = "fal-ai/flux/dev"
 
+    # AI HTTP istemcileri: paylaşılan bağlantı havuzu + sağlayıcı başına eşzamanlılık sınırı
+    ai_http_max_connections: int = 64
+    ai_http_max_keepalive: int = 32
+    openai_timeout: float = 45.0  # Vision işlemleri bazen uzun sürebilir
+    openai_max_concurrency: int = 16
+    tavily_base_url: str = "https://api.tavily.com"
+    tavily_timeout: float = 30.0
+    tavily_max_concurrency: int = 8
+    fal_timeout: float = 90.0
+    fal_max_concurrency: int = 4  # Aynı anda FAL'a gönderilen görsel isteği
+    fal_http2: bool = True
+    serpapi_timeout: float = 20.0  # Google Trends isteği başına
+    db_executor_workers: int = 4  # Semantik önbellek (pgvector) sorguları için ayrılmış thread sayısı
+
+    # Pazar araştırması aşama zaman aşımları (sn); süre dolarsa aşama kısmi/boş sonuçla devam eder
+    research_search_timeout: float = 35.0  # Tavily podyum + pazar aramaları
+    research_trends_timeout: float = 25.0  # SerpApi Google Trends
+    research_report_timeout: float = 90.0  # GPT-4o strateji raporu
+    research_visual_check_timeout: float = 10.0
+    research_visual_terms_timeout: float = 30.0
+    research_image_timeout: float = 120.0  # Madde başına piyasa görseli / AI çizim
+
+    # Önbellek - 1. katman: birebir anahtar LRU (süreç içi, TTL sn)
+    cache_max_entries: int = 512  # Katman başına
+    cache_trends_ttl: int = 6 * 3600  # get_google_trends(keyword, timeframe, geo)
+    cache_tavily_ttl: int = 3600  # Tavily sorguları
+    cache_intent_ttl: int = 600  # analyze_user_intent (mesaj + son geçmiş)
+    # Önbellek - 2. katman: semantik rapor önbelleği (pgvector)
+    semantic_cache_enabled: bool = True
+    semantic_cache_ttl_hours: int = 24
+    semantic_cache_max_distance: float = 0.08  # Cosine mesafesi (~0.92 benzerlik)
+    embedding_model: str = "text-embedding-3-small"
+
+    # Yerel niyet sınıflandırıcı (kurallar + TF-IDF lineer model); güven eşik altındaysa LLM'e gidilir
+    intent_local_enabled: bool = True
+    intent_local_threshold: float = 0.85
+    # Yerelde karar verilen mesajların bu oranı arka planda GPT-4o'ya da sorulur (gölge etiket; değerlendirme + eğitim)
+    intent_shadow_sample_rate: float = 0.05
+    intent_model_path: str = str(Path(__file__).resolve().parent.parent.parent / "data" / "intent_model.npz")
+    intent_log_path: str = str(Path(__file__).resolve().parent.parent.parent / "data" / "intent_log.jsonl")
+
+    # Misafir sohbet deposu (bellek içi LRU; GUEST_STORE_REDIS_URL verilirse worker'lar arası Redis)
+    guest_max_entries: int = 5000  # Toplam misafir; aşılırsa en uzun süredir pasif olan atılır
+    guest_max_conversations: int = 10  # Misafir başına sohbet
+    guest_max_messages: int = 100  # Sohbet başına mesaj (en eskiler atılır)
+    guest_ttl_minutes: int = 30
+    guest_store_redis_url: str = ""
+
     @property
     def allowed_origins(self) -> list[str]:
         """CORS için izin verilen origin'leri döndürür."""
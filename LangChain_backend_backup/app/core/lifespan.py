@@ -6,6 +6,9 @@ import logging
 from app.core.config import settings
 from app.core.database import setup_database
 from app.socket_manager import cleanup_old_guest_data
+from app.services.clients import close_ai_clients
+from app.services.executors import shutdown_executors
+from app.services.guest_store import guest_store
 
 logger = logging.getLogger(__name__)
 
@@ -27,4 +30,7 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown (gerekirse temizlik işlemleri buraya)
+    await close_ai_clients()
+    await guest_store.close()
+    shutdown_executors()
     logger.info("Application shutting down")
@@ -55,6 +55,10 @@ app.include_router(messages.router, prefix=api_prefix)
 from .routers.scraper import router as scraper_router
 app.include_router(scraper_router, prefix=api_prefix)
 
+# Cache Router
+from .routers.cache import router as cache_router
+app.include_router(cache_router, prefix=api_prefix)
+
 # Mount Static Files
 mount_static_files(app)
 
@@ -6,3 +6,4 @@ from .product import Product
 from .daily_metric import DailyMetric
 from .generated_design import GeneratedDesign
 from .sales_forecast import SalesForecast
+from .research_cache import ResearchReportCache
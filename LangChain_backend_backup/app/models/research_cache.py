@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Text, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from pgvector.sqlalchemy import Vector
+from .base import Base
+
+
+class ResearchReportCache(Base):
+    """
+    Semantik rapor önbelleği (2. katman).
+    Pazar araştırması sorusunun embedding'i ile üretilen yanıtı tutar;
+    yakın anlamlı sorular (cosine mesafesi eşik altında) bu kayıttan yanıtlanır.
+    """
+    __tablename__ = "research_report_cache"
+
+    id = Column(Integer, primary_key=True)
+    question = Column(Text, nullable=False)
+    embedding = Column(Vector(1536), nullable=False)  # text-embedding-3-small
+    # generate_ai_response çıktısı: content, image_urls, image_links
+    response = Column(JSONB, nullable=False)
+    hit_count = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        # HNSW: en yakın komşu araması için (cosine)
+        Index(
+            "ix_research_report_cache_embedding",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
@@ -0,0 +1,35 @@
+# app/routers/cache.py
+"""
+Önbellek yönetim endpoint'leri.
+- Katman başına isabet oranı metrikleri
+- Katman bazında temizleme (trends, tavily, intent, semantic veya all) - oturum açmış kullanıcı gerekir
+"""
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..dependencies import get_current_user
+from ..models import User
+from app.services.cache import CACHE_TIERS, cache_stats, invalidate_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/stats")
+def get_cache_stats():
+    """Katman başına boyut, isabet/ıska sayıları ve isabet oranı."""
+    return cache_stats()
+
+
+@router.delete("/{tier}")
+def clear_cache(tier: str, current_user: User = Depends(get_current_user)):
+    """
+    Verilen önbellek katmanını temizler. `all` tüm katmanları temizler.
+    semantic katmanı veritabanına gittiği için endpoint `def` (threadpool'da çalışır).
+    """
+    if tier != "all" and tier not in CACHE_TIERS:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen önbellek katmanı: {tier}")
+    removed = invalidate_cache(None if tier == "all" else tier)
+    logger.info(f"🧹 Önbellek temizlendi ({tier}, {removed} kayıt) - kullanıcı {current_user.id}")
+    return {"removed": removed}
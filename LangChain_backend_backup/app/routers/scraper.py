@@ -4,18 +4,34 @@ Scraper API endpoint'leri.
 - Task yönetimi
 - Veri gönderimi
 - Durum sorgulama
+
+Senkron Session kullanan endpoint'ler `def` olarak tanımlıdır; FastAPI bunları threadpool'da
+çalıştırır, böylece DB çağrıları Socket.IO sohbet akışının çalıştığı event loop'u bloklamaz.
+Gövdeyi akış halinde okuyan endpoint `async def` kalır ve DB işini run_in_threadpool ile yapar.
 """
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 
 from app.database import get_db
 from app.services.scraper_service import TrendyolScraperService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/scraper", tags=["Scraper"])
 
+# Streaming ingest: tek bir NDJSON satırı (ürün) için üst sınır
+MAX_NDJSON_LINE_BYTES = 1_000_000
+# Özet yanıtta detayı gösterilecek en fazla geçersiz satır
+MAX_REPORTED_INVALID = 20
+
 
 # ==================== SCHEMAS ====================
 
@@ -52,6 +68,7 @@ class IngestResponse(BaseModel):
     success: bool
     inserted: int
     updated: int
+    merged: int = 0
     errors: int
     message: str
 
@@ -83,7 +100,7 @@ class StatusResponse(BaseModel):
 # ==================== ENDPOINTS ====================
 
 @router.post("/ingest", response_model=IngestResponse)
-async def ingest_scraped_products(
+def ingest_scraped_products(
     request: IngestRequest,
     db: Session = Depends(get_db)
 ):
@@ -101,6 +118,7 @@ async def ingest_scraped_products(
             success=True,
             inserted=stats["inserted"],
             updated=stats["updated"],
+            merged=stats["merged"],
             errors=stats["errors"],
             message=f"Toplam {len(request.products)} ürün işlendi."
         )
@@ -109,8 +127,133 @@ async def ingest_scraped_products(
         raise HTTPException(status_code=500, detail=f"İşlem hatası: {str(e)}")
 
 
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+    """
+    İstek gövdesini geldikçe satırlara böler; (satır no, satır) döner.
+    Bellekte en fazla bir satır + bir ağ parçası tutulur. Sınırı aşan satır None olarak döner.
+    """
+    buffer = b""
+    line_no = 0
+    oversized = False
+    async for part in request.stream():
+        buffer += part
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            line_no += 1
+            yield line_no, (None if oversized else line)
+            oversized = False
+        if len(buffer) > MAX_NDJSON_LINE_BYTES:
+            # Satırın geri kalanı gelene kadar biriktirme; satır geçersiz sayılacak
+            buffer = b""
+            oversized = True
+    if buffer.strip() or oversized:
+        yield line_no + 1, (None if oversized else buffer)
+
+
+class _DuplexNDJSONResponse(StreamingResponse):
+    """
+    İstek gövdesini okurken yanıt akıtan generator için StreamingResponse.
+    Starlette'in disconnect dinleyicisi receive() üzerinden gövde parçalarını da tüketeceğinden çalıştırılmaz;
+    istemci koptuğunda generator'daki request.stream() ClientDisconnect fırlatır.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+@router.post("/ingest/stream")
+async def ingest_scraped_products_stream(
+    request: Request,
+    task_id: Optional[int] = None,
+    chunk_size: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Scraper sonuçlarını NDJSON (satır başına bir ürün) olarak akış halinde alır.
+    Gövde geldikçe satırlar doğrulanır ve `chunk_size`'lık parçalar halinde yazılır
+    (her parça ayrı commit); bellek kullanımı toplam ürün sayısından bağımsızdır.
+    Yanıt NDJSON'dır: her parça yazıldığı anda bir ilerleme satırı, en sonda özet satırı gönderilir.
+    Yükleme sırasında hata olursa son satır "error" tipindedir (önceki parçalar commit edilmiştir).
+    """
+    service = TrendyolScraperService(db)
+    totals = {"received": 0, "inserted": 0, "updated": 0, "merged": 0, "errors": 0, "invalid": 0}
+    invalid_lines = []
+    chunk: list[dict] = []
+    chunks = 0
+    
+    def reject(line_no: int, error: str):
+        totals["invalid"] += 1
+        if len(invalid_lines) < MAX_REPORTED_INVALID:
+            invalid_lines.append({"line": line_no, "error": error})
+    
+    def flush_chunk() -> dict:
+        nonlocal chunks
+        stats = service.process_scraped_batch(chunk, task_id)
+        for key in ("inserted", "updated", "merged", "errors"):
+            totals[key] += stats[key]
+        chunks += 1
+        progress = {"type": "progress", "chunk": chunks, "size": len(chunk), **stats}
+        logger.info(f"Streaming ingest parça {chunks}: {stats}")
+        chunk.clear()
+        return progress
+    
+    async def stream() -> AsyncIterator[str]:
+        try:
+            async for line_no, line in _iter_ndjson_lines(request):
+                if line is None:
+                    reject(line_no, "Satır çok uzun")
+                    continue
+                if not line.strip():
+                    continue
+                try:
+                    product = ScrapedProduct.model_validate_json(line)
+                except ValidationError as e:
+                    reject(line_no, e.errors(include_url=False)[0]["msg"])
+                    continue
+                totals["received"] += 1
+                chunk.append(product.model_dump())
+                if len(chunk) >= chunk_size:
+                    # Parça yazılırken event loop serbest kalır (gövde okuma + Socket.IO devam eder)
+                    yield json.dumps(await run_in_threadpool(flush_chunk)) + "\n"
+            if chunk:
+                yield json.dumps(await run_in_threadpool(flush_chunk)) + "\n"
+        except ClientDisconnect:
+            await run_in_threadpool(db.rollback)
+            logger.warning(f"Streaming ingest: istemci bağlantıyı kesti ({chunks} parça yazıldı)")
+            return
+        except Exception as e:
+            await run_in_threadpool(db.rollback)
+            logger.error(f"Streaming ingest hatası ({chunks} parça yazıldıktan sonra): {e}")
+            # Yanıt başladığından durum kodu değiştirilemez; hata son satırda bildirilir
+            yield json.dumps({
+                "type": "error",
+                "success": False,
+                "chunks": chunks,
+                **totals,
+                "message": f"İşlem hatası ({chunks} parça yazıldıktan sonra): {str(e)}"
+            }) + "\n"
+            return
+        
+        yield json.dumps({
+            "type": "summary",
+            "success": True,
+            "chunks": chunks,
+            **totals,
+            "invalid_lines": invalid_lines,
+            "message": f"Toplam {totals['received']} ürün işlendi."
+        }) + "\n"
+    
+    return _DuplexNDJSONResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/tasks", response_model=TaskResponse)
-async def create_scraping_task(
+def create_scraping_task(
     request: CreateTaskRequest,
     db: Session = Depends(get_db)
 ):
@@ -137,7 +280,7 @@ async def create_scraping_task(
 
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int, db: Session = Depends(get_db)):
+def get_task(task_id: int, db: Session = Depends(get_db)):
     """Görev detaylarını getirir."""
     service = TrendyolScraperService(db)
     task = service.get_task_by_id(task_id)
@@ -155,7 +298,7 @@ async def get_task(task_id: int, db: Session = Depends(get_db)):
 
 
 @router.patch("/tasks/{task_id}/status")
-async def update_task_status(
+def update_task_status(
     task_id: int,
     status: str,
     db: Session = Depends(get_db)
@@ -174,7 +317,7 @@ async def update_task_status(
 
 
 @router.get("/tasks")
-async def list_active_tasks(db: Session = Depends(get_db)):
+def list_active_tasks(db: Session = Depends(get_db)):
     """Aktif görevleri listeler."""
     service = TrendyolScraperService(db)
     tasks = service.get_active_tasks()
@@ -192,7 +335,7 @@ async def list_active_tasks(db: Session = Depends(get_db)):
 
 
 @router.get("/status", response_model=StatusResponse)
-async def get_scraper_status(db: Session = Depends(get_db)):
+def get_scraper_status(db: Session = Depends(get_db)):
     """Genel scraper durumunu döner."""
     service = TrendyolScraperService(db)
     
@@ -5,17 +5,20 @@ import asyncio
 import logging
 import re
 import secrets
-from typing import List, Dict, Any
-from .clients import openai_client
+import time
+from typing import Any, Awaitable, Dict, List, TypeVar
+from .clients import openai_client, chat_completion
 from .intent import analyze_user_intent, handle_general_chat, handle_follow_up
 from .research import (
     analyze_runway_trends,
     deep_market_research,
     generate_strategic_report,
+    REPORT_ERROR_TEXT,
     find_visual_match_for_model,
     extract_visual_search_terms
 )
 from .trends import get_google_trends, format_trends_for_report
+from .cache import semantic_cache
 from .image_gen_service import (
     generate_image_prompts,
     generate_ai_images,
@@ -30,13 +33,22 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-def check_visual_necessity(user_message: str) -> bool:
+# Pazar araştırması sürerken akıtılan geçici durum satırı (rapor başlayınca ai_message_patch ile silinir)
+RESEARCH_STATUS_TEXT = "_🔍 Podyum, pazar ve Google Trends verileri toplanıyor..._\n\n"
+
+# Tavily zaman aşımı sorgu başına _search_all içinde uygulanır; aşama sınırı yalnızca emniyet payıdır,
+# böylece tamamlanan sorguların sonuçları aşama iptal edilmeden rapora ulaşır
+SEARCH_STAGE_GRACE = 5.0
+
+
+async def check_visual_necessity(user_message: str) -> bool:
     """Kullanıcının görsel isteyip istemediğini kontrol eder"""
     if not openai_client: return False
     system_prompt = "Analyze request: Concrete Fashion Item (Dress, Shoe) -> YES. Abstract (Color, Fabric) -> NO. Reply YES/NO."
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_message}],
             max_tokens=5, temperature=0.0
@@ -54,23 +66,76 @@ def check_report_content_for_visuals(report_text: str) -> bool:
     return False
 
 
+async def _run_stage(name: str, coro: Awaitable[T], timeout: float, fallback: T, process_log: List[str]) -> T:
+    """Bir araştırma aşamasını zaman aşımıyla çalıştırır; süre dolarsa veya hata olursa yedek sonucu döner."""
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(coro, timeout)
+        logger.info(f"⏱️ {name}: {time.perf_counter() - started:.1f}sn")
+        return result
+    except asyncio.TimeoutError:
+        logger.warning(f"⏰ {name} {timeout:.0f}sn içinde bitmedi, kısmi sonuçla devam ediliyor")
+        process_log.append(f"{name} zaman aşımı.")
+    except Exception as e:
+        logger.error(f"❌ {name} hatası: {e}")
+        process_log.append(f"{name} başarısız.")
+    return fallback
+
+
+def _visual_card_markdown(model_name: str, real_data: Dict[str, Any], ai_data: Dict[str, Any]) -> str:
+    """[[VISUAL_CARD_x]] yerine konacak markdown (görsel yoksa boş)."""
+    m_url = real_data.get('img')
+    m_page = real_data.get('page')
+    ai_url = ai_data.get('url')
+
+    # Mantıksal görsel yerleşimi
+    if m_url and ai_url:
+        return f"\n> **📸 Piyasa:**\n> ![{model_name}]({m_url})\n> [🔗 İncele]({m_page})\n>\n> **🎨 AI Tasarım:**\n> ![{model_name}]({ai_url})\n"
+    if m_url:
+        return f"\n> **📸 Piyasa:**\n> ![{model_name}]({m_url})\n> [🔗 İncele]({m_page})\n"
+    if ai_url:
+        return f"\n> **🎨 AI Tasarım:**\n> ![{model_name}]({ai_url})\n"
+    return ""
+
+
+def _runway_markdown(i: int, runway_imgs: List[str]) -> str:
+    """[[RUNWAY_VISUAL_x]] yerine konacak markdown (görsel yoksa boş)."""
+    return f"\n![Defile {i}]({runway_imgs[i-1]})\n" if i <= len(runway_imgs) else ""
+
+
+def _image_streamer(description: str, stream_callback: Any):
+    """Her görsel bittiğinde markdown'ını stream_callback'e gönderen on_image callback'i (callback yoksa None)."""
+    if not stream_callback:
+        return None
+    ready = 0
+
+    async def on_image(idx: int, image: Dict[str, Any]) -> None:
+        nonlocal ready
+        if image.get("url"):
+            ready += 1
+            await stream_callback(f"![{description} {ready}]({image['url']})\n\n")
+
+    return on_image
+
+
 async def generate_ai_response(
     user_message: str,
     chat_history: List[Dict[str, str]] = [],
     generate_images: bool = False,
-    stream_callback: Any = None
+    stream_callback: Any = None,
+    patch_callback: Any = None
 ) -> Dict[str, Any]:
     """
     Ana AI yanıt üretimi fonksiyonu
     Kullanıcı mesajını analiz eder ve uygun yanıtı üretir
+    stream_callback(text): yanıt parçalarını akıtır (ai_message_chunk)
+    patch_callback(placeholder, text): akıtılmış metindeki yer tutucuyu sonradan değiştirir (ai_message_patch)
     """
-    loop = asyncio.get_event_loop()
-
     # Niyet analizi
     if generate_images:
         intent = "IMAGE_GENERATION"
     else:
-        intent = await loop.run_in_executor(None, analyze_user_intent, user_message, chat_history)
+        intent = await analyze_user_intent(user_message, chat_history)
     
     logger.info(f"🧠 Niyet: {intent} (Zorunlu Görsel: {generate_images})")
 
@@ -91,7 +156,7 @@ async def generate_ai_response(
             }
 
         # Kullanıcı isteğini analiz et (sayı ve açıklama çıkar)
-        image_request = await loop.run_in_executor(None, extract_image_request, user_message)
+        image_request = await extract_image_request(user_message)
         count = image_request["count"]
         description = image_request["description"]
         prompts = image_request["prompts"]
@@ -101,8 +166,10 @@ async def generate_ai_response(
         # TUTARLILIK İÇİN MASTER SEED
         master_seed = secrets.randbelow(100_000_000)
 
-        # Görselleri üret
-        generated_images = await loop.run_in_executor(None, generate_custom_images, prompts, master_seed)
+        # Görselleri eşzamanlı üret; biten her görsel hemen kullanıcıya akar
+        generated_images = await generate_custom_images(
+            prompts, master_seed, on_image=_image_streamer(description, stream_callback)
+        )
 
         # Başarılı görselleri filtrele
         successful_images = [img for img in generated_images if img.get("url")]
@@ -133,9 +200,7 @@ async def generate_ai_response(
             }
 
         # Önceki görsel bilgisini chat_history'den çıkar
-        prev_context = await loop.run_in_executor(
-            None, extract_previous_image_context, chat_history
-        )
+        prev_context = await extract_previous_image_context(chat_history)
 
         # TUTARLILIK İÇİN SEED
         modification_seed = secrets.randbelow(100_000_000)
@@ -143,7 +208,7 @@ async def generate_ai_response(
         if not prev_context.get("found"):
             # Önceki görsel bulunamadı, yeni görsel üretimi yap
             logger.info("⚠️ Önceki görsel bulunamadı, yeni üretim yapılıyor")
-            image_request = await loop.run_in_executor(None, extract_image_request, user_message)
+            image_request = await extract_image_request(user_message)
             prompts = image_request["prompts"]
             description = image_request["description"]
             mod_type = "new"
@@ -152,17 +217,17 @@ async def generate_ai_response(
             original_desc = prev_context.get("description") or prev_context.get("original_request", "")
             logger.info(f"🔄 Görsel modifikasyonu: {original_desc} -> {user_message}")
 
-            modification = await loop.run_in_executor(
-                None, modify_image_prompt, original_desc, user_message
-            )
+            modification = await modify_image_prompt(original_desc, user_message)
             prompts = modification["prompts"]
             description = original_desc
             mod_type = modification.get("modification_type", "variation")
 
             logger.info(f"📝 Modifikasyon tipi: {mod_type}, {len(prompts)} görsel üretilecek")
 
-        # Görselleri üret
-        generated_images = await loop.run_in_executor(None, generate_custom_images, prompts, modification_seed)
+        # Görselleri eşzamanlı üret; biten her görsel hemen kullanıcıya akar
+        generated_images = await generate_custom_images(
+            prompts, modification_seed, on_image=_image_streamer(description, stream_callback)
+        )
 
         # Başarılı görselleri filtrele
         successful_images = [img for img in generated_images if img.get("url")]
@@ -198,7 +263,7 @@ async def generate_ai_response(
 
     # --- FOLLOW UP ---
     if intent == "FOLLOW_UP":
-        response_text = await handle_follow_up(user_message, chat_history)
+        response_text = await handle_follow_up(user_message, chat_history, stream_callback)
 
         if "hatırlayamıyorum" in response_text.lower():
             return {"content": "Önceki veriye ulaşamadım. Lütfen tasarımı detaylandırın.", "image_urls": [], "image_links": {}, "process_log": ["Hafıza kaybı."]}
@@ -209,7 +274,7 @@ async def generate_ai_response(
         ai_generated_items = []
 
         if should_gen:
-            prompt_items = await loop.run_in_executor(None, generate_image_prompts, response_text)
+            prompt_items = await generate_image_prompts(response_text)
             # MAKYAJ: Promptları güzelleştir
             for item in prompt_items:
                 item['prompt'] = enhance_follow_up_prompt(item['prompt'])
@@ -218,21 +283,66 @@ async def generate_ai_response(
                 enhanced = enhance_follow_up_prompt(f"Fashion illustration of {user_message}")
                 prompt_items = [{"model_name": "Requested", "prompt": enhanced}]
 
-            ai_generated_items = await loop.run_in_executor(None, generate_ai_images, prompt_items)
+            ai_generated_items = await generate_ai_images(prompt_items)
 
         combined_images = [d['url'] for d in ai_generated_items if d.get('url')]
         for item in ai_generated_items:
             if item.get('url'):
-                response_text += f"\n\n**{item.get('model_name')}:**\n![{item.get('model_name')}]({item['url']})"
+                image_md = f"\n\n**{item.get('model_name')}:**\n![{item.get('model_name')}]({item['url']})"
+                response_text += image_md
+                if stream_callback:
+                    await stream_callback(image_md)
 
         return {"content": response_text, "image_urls": combined_images, "image_links": {}, "process_log": ["Devam yanıtı verildi."]}
 
     # === MARKET RESEARCH ===
-    # Paralel veri toplama: Tavily + Google Trends
-    f_m = loop.run_in_executor(None, deep_market_research, user_message)
-    f_r = loop.run_in_executor(None, analyze_runway_trends, user_message)
-    f_t = loop.run_in_executor(None, get_google_trends, user_message)  # YENİ: Google Trends
-    market_res, runway_res, trends_res = await asyncio.gather(f_m, f_r, f_t)
+    # Aşama grafiği (her aşamanın kendi zaman aşımı ve yedek sonucu var):
+    #   podyum + pazar (Tavily) ─┐
+    #   google trends (SerpApi) ─┼─> rapor ─> görsel terimleri ─> piyasa görselleri + AI çizimleri
+    #   görsel ihtiyacı kontrolü ┘ (rapor beklenmeden başlar)
+    process_log = []
+
+    # Araştırma sürerken kullanıcı boş ekran görmesin: durum satırı akıt, rapor başlayınca patch ile kaldır
+    report_stream = None
+    if stream_callback:
+        await stream_callback(RESEARCH_STATUS_TEXT)
+        report_started = False
+
+        async def report_stream(chunk: str) -> None:
+            nonlocal report_started
+            if not report_started:
+                report_started = True
+                if patch_callback:
+                    await patch_callback(RESEARCH_STATUS_TEXT, "")
+            await stream_callback(chunk)
+
+    # 2. katman önbellek: yakın anlamlı bir soru yakın zamanda araştırıldıysa yanıtı oradan ver
+    cached_response, question_embedding = await semantic_cache.lookup(user_message)
+    if cached_response:
+        if stream_callback:
+            if patch_callback:
+                await patch_callback(RESEARCH_STATUS_TEXT, "")
+            await stream_callback(cached_response["content"])
+        return {**cached_response, "process_log": ["Önbellekten yanıtlandı."]}
+
+    market_task = asyncio.create_task(_run_stage(
+        "Pazar araştırması", deep_market_research(user_message),
+        settings.research_search_timeout + SEARCH_STAGE_GRACE, {"context": "", "market_images": []}, process_log
+    ))
+    runway_task = asyncio.create_task(_run_stage(
+        "Podyum analizi", analyze_runway_trends(user_message),
+        settings.research_search_timeout + SEARCH_STAGE_GRACE, {"context": "", "runway_images": []}, process_log
+    ))
+    trends_task = asyncio.create_task(_run_stage(
+        "Google Trends", get_google_trends(user_message),
+        settings.research_trends_timeout, {"error": "timeout"}, process_log
+    ))
+    visual_check_task = asyncio.create_task(_run_stage(
+        "Görsel ihtiyacı", check_visual_necessity(user_message),
+        settings.research_visual_check_timeout, False, process_log
+    ))
+
+    market_res, runway_res, trends_res = await asyncio.gather(market_task, runway_task, trends_task)
 
     # Google Trends verisini formatla
     trends_text = format_trends_for_report(trends_res)
@@ -241,18 +351,31 @@ async def generate_ai_response(
     if trends_text:
         full_data += f"\n\n=== GOOGLE TRENDS VERİSİ ===\n{trends_text}"
     
-    final_report = await loop.run_in_executor(None, generate_strategic_report, user_message, full_data)
+    final_report = await _run_stage(
+        "Rapor", generate_strategic_report(user_message, full_data, report_stream),
+        settings.research_report_timeout, REPORT_ERROR_TEXT, process_log
+    )
+
+    # 1. Rapordan maddeleri çek (Context Injection ile) - görsel kontrolü bu sırada tamamlanır
+    extracted_items, user_needs_visuals = await asyncio.gather(
+        _run_stage(
+            "Görsel terimleri", extract_visual_search_terms(final_report, user_message),
+            settings.research_visual_terms_timeout, [], process_log
+        ),
+        visual_check_task
+    )
+    # Defile görselleri araştırmadan hazır: akıtılan rapordaki yer tutucuları hemen doldur
+    runway_imgs = runway_res.get("runway_images", [])
+    if patch_callback:
+        for i in range(1, 4):
+            await patch_callback(f"[[RUNWAY_VISUAL_{i}]]", _runway_markdown(i, runway_imgs))
 
-    user_needs_visuals = await loop.run_in_executor(None, check_visual_necessity, user_message)
     if not user_needs_visuals:
-        if await loop.run_in_executor(None, check_report_content_for_visuals, final_report):
+        if check_report_content_for_visuals(final_report):
             user_needs_visuals = True
 
     should_gen_ai = bool(settings.fal_api_key) and user_needs_visuals
 
-    # 1. Rapordan maddeleri çek (Context Injection ile)
-    extracted_items = await loop.run_in_executor(None, extract_visual_search_terms, final_report, user_message)
-
     if not extracted_items and user_needs_visuals:
         extracted_items = [{"name": f"Trend {i}", "search_query": f"{user_message} trend {i}", "ai_prompt_base": f"{user_message} trend item"} for i in range(1,6)]
 
@@ -266,29 +389,40 @@ async def generate_ai_response(
             # Stüdyo makyajını ekle
             item['ai_prompt'] = enhance_follow_up_prompt(base_prompt)
 
-    # 3. Paralel Arama ve Çizim Başlat
-    tasks_real_img = []
-    tasks_ai_img = []
-
-    for item in extracted_items:
-        tasks_real_img.append(loop.run_in_executor(None, find_visual_match_for_model, item['search_query']))
+    # 3. Paralel Arama ve Çizim Başlat (madde başına zaman aşımı: biri takılırsa diğerleri kaybolmaz)
+    async def resolve_card(i: int, item: Dict[str, Any]):
+        """Bir maddenin piyasa görseli + AI çizimini bekler, hazır olunca kartı patch'ler."""
+        real_task = _run_stage(
+            f"Piyasa görseli ({item['name']})", find_visual_match_for_model(item['search_query']),
+            settings.research_image_timeout, {}, process_log
+        )
         if should_gen_ai:
             prompt_data = [{"model_name": item['name'], "ref_id": "", "prompt": item['ai_prompt']}]
-            tasks_ai_img.append(loop.run_in_executor(None, generate_ai_images, prompt_data))
-
-    real_images_results = await asyncio.gather(*tasks_real_img)
-    ai_images_results = await asyncio.gather(*tasks_ai_img) if should_gen_ai else []
+            ai_task = _run_stage(
+                f"AI tasarım ({item['name']})", generate_ai_images(prompt_data),
+                settings.research_image_timeout, [], process_log
+            )
+            real_data, ai_list = await asyncio.gather(real_task, ai_task)
+        else:
+            real_data, ai_list = await real_task, []
+        if patch_callback:
+            ai_data = ai_list[0] if ai_list else {}
+            await patch_callback(f"[[VISUAL_CARD_{i}]]", _visual_card_markdown(item['name'], real_data, ai_data))
+        return real_data, ai_list
+
+    # Piyasa görsel araması ve AI çizimleri tüm maddeler için aynı anda çalışır
+    card_results = await asyncio.gather(*(resolve_card(i, item) for i, item in enumerate(extracted_items, 1)))
+    real_images_results = [real for real, _ in card_results]
+    ai_images_results = [ai for _, ai in card_results] if should_gen_ai else []
+    if patch_callback:
+        for i in range(len(extracted_items) + 1, 6):
+            await patch_callback(f"[[VISUAL_CARD_{i}]]", "")
 
     # 4. Görsel Entegrasyonu
     final_content = final_report
-    runway_imgs = runway_res.get("runway_images", [])
 
     for i in range(1, 4):
-        ph = f"[[RUNWAY_VISUAL_{i}]]"
-        if i <= len(runway_imgs):
-            final_content = final_content.replace(ph, f"\n![Defile {i}]({runway_imgs[i-1]})\n")
-        else:
-            final_content = final_content.replace(ph, "")
+        final_content = final_content.replace(f"[[RUNWAY_VISUAL_{i}]]", _runway_markdown(i, runway_imgs))
 
     # 5. Model Görsellerini Yerleştir (DÜZELTİLDİ: BOŞ BAŞLIK TEMİZLİĞİ)
     for i in range(1, 6):
@@ -297,20 +431,8 @@ async def generate_ai_response(
         real_data = real_images_results[i-1] if i <= len(real_images_results) else {}
         ai_list = ai_images_results[i-1] if (should_gen_ai and i <= len(ai_images_results)) else []
         ai_data = ai_list[0] if ai_list else {}
-
-        m_url = real_data.get('img')
-        m_page = real_data.get('page')
-        ai_url = ai_data.get('url')
         model_name = item_info['name']
-
-        replacement = ""
-        # Mantıksal görsel yerleşimi
-        if m_url and ai_url:
-            replacement = f"\n> **📸 Piyasa:**\n> ![{model_name}]({m_url})\n> [🔗 İncele]({m_page})\n>\n> **🎨 AI Tasarım:**\n> ![{model_name}]({ai_url})\n"
-        elif m_url:
-            replacement = f"\n> **📸 Piyasa:**\n> ![{model_name}]({m_url})\n> [🔗 İncele]({m_page})\n"
-        elif ai_url:
-            replacement = f"\n> **🎨 AI Tasarım:**\n> ![{model_name}]({ai_url})\n"
+        replacement = _visual_card_markdown(model_name, real_data, ai_data)
 
         # Replacement boşsa (yani görsel yoksa) başlıklar da eklenmeyecek
         final_content = final_content.replace(ph, replacement)
@@ -333,4 +455,8 @@ async def generate_ai_response(
     for u in all_urls:
         if u not in link_map: link_map[u] = None
 
-    return {"content": final_content, "image_urls": all_urls, "image_links": link_map, "process_log": ["Tamamlandı."]}
\ No newline at end of file
+    response = {"content": final_content, "image_urls": all_urls, "image_links": link_map}
+    # Yalnızca tüm aşamaları eksiksiz biten yanıtlar önbelleğe girer
+    if not process_log and final_report != REPORT_ERROR_TEXT:
+        await semantic_cache.store(user_message, response, question_embedding)
+    return {**response, "process_log": process_log + ["Tamamlandı."]}
\ No newline at end of file
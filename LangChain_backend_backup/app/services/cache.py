@@ -0,0 +1,207 @@
+"""
+Response Cache - Araştırma, trend ve niyet çağrıları için katmanlı önbellek
+1. katman: birebir anahtarlı LRU + TTL (süreç içi) - Google Trends, Tavily, niyet analizi
+2. katman: semantik rapor önbelleği (pgvector) - yakın anlamlı pazar araştırması soruları
+Her katman kendi isabet/ıska sayaçlarını tutar ve ayrı ayrı temizlenebilir.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.research_cache import ResearchReportCache
+from . import clients
+from .executors import db_executor, run_in
+
+logger = logging.getLogger(__name__)
+
+
+def _hit_rate(hits: int, misses: int) -> float:
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+class TTLCache:
+    """
+    Boyut sınırlı LRU + TTL önbellek (thread-safe; event loop'tan okunurken temizleme
+    endpoint'i threadpool'dan clear() çağırabilir).
+    Süresi dolan kayıt okunduğunda silinir; dolu önbellekte en eski kullanılan kayıt atılır.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = len(self._data)
+            self._data.clear()
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": _hit_rate(self.hits, self.misses),
+            }
+
+
+class SemanticReportCache:
+    """
+    Pazar araştırması yanıtlarını soru embedding'i ile pgvector'de saklar.
+    En yakın kayıt (cosine mesafesi <= SEMANTIC_CACHE_MAX_DISTANCE, TTL içinde) varsa yanıt oradan döner.
+    """
+
+    name = "semantic"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.semantic_cache_enabled and clients.openai_client is not None
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(hours=settings.semantic_cache_ttl_hours)
+
+    def _nearest(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        distance = ResearchReportCache.embedding.cosine_distance(embedding)
+        with SessionLocal() as db:
+            row = db.execute(
+                select(ResearchReportCache.id, ResearchReportCache.response, distance.label("distance"))
+                .where(ResearchReportCache.created_at >= self._cutoff())
+                .order_by(distance)
+                .limit(1)
+            ).first()
+            if row is None or row.distance > settings.semantic_cache_max_distance:
+                return None
+            db.execute(
+                update(ResearchReportCache)
+                .where(ResearchReportCache.id == row.id)
+                .values(hit_count=ResearchReportCache.hit_count + 1)
+            )
+            db.commit()
+            logger.info(f"🎯 Semantik önbellek isabeti (mesafe: {row.distance:.3f})")
+            return row.response
+
+    def _insert(self, question: str, embedding: List[float], response: Dict[str, Any]) -> None:
+        with SessionLocal() as db:
+            # Süresi dolan kayıtları yazarken temizle (tablo TTL penceresi kadar büyür)
+            db.execute(delete(ResearchReportCache).where(ResearchReportCache.created_at < self._cutoff()))
+            db.add(ResearchReportCache(question=question, embedding=embedding, response=response))
+            db.commit()
+
+    async def lookup(self, question: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """(önbellekteki yanıt veya None, sorunun embedding'i) döner; embedding store() için tekrar kullanılır."""
+        if not self.enabled:
+            return None, None
+        try:
+            embedding = await clients.create_embedding(question)
+            response = await run_in(db_executor, self._nearest, embedding)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Semantik önbellek okuma hatası: {e}")
+            return None, None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response, embedding
+
+    async def store(self, question: str, response: Dict[str, Any], embedding: Optional[List[float]] = None) -> None:
+        if not self.enabled:
+            return
+        try:
+            if embedding is None:
+                embedding = await clients.create_embedding(question)
+            await run_in(db_executor, self._insert, question, embedding, response)
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Semantik önbellek yazma hatası: {e}")
+
+    def clear(self) -> int:
+        with SessionLocal() as db:
+            removed = db.execute(delete(ResearchReportCache)).rowcount or 0
+            db.commit()
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ttl_hours": settings.semantic_cache_ttl_hours,
+            "max_distance": settings.semantic_cache_max_distance,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": _hit_rate(self.hits, self.misses),
+        }
+
+
+# 1. katman
+trends_cache = TTLCache("trends", settings.cache_max_entries, settings.cache_trends_ttl)
+tavily_cache = TTLCache("tavily", settings.cache_max_entries, settings.cache_tavily_ttl)
+intent_cache = TTLCache("intent", settings.cache_max_entries, settings.cache_intent_ttl)
+# 2. katman
+semantic_cache = SemanticReportCache()
+
+CACHE_TIERS = {
+    cache.name: cache for cache in (trends_cache, tavily_cache, intent_cache, semantic_cache)
+}
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Katman başına isabet oranı ve boyut metrikleri."""
+    return {name: cache.stats() for name, cache in CACHE_TIERS.items()}
+
+
+def invalidate_cache(tier: Optional[str] = None) -> Dict[str, int]:
+    """Verilen katmanı (None ise tümünü) temizler; katman başına silinen kayıt sayısını döner."""
+    if tier is not None and tier not in CACHE_TIERS:
+        raise KeyError(tier)
+    names = [tier] if tier else list(CACHE_TIERS)
+    removed = {name: CACHE_TIERS[name].clear() for name in names}
+    logger.info(f"🧹 Önbellek temizlendi: {removed}")
+    return removed
@@ -1,39 +1,153 @@
 """
-AI Clients - OpenAI, Tavily başlatma ve yönetimi
+AI Clients - OpenAI, Tavily, FAL başlatma ve yönetimi
+OpenAI ve Tavily tek bir paylaşılan httpx bağlantı havuzunu kullanır (keep-alive ile bağlantı yeniden kullanımı).
+FAL görsel istekleri tek host'a gittiği için ayrı bir HTTP/2 istemcisi üzerinden çoklanır.
+Her sağlayıcının eşzamanlı istek sayısı ayrı bir semaphore ile sınırlanır.
 """
+import asyncio
+import json
 import logging
-from typing import Optional
-from openai import OpenAI
-from tavily import TavilyClient
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI
 from app.core.config import settings
+from .cache import tavily_cache
 
 logger = logging.getLogger(__name__)
 
+
+class AsyncTavilyClient:
+    """Tavily Search API için httpx tabanlı async istemci (tavily-python ile aynı search() imzası)."""
+
+    def __init__(self, api_key: str, http_client: httpx.AsyncClient, base_url: str = "https://api.tavily.com",
+                 timeout: float = 30.0, max_concurrency: int = 8):
+        self.api_key = api_key
+        self.http_client = http_client
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limiter = asyncio.Semaphore(max_concurrency)
+
+    async def search(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        """POST /search - search_depth, max_results, include_images vb. aynen iletilir. Başarılı yanıtlar önbelleğe alınır."""
+        cache_key = (query.strip().lower(), json.dumps(kwargs, sort_keys=True))
+        cached = tavily_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        async with self.limiter:
+            response = await self.http_client.post(
+                f"{self.base_url}/search",
+                json={"query": query, **kwargs},
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        data = response.json()
+        tavily_cache.set(cache_key, data)
+        return data
+
+
+# Paylaşılan bağlantı havuzu (OpenAI + Tavily)
+http_client: Optional[httpx.AsyncClient] = None
+
+# FAL görsel üretimi için HTTP/2 istemcisi (h2 yoksa HTTP/1.1)
+fal_http_client: Optional[httpx.AsyncClient] = None
+
 # Global clients
-openai_client: Optional[OpenAI] = None
-tavily_client: Optional[TavilyClient] = None
+openai_client: Optional[AsyncOpenAI] = None
+tavily_client: Optional[AsyncTavilyClient] = None
+
+# OpenAI eşzamanlılık sınırı (tüm chat.completions çağrıları için)
+openai_limiter = asyncio.Semaphore(settings.openai_max_concurrency)
+
+# FAL eşzamanlılık sınırı (uçuştaki görsel üretim isteği)
+fal_limiter = asyncio.Semaphore(settings.fal_max_concurrency)
+
+
+async def chat_completion(**kwargs: Any):
+    """openai_client.chat.completions.create'in eşzamanlılık sınırlı async karşılığı."""
+    async with openai_limiter:
+        return await openai_client.chat.completions.create(**kwargs)
+
+
+async def create_embedding(text: str) -> List[float]:
+    """settings.embedding_model ile tek metnin embedding'i (OpenAI eşzamanlılık sınırı içinde)."""
+    async with openai_limiter:
+        response = await openai_client.embeddings.create(model=settings.embedding_model, input=text)
+    return response.data[0].embedding
+
+
+async def stream_chat_completion(**kwargs: Any) -> AsyncIterator[Any]:
+    """Streaming chat completion; eşzamanlılık slotu akış bitene kadar tutulur."""
+    async with openai_limiter:
+        stream = await openai_client.chat.completions.create(stream=True, **kwargs)
+        async for chunk in stream:
+            yield chunk
+
+
+def _create_fal_http_client() -> httpx.AsyncClient:
+    """FAL için HTTP/2 istemcisi; h2 paketi yüklü değilse HTTP/1.1 keep-alive'a düşer."""
+    limits = httpx.Limits(
+        max_connections=settings.fal_max_concurrency,
+        max_keepalive_connections=settings.fal_max_concurrency,
+    )
+    timeout = httpx.Timeout(settings.fal_timeout, connect=10.0)
+    if settings.fal_http2:
+        try:
+            client = httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+            logger.info("✅ FAL Hazır (HTTP/2)")
+            return client
+        except ImportError:
+            logger.warning("⚠️ h2 paketi yüklü değil, FAL HTTP/1.1 ile kullanılacak (httpx[http2])")
+    logger.info("✅ FAL Hazır")
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
 
 
 def initialize_ai_clients():
     """AI client'larını başlatır (OpenAI, Tavily)"""
-    global openai_client, tavily_client
+    global http_client, fal_http_client, openai_client, tavily_client
     try:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.ai_http_max_connections,
+                max_keepalive_connections=settings.ai_http_max_keepalive,
+            ),
+            timeout=httpx.Timeout(settings.openai_timeout, connect=10.0),
+        )
+
+        if settings.fal_api_key:
+            fal_http_client = _create_fal_http_client()
+
         if settings.openai_api_key:
-            # Vision işlemleri bazen uzun sürebilir, timeout artırıldı
-            openai_client = OpenAI(api_key=settings.openai_api_key, timeout=45.0)
+            openai_client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                timeout=settings.openai_timeout,
+                http_client=http_client,
+            )
             logger.info("✅ OpenAI Hazır")
         else:
             logger.warning("⚠️ OpenAI API key bulunamadı")
             
         if settings.tavily_api_key:
             try:
-                tavily_client = TavilyClient(api_key=settings.tavily_api_key)
-                # Test sorgusu ile API'nin çalıştığını doğrula
-                test_response = tavily_client.search(query="test", max_results=1)
-                if test_response:
+                tavily_client = AsyncTavilyClient(
+                    api_key=settings.tavily_api_key,
+                    http_client=http_client,
+                    base_url=settings.tavily_base_url,
+                    timeout=settings.tavily_timeout,
+                    max_concurrency=settings.tavily_max_concurrency,
+                )
+                # Test sorgusu ile API'nin çalıştığını doğrula (başlangıçta, event loop dışında)
+                test_response = httpx.post(
+                    f"{tavily_client.base_url}/search",
+                    json={"query": "test", "max_results": 1},
+                    headers={"Authorization": f"Bearer {settings.tavily_api_key}"},
+                    timeout=settings.tavily_timeout,
+                )
+                if test_response.status_code == 200:
                     logger.info("✅ Tavily Hazır ve API erişilebilir")
                 else:
-                    logger.warning("⚠️ Tavily API yanıt vermiyor")
+                    logger.warning(f"⚠️ Tavily API yanıt vermiyor (HTTP {test_response.status_code})")
             except Exception as tavily_error:
                 logger.error(f"❌ Tavily başlatma hatası: {tavily_error}")
                 tavily_client = None
@@ -70,6 +184,13 @@ def initialize_ai_clients():
         logger.error(f"❌ Başlatma Hatası: {e}")
 
 
+async def close_ai_clients():
+    """Paylaşılan bağlantı havuzlarını kapatır (uygulama kapanırken)."""
+    for client in (http_client, fal_http_client):
+        if client is not None:
+            await client.aclose()
+
+
 
 # Uygulama başladığında client'ları başlat
 initialize_ai_clients()
@@ -0,0 +1,29 @@
+"""
+Executors - Async sürücüsü olmayan bloklayan işler için ayrılmış, sınırlı thread havuzları
+asyncio.to_thread'in kullandığı varsayılan executor tüm uygulamayla paylaşılır; burada her iş türü
+kendi havuzunda çalışır, böylece biri yavaşladığında istek hattının geri kalanı beklemez.
+- db_executor: pgvector semantik önbellek sorguları (senkron SQLAlchemy oturumu, DB_EXECUTOR_WORKERS)
+- log_executor: niyet JSONL kaydı (tek thread; ekleme sırası korunur)
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+db_executor = ThreadPoolExecutor(max_workers=settings.db_executor_workers, thread_name_prefix="db")
+log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intent-log")
+
+
+async def run_in(executor: ThreadPoolExecutor, func: Callable[..., T], *args: Any) -> T:
+    """func(*args)'ı verilen havuzda çalıştırır ve sonucu bekler."""
+    return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(func, *args))
+
+
+def shutdown_executors() -> None:
+    """Uygulama kapanırken havuzları kapatır (kuyruktaki kayıt yazımları tamamlanır)."""
+    for executor in (db_executor, log_executor):
+        executor.shutdown(wait=True)
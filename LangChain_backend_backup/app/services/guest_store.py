@@ -0,0 +1,217 @@
+"""
+Guest Store - Misafir sohbet durumları için sınırlı, süre aşımlı depo
+Bellek: son aktiviteye göre sıralı OrderedDict; kaydetme sona taşır, en eski misafir baştan atılır
+        (toplam kayıt sınırı aşıldığında veya süre dolduğunda, amortize O(1)).
+Redis (opsiyonel, GUEST_STORE_REDIS_URL): birden fazla uvicorn worker'ı aynı misafir durumunu paylaşır;
+        kayıtlar TTL ile saklanır, aktivite sırası sorted set'te tutulur (O(log n)).
+Her misafirde sohbet sayısı ve sohbet başına mesaj sayısı sınırlıdır.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def bound_guest_state(state: Dict[str, Any], max_conversations: int, max_messages: int) -> Dict[str, Any]:
+    """
+    Misafir durumunu sınırlar içinde tutar (yerinde):
+    aktif sohbet korunur, fazla sohbetlerden en uzun süredir kullanılmayanlar silinir;
+    her sohbette yalnızca son max_messages mesaj kalır.
+    """
+    conversations = state.get("conversations", {})
+    if len(conversations) > max_conversations:
+        active_id = state.get("active_conversation_id")
+        candidates = sorted(
+            (conv_id for conv_id in conversations if conv_id != active_id),
+            key=lambda conv_id: str(conversations[conv_id].get("last_activity") or ""),
+        )
+        for conv_id in candidates[:len(conversations) - max_conversations]:
+            del conversations[conv_id]
+    for conv in conversations.values():
+        messages = conv.get("messages", [])
+        if len(messages) > max_messages:
+            del messages[:len(messages) - max_messages]
+    return state
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(value).__name__}")
+
+
+class MemoryGuestStore:
+    """
+    Süreç içi misafir deposu.
+    Kayıtlar son aktiviteye göre sıralıdır: save() kaydı sona taşır, böylece süresi dolanlar
+    ve sınır aşımında atılacak olanlar her zaman baştadır (tam tarama yapılmaz).
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int, ttl: float, max_conversations: int, max_messages: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, guest_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._data.get(guest_id)
+        if entry is None:
+            return None
+        if entry[0] + self.ttl <= time.monotonic():
+            del self._data[guest_id]
+            self.expirations += 1
+            return None
+        return entry[1]
+
+    async def save(self, guest_id: str, state: Dict[str, Any]) -> None:
+        """Durumu sınırlar, son aktivite olarak işaretler; toplam sınır aşılırsa en eski misafiri atar."""
+        bound_guest_state(state, self.max_conversations, self.max_messages)
+        state["last_activity"] = datetime.now()
+        self._data[guest_id] = (time.monotonic(), state)
+        self._data.move_to_end(guest_id)
+        while len(self._data) > self.max_entries:
+            evicted_id, _ = self._data.popitem(last=False)
+            self.evictions += 1
+            logger.info(f"Guest data evicted (store full): {evicted_id}")
+
+    async def delete(self, guest_id: str) -> bool:
+        return self._data.pop(guest_id, None) is not None
+
+    async def expire(self) -> List[str]:
+        """Süresi dolan misafirleri baştan itibaren siler; ilk güncel kayıtta durur."""
+        cutoff = time.monotonic() - self.ttl
+        expired = []
+        while self._data:
+            guest_id, (last_seen, _) = next(iter(self._data.items()))
+            if last_seen > cutoff:
+                break
+            del self._data[guest_id]
+            expired.append(guest_id)
+        self.expirations += len(expired)
+        return expired
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "size": len(self._data),
+            "max_size": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisGuestStore:
+    """
+    Redis (veya uyumlu) destekli misafir deposu; tüm worker'lar aynı durumu görür.
+    Durum JSON olarak TTL ile saklanır, son aktivite sorted set'te tutulur;
+    toplam sınır aşıldığında en eski misafirler ZPOPMIN ile atılır.
+    """
+
+    backend = "redis"
+
+    def __init__(self, client, max_entries: int, ttl: float, max_conversations: int, max_messages: int,
+                 prefix: str = "guest:"):
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self.prefix = prefix
+        self.activity_key = f"{prefix}activity"
+        self.evictions = 0
+        self.expirations = 0
+
+    def _key(self, guest_id: str) -> str:
+        return f"{self.prefix}state:{guest_id}"
+
+    async def get(self, guest_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self._key(guest_id))
+        return json.loads(raw) if raw is not None else None
+
+    async def save(self, guest_id: str, state: Dict[str, Any]) -> None:
+        bound_guest_state(state, self.max_conversations, self.max_messages)
+        state["last_activity"] = datetime.now()
+        payload = json.dumps(state, default=_json_default, ensure_ascii=False)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(guest_id), payload, ex=max(1, int(self.ttl)))
+            pipe.zadd(self.activity_key, {guest_id: time.time()})
+            pipe.zcard(self.activity_key)
+            *_, size = await pipe.execute()
+        if size > self.max_entries:
+            evicted = await self.client.zpopmin(self.activity_key, size - self.max_entries)
+            evicted_ids = [member.decode() if isinstance(member, bytes) else member for member, _ in evicted]
+            if evicted_ids:
+                await self.client.delete(*(self._key(evicted_id) for evicted_id in evicted_ids))
+                self.evictions += len(evicted_ids)
+                logger.info(f"Guest data evicted (store full): {evicted_ids}")
+
+    async def delete(self, guest_id: str) -> bool:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.delete(self._key(guest_id))
+            pipe.zrem(self.activity_key, guest_id)
+            removed, _ = await pipe.execute()
+        return bool(removed)
+
+    async def expire(self) -> List[str]:
+        """Durum anahtarları TTL ile kendiliğinden silinir; burada yalnızca aktivite sırası temizlenir."""
+        cutoff = time.time() - self.ttl
+        expired = await self.client.zrangebyscore(self.activity_key, "-inf", cutoff)
+        if not expired:
+            return []
+        expired_ids = [member.decode() if isinstance(member, bytes) else member for member in expired]
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zrem(self.activity_key, *expired_ids)
+            pipe.delete(*(self._key(guest_id) for guest_id in expired_ids))
+            await pipe.execute()
+        self.expirations += len(expired_ids)
+        return expired_ids
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "size": await self.client.zcard(self.activity_key),
+            "max_size": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_guest_store():
+    """GUEST_STORE_REDIS_URL tanımlı ve redis paketi yüklüyse Redis, aksi halde bellek deposu döner."""
+    limits = dict(
+        max_entries=settings.guest_max_entries,
+        ttl=settings.guest_ttl_minutes * 60,
+        max_conversations=settings.guest_max_conversations,
+        max_messages=settings.guest_max_messages,
+    )
+    if settings.guest_store_redis_url:
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("⚠️ redis paketi yüklü değil, misafir verisi süreç içi bellekte tutulacak (pip install redis)")
+        else:
+            logger.info("✅ Misafir deposu: Redis")
+            return RedisGuestStore(redis_asyncio.from_url(settings.guest_store_redis_url), **limits)
+    return MemoryGuestStore(**limits)
+
+
+guest_store = create_guest_store()
@@ -1,14 +1,15 @@
 """
 Image Processing - Görsel filtreleme, doğrulama ve üretim
 """
+import asyncio
 import json
 import re
 import logging
-import requests
 import secrets
 from urllib.parse import urlparse
-from typing import List, Dict, Any, Optional
-from .clients import openai_client
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from . import clients
+from .clients import openai_client, chat_completion
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -74,7 +75,7 @@ def validate_images_with_vision(image_urls: List[str], filter_type: str = "marke
 
 
 # --- KRİTİK GÜNCELLEME: SIKI RENK VE MODEL KONTROLÜ ---
-def validate_image_content_match(image_url: str, description: str) -> bool:
+async def validate_image_content_match(image_url: str, description: str) -> bool:
     """
     Görselin, aranan açıklama ile BİREBİR uyuşup uyuşmadığını kontrol eder.
     """
@@ -97,7 +98,7 @@ def validate_image_content_match(image_url: str, description: str) -> bool:
     """
 
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt.format(description=description)},
@@ -118,11 +119,11 @@ def validate_image_content_match(image_url: str, description: str) -> bool:
         return False
 
 
-def generate_image_prompts(analysis_text: str) -> List[Dict[str, str]]:
+async def generate_image_prompts(analysis_text: str) -> List[Dict[str, str]]:
     """Görsel prompt üretici"""
     if not openai_client: return []
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "Extract 5 fashion models. JSON: {'items': [{'model_name': '...', 'ref_id': 'IMG_REF_X', 'prompt': '...'}]}"},
@@ -134,10 +135,10 @@ def generate_image_prompts(analysis_text: str) -> List[Dict[str, str]]:
     except: return []
 
 
-def extract_visual_style(user_text: str) -> str:
+async def extract_visual_style(user_text: str) -> str:
     if not openai_client: return ""
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": f"Extract visual style keywords from: {user_text}"}],
             max_tokens=60
@@ -150,7 +151,7 @@ def validate_single_image_is_dress(image_url: str) -> bool:
     return is_quality_fashion_image(image_url)
 
 
-def generate_ai_images(prompt_items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+async def generate_ai_images(prompt_items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
     """FAL AI Görsel Üretimi (Legacy Support)"""
     # Bu fonksiyon eski yapıyı desteklemek için tutuluyor,
     # ancak generate_custom_images kullanılması önerilir.
@@ -159,7 +160,7 @@ def generate_ai_images(prompt_items: List[Dict[str, str]]) -> List[Dict[str, Any
     # Basit bir wrapper olarak generate_custom_images'ı çağırabiliriz
     # veya eski mantığı koruyabiliriz. Tutarlılık için custom'a yönlendirelim.
     prompts = [item.get("prompt", "") for item in prompt_items]
-    results = generate_custom_images(prompts) # Random seed kullanacak
+    results = await generate_custom_images(prompts) # Random seed kullanacak
 
     # Formatı eski çıktıya dönüştür
     final_results = []
@@ -170,7 +171,7 @@ def generate_ai_images(prompt_items: List[Dict[str, str]]) -> List[Dict[str, Any
 
 
 # --- 3. GÖRSEL ÜRETİM İSTEĞİ ÇIKARICI ---
-def extract_image_request(user_message: str) -> Dict[str, Any]:
+async def extract_image_request(user_message: str) -> Dict[str, Any]:
     """
     Kullanıcı mesajından görsel üretim detaylarını çıkarır.
     Sayı belirtilmezse default 1 adet.
@@ -188,7 +189,7 @@ def extract_image_request(user_message: str) -> Dict[str, Any]:
     """
 
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -225,7 +226,7 @@ def extract_image_request(user_message: str) -> Dict[str, Any]:
 
 
 # --- 4. ÖNCEKİ GÖRSEL BAĞLAMINI ÇIKARICI ---
-def extract_previous_image_context(chat_history: List[Dict[str, str]]) -> Dict[str, Any]:
+async def extract_previous_image_context(chat_history: List[Dict[str, str]]) -> Dict[str, Any]:
     """
     Chat geçmişinden en son üretilen görselin bilgilerini çıkarır.
     """
@@ -238,7 +239,7 @@ def extract_previous_image_context(chat_history: List[Dict[str, str]]) -> Dict[s
     system_prompt = "Find the LAST generated image info. JSON: {'found': bool, 'description': '...', 'original_request': '...', 'url': '...'}"
 
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -254,7 +255,7 @@ def extract_previous_image_context(chat_history: List[Dict[str, str]]) -> Dict[s
 
 
 # --- 5. GÖRSEL MODİFİKASYON PROMPT ÜRETİCİ ---
-def modify_image_prompt(original_description: str, modification_request: str) -> Dict[str, Any]:
+async def modify_image_prompt(original_description: str, modification_request: str) -> Dict[str, Any]:
     """
     Önceki görsel açıklamasını alır ve yeni isteğe göre prompt üretir.
     """
@@ -264,7 +265,7 @@ def modify_image_prompt(original_description: str, modification_request: str) ->
     system_prompt = "Modify image prompt. JSON: {'count': N, 'prompts': ['...'], 'modification_type': '...'}"
 
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -301,60 +302,83 @@ def modify_image_prompt(original_description: str, modification_request: str) ->
         }
 
 
-# --- 6. ÖZEL GÖRSEL ÜRETİCİ (GÜNCELLENDİ: TUTARLILIK VE KALİTE) ---
-def generate_custom_images(prompts: List[str], consist_seed: Optional[int] = None) -> List[Dict[str, Any]]:
-    """
-    Verilen prompt listesi için FAL AI'dan görsel üretir.
-    Tutarlılık için: Eğer consist_seed verilirse TÜM görsellerde aynısını kullanır.
-    """
-    if not settings.fal_api_key:
-        return []
+# --- 6. ÖZEL GÖRSEL ÜRETİCİ (GÜNCELLENDİ: TUTARLILIK, KALİTE VE EŞZAMANLILIK) ---
+
+# Kalite için Negatif Prompt (Nelerin olmamasını istiyoruz)
+NEGATIVE_PROMPT = "cartoon, illustration, anime, deformed, distorted, blurry, low quality, pixelated, ugly face, bad hands, extra fingers, text, watermark, signature, cropped, out of frame, weird anatomy, long neck"
+
+# Görsel hazır olduğunda çağrılır: (prompt sırası, sonuç)
+ImageCallback = Callable[[int, Dict[str, Any]], Awaitable[None]]
+
 
-    results = []
+async def _generate_one_image(idx: int, total: int, prompt: str, seed: int) -> Dict[str, Any]:
+    """Tek bir prompt için FAL isteği (fal_limiter ile sınırlı). Hata durumunda url=None döner."""
+    payload = {
+        "prompt": prompt,
+        "image_size": "portrait_4_3",
+        "num_inference_steps": 50,  # KALİTE: Adım sayısı artırıldı (Detay için)
+        "guidance_scale": 3.0,      # KALİTE: Fotorealizm için ideal aralık
+        "seed": seed,               # TUTARLILIK: Sabit seed kullanımı
+        "enable_safety_checker": False,
+        "negative_prompt": NEGATIVE_PROMPT
+    }
     headers = {"Authorization": f"Key {settings.fal_api_key}", "Content-Type": "application/json"}
 
+    # FAL API URL construction
+    # base_url genellikle https://fal.run şeklindedir, model path ise fal-ai/flux/dev
+    # Birleşim: https://fal.run/fal-ai/flux/dev
+    fal_url = f"{settings.fal_base_url.rstrip('/')}/{settings.fal_model_path.lstrip('/')}"
+
+    try:
+        async with clients.fal_limiter:
+            logger.info(f"🎨 Özel görsel {idx + 1}/{total} üretiliyor... (Seed: {seed})")
+            res = await clients.fal_http_client.post(fal_url, headers=headers, json=payload)
+        if res.status_code == 200:
+            img_url = res.json().get("images", [{}])[0].get("url")
+            logger.info(f"✅ Özel görsel {idx + 1} başarıyla üretildi")
+            return {"url": img_url, "prompt": prompt, "seed": seed}
+        logger.error(f"❌ HTTP {res.status_code}: {res.text}")
+    except Exception as e:
+        logger.error(f"❌ Özel görsel hatası: {e}")
+    return {"url": None, "prompt": prompt, "seed": seed}
+
+
+async def iter_custom_images(prompts: List[str], consist_seed: Optional[int] = None) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Tüm prompt'ları aynı anda FAL'a gönderir (uçuştaki istek sayısı FAL_MAX_CONCURRENCY ile sınırlı)
+    ve her görsel bittiği anda (prompt sırası, sonuç) olarak verir.
+    Tüketici erken çıkarsa bekleyen istekler iptal edilir.
+    """
+    if not settings.fal_api_key or not clients.fal_http_client or not prompts:
+        return
+
     # Tutarlılık Anahtarı:
     # Eğer dışarıdan bir seed geldiyse onu kullan, yoksa bir tane üret ve HEPSİNDE onu kullan.
     # Bu sayede "3 farklı görsel" istendiğinde, aynı manken/sahne üzerinde farklı varyasyonlar oluşur.
     current_seed = consist_seed if consist_seed is not None else secrets.randbelow(100_000_000)
 
-    # Kalite için Negatif Prompt (Nelerin olmamasını istiyoruz)
-    negative_prompt = "cartoon, illustration, anime, deformed, distorted, blurry, low quality, pixelated, ugly face, bad hands, extra fingers, text, watermark, signature, cropped, out of frame, weird anatomy, long neck"
-
-    for idx, prompt in enumerate(prompts, 1):
-        try:
-            logger.info(f"🎨 Özel görsel {idx}/{len(prompts)} üretiliyor... (Seed: {current_seed})")
-
-            payload = {
-                "prompt": prompt,
-                "image_size": "portrait_4_3",
-                "num_inference_steps": 50,  # KALİTE: Adım sayısı artırıldı (Detay için)
-                "guidance_scale": 3.0,      # KALİTE: Fotorealizm için ideal aralık
-                "seed": current_seed,       # TUTARLILIK: Sabit seed kullanımı
-                "enable_safety_checker": False,
-                "negative_prompt": negative_prompt
-            }
-
-            # FAL API URL construction
-            # base_url genellikle https://fal.run şeklindedir, model path ise fal-ai/flux/dev
-            # Birleşim: https://fal.run/fal-ai/flux/dev
-            fal_url = f"{settings.fal_base_url.rstrip('/')}/{settings.fal_model_path.lstrip('/')}"
-
-            res = requests.post(
-                fal_url,
-                headers=headers,
-                json=payload,
-                timeout=60 # Timeout biraz artırıldı
-            )
-            if res.status_code == 200:
-                img_url = res.json().get("images", [{}])[0].get("url")
-                results.append({"url": img_url, "prompt": prompt, "seed": current_seed})
-                logger.info(f"✅ Özel görsel {idx} başarıyla üretildi")
-            else:
-                logger.error(f"❌ HTTP {res.status_code}: {res.text}")
-                results.append({"url": None, "prompt": prompt, "seed": current_seed})
-        except Exception as e:
-            logger.error(f"❌ Özel görsel hatası: {e}")
-            results.append({"url": None, "prompt": prompt, "seed": current_seed})
-
-    return results
\ No newline at end of file
+    async def run(idx: int, prompt: str) -> Tuple[int, Dict[str, Any]]:
+        return idx, await _generate_one_image(idx, len(prompts), prompt, current_seed)
+
+    tasks = [asyncio.create_task(run(idx, prompt)) for idx, prompt in enumerate(prompts)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def generate_custom_images(prompts: List[str], consist_seed: Optional[int] = None,
+                                 on_image: Optional[ImageCallback] = None) -> List[Dict[str, Any]]:
+    """
+    Verilen prompt listesi için FAL AI'dan görselleri eşzamanlı üretir.
+    Tutarlılık için: Eğer consist_seed verilirse TÜM görsellerde aynısını kullanır.
+    on_image verilirse her görsel bittiğinde (bitiş sırasıyla) çağrılır; dönen liste prompt sırasındadır.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+    async for idx, result in iter_custom_images(prompts, consist_seed):
+        results[idx] = result
+        if on_image:
+            await on_image(idx, result)
+    return [r for r in results if r is not None]
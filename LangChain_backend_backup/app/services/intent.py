@@ -1,12 +1,18 @@
 """
 Intent Analysis - Kullanıcı niyet analizi ve sohbet yönetimi
 """
+import asyncio
 import json
 import logging
+import random
 from typing import List, Dict
 from datetime import datetime
 import locale
-from .clients import openai_client
+from app.core.config import settings
+from .clients import openai_client, chat_completion, stream_chat_completion
+from .cache import intent_cache
+from .intent_classifier import classify_locally, log_llm_intent
+from .executors import log_executor, run_in
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +24,25 @@ except:
     except Exception as e:
         logger.warning(f"Locale setting error: {e}")
 
-def analyze_user_intent(message: str, chat_history: List[Dict[str, str]] = []) -> str:
-    """Kullanıcı mesajının niyetini analiz eder"""
-    if not openai_client:
-        return "MARKET_RESEARCH"
+def _normalize_intent(raw: str) -> str:
+    """LLM çıktısını beş kategoriden birine eşler."""
+    intent = raw.strip().upper()
+    if "MODIFICATION" in intent: return "IMAGE_MODIFICATION"
+    if "IMAGE" in intent and "GENERATION" in intent: return "IMAGE_GENERATION"
+    if "IMAGE" in intent: return "IMAGE_GENERATION"
+    if "MARKET" in intent: return "MARKET_RESEARCH"
+    if "FOLLOW" in intent: return "FOLLOW_UP"
+    if "GENERAL" in intent: return "GENERAL_CHAT"
+    return "GENERAL_CHAT"  # Güvenli varsayılan: sohbet et, rapor üretme
 
+
+def _history_text(chat_history: List[Dict[str, str]]) -> str:
     recent_history = chat_history[-10:] if chat_history else []  # 10 mesaj bağlam
-    history_text = json.dumps(recent_history, ensure_ascii=False)
+    return json.dumps(recent_history, ensure_ascii=False)
+
 
+async def _llm_intent(message: str, history_text: str) -> str:
+    """GPT-4o ile niyet sınıflandırma (hata çağırana bırakılır)."""
     # --- GÜNCELLEME: Daha akıllı niyet sınıflandırma ---
     system_prompt = f"""
     You are an intent classifier for a Fashion AI assistant.
@@ -65,22 +82,64 @@ def analyze_user_intent(message: str, chat_history: List[Dict[str, str]] = []) -
     OUTPUT: Return ONLY one category name.
     """
 
+    response = await chat_completion(
+        model="gpt-4o",
+        messages=[{"role": "system", "content": system_prompt}],
+        temperature=0.0,
+        max_tokens=20
+    )
+    return _normalize_intent(response.choices[0].message.content)
+
+
+# Arka planda çalışan gölge etiket görevleri (çöp toplayıcı erken silmesin)
+_shadow_tasks: set = set()
+
+
+async def _shadow_label(message: str, chat_history: List[Dict[str, str]], local: tuple) -> None:
+    """Yerelde karar verilen mesajı LLM'e de sorar ve iki kararı yan yana kaydeder (yanıtı bekletmez)."""
+    history_text = _history_text(chat_history)
+    cache_key = (message.strip(), history_text)
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": system_prompt}],
-            temperature=0.0,
-            max_tokens=20
-        )
-        intent = response.choices[0].message.content.strip().upper()
-
-        if "MODIFICATION" in intent: return "IMAGE_MODIFICATION"
-        if "IMAGE" in intent and "GENERATION" in intent: return "IMAGE_GENERATION"
-        if "IMAGE" in intent: return "IMAGE_GENERATION"
-        if "MARKET" in intent: return "MARKET_RESEARCH"
-        if "FOLLOW" in intent: return "FOLLOW_UP"
-        if "GENERAL" in intent: return "GENERAL_CHAT"
-        return "GENERAL_CHAT"  # Güvenli varsayılan: sohbet et, rapor üretme
+        intent = intent_cache.get(cache_key)
+        if intent is None:
+            intent = await _llm_intent(message, history_text)
+            intent_cache.set(cache_key, intent)
+    except Exception as e:
+        logger.warning(f"Gölge niyet etiketi alınamadı: {e}")
+        return
+    if intent != local[0]:
+        logger.info(f"🔍 Gölge etiket uyuşmazlığı ({local[2]}): yerel {local[0]} / LLM {intent}")
+    await run_in(log_executor, log_llm_intent, message, chat_history, intent, local)
+
+
+async def analyze_user_intent(message: str, chat_history: List[Dict[str, str]] = []) -> str:
+    """Kullanıcı mesajının niyetini analiz eder (önce yerel sınıflandırıcı, emin değilse LLM)"""
+    local = classify_locally(message, chat_history)
+    if local:
+        intent, confidence, source = local
+        logger.info(f"⚡ Yerel niyet ({source}, güven {confidence:.2f}): {intent}")
+        # Yerel kararların bir örneklemi LLM etiketiyle karşılaştırılmak üzere kaydedilir
+        if openai_client and random.random() < settings.intent_shadow_sample_rate:
+            task = asyncio.create_task(_shadow_label(message, list(chat_history), local))
+            _shadow_tasks.add(task)
+            task.add_done_callback(_shadow_tasks.discard)
+        return intent
+
+    if not openai_client:
+        return "MARKET_RESEARCH"
+
+    history_text = _history_text(chat_history)
+    cache_key = (message.strip(), history_text)
+    cached = intent_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        intent = await _llm_intent(message, history_text)
+        intent_cache.set(cache_key, intent)
+        # LLM etiketleri yerel modelin eğitim / değerlendirme verisi
+        await run_in(log_executor, log_llm_intent, message, chat_history, intent)
+        return intent
     except Exception as e:
         logger.error(f"Niyet analizi hatası: {e}")
         return "GENERAL_CHAT"  # Hata durumunda da güvenli varsayılan
@@ -124,7 +183,7 @@ async def handle_general_chat(message: str, chat_history: List[Dict[str, str]] =
             Return ONLY "SEARCH" or "NO".
             """
             
-            decision = openai_client.chat.completions.create(
+            decision = await chat_completion(
                 model="gpt-4o",
                 messages=[{"role": "user", "content": search_decision_prompt}],
                 temperature=0.0,
@@ -162,7 +221,7 @@ async def handle_general_chat(message: str, chat_history: List[Dict[str, str]] =
                 """
                 
                 try:
-                    q_response = openai_client.chat.completions.create(
+                    q_response = await chat_completion(
                         model="gpt-4o",
                         messages=[{"role": "user", "content": query_gen_prompt}],
                         temperature=0.0,
@@ -175,7 +234,7 @@ async def handle_general_chat(message: str, chat_history: List[Dict[str, str]] =
                     search_query = message
 
             # 2. Tavily ile ara
-            search_result = tavily_client.search(
+            search_result = await tavily_client.search(
                 query=search_query,
                 search_depth="advanced",
                 max_results=5
@@ -268,23 +327,20 @@ Now respond to the user naturally, maintaining conversation context."""
     try:
         if stream_callback:
             # Streaming yanıt
-            response_stream = openai_client.chat.completions.create(
+            full_content = ""
+            async for chunk in stream_chat_completion(
                 model="gpt-4o",
                 messages=messages,
-                temperature=0.7,
-                stream=True
-            )
-            
-            full_content = ""
-            for chunk in response_stream:
-                if chunk.choices[0].delta.content:
+                temperature=0.7
+            ):
+                if chunk.choices and chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
                     full_content += content
                     await stream_callback(content)
             return full_content
         else:
             # Normal yanıt
-            response = openai_client.chat.completions.create(
+            response = await chat_completion(
                 model="gpt-4o",
                 messages=messages,
                 temperature=0.7
@@ -295,7 +351,7 @@ Now respond to the user naturally, maintaining conversation context."""
         return "Üzgünüm, şu an yanıt veremiyorum."
 
 
-async def handle_follow_up(message: str, chat_history: List[Dict[str, str]]) -> str:
+async def handle_follow_up(message: str, chat_history: List[Dict[str, str]], stream_callback=None) -> str:
     """Takip mesajlarını işler"""
     if not openai_client:
         return "Sistem hatası."
@@ -316,7 +372,15 @@ async def handle_follow_up(message: str, chat_history: List[Dict[str, str]]) ->
     messages.append({"role": "user", "content": message})
 
     try:
-        response = openai_client.chat.completions.create(
+        if stream_callback:
+            full_content = ""
+            async for chunk in stream_chat_completion(model="gpt-4o", messages=messages, temperature=0.7):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    content = chunk.choices[0].delta.content
+                    full_content += content
+                    await stream_callback(content)
+            return full_content
+        response = await chat_completion(
             model="gpt-4o",
             messages=messages,
             temperature=0.7
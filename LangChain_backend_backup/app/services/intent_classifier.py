@@ -0,0 +1,364 @@
+"""
+Local Intent Classifier - analyze_user_intent önündeki hızlı yerel sınıflandırma
+1. Kural tabanlı kısa yollar: selamlaşma, Türkçe soru ekleri, açık çizim fiilleri
+2. Karakter n-gram TF-IDF + lineer (softmax) model; LLM etiketli kayıtlardan eğitilir
+Yerel güven INTENT_LOCAL_THRESHOLD altındaysa LLM'e gidilir; LLM kararları yeniden eğitim için kaydedilir.
+Yerelde karar verilen mesajların INTENT_SHADOW_SAMPLE_RATE kadarı da LLM'e sorulur (gölge etiket); kayıtta
+yerel karar LLM etiketinin yanında durur, böylece kural/model doğruluğu canlı trafikte ölçülebilir.
+
+Eğitim:      python -m app.services.intent_classifier train
+Değerlendirme: python tests/eval_intent_classifier.py
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ["IMAGE_MODIFICATION", "IMAGE_GENERATION", "MARKET_RESEARCH", "FOLLOW_UP", "GENERAL_CHAT"]
+
+
+# --- 1. KURAL TABANLI KISA YOLLAR ---
+
+GREETINGS = {
+    "selam", "merhaba", "slm", "mrb", "naber", "nasılsın", "günaydın", "iyi akşamlar",
+    "iyi geceler", "hey", "hi", "hello", "selamlar", "teşekkürler", "teşekkür ederim", "sağol", "chat",
+}
+# Sistem promptundaki GENERAL_CHAT ifadeleri
+GENERAL_PHRASES = (
+    "konuşalım mı", "ne dersin", "isteklerime göre", "sana göre",
+    "nasıl çalışıyorsun", "ne yapabilirsin", "sen kimsin",
+)
+QUESTION_SUFFIX = re.compile(r"\b(mı|mi|mu|mü)\s*\?\s*$")
+# Emir / rica kipleri ("tasarlanmış" gibi sıfat-fiiller eşleşmez)
+DRAW_VERBS = re.compile(
+    r"\b(çiz|çizer|çizsene|çizin|çizebilir\w*|tasarla|tasarlar|tasarlasana|tasarlayın|tasarlayabilir\w*|draw)\b"
+    r"|\b(görsel|resim|fotoğraf)\w*\s+(üret|oluştur)(\b|ur|ir|sene|ebilir)"
+)
+MODIFICATION_CUES = re.compile(
+    r"\b(aynısından|aynısını|tekrar|yeniden|farklı açı\w*|bunu|şunu|daha)\b"
+)
+
+
+def normalize_text(text: str) -> str:
+    """Türkçe büyük I/İ harflerini doğru küçültür, boşlukları sadeleştirir."""
+    text = (text or "").replace("I", "ı").replace("İ", "i").lower()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _last_ai_content(chat_history: Sequence[Dict[str, str]]) -> str:
+    for msg in reversed(chat_history or []):
+        if msg.get("role") == "assistant" or msg.get("sender") == "ai":
+            return msg.get("content") or ""
+    return ""
+
+
+def history_flags(chat_history: Sequence[Dict[str, str]]) -> List[str]:
+    """Geçmişi modele özellik olarak taşıyan sözde kelimeler (FOLLOW_UP / MODIFICATION geçmişe bağlıdır)."""
+    last_ai = _last_ai_content(chat_history)
+    flags = []
+    if not chat_history:
+        flags.append("__hist_empty__")
+    if "![" in last_ai:
+        flags.append("__hist_image__")
+    if "BÖLÜM" in last_ai or "RAPOR" in last_ai:
+        flags.append("__hist_report__")
+    return flags
+
+
+def rule_intent(message: str, chat_history: Sequence[Dict[str, str]] = ()) -> Optional[str]:
+    """Açık durumlar için kural tabanlı niyet; emin değilse None."""
+    text = normalize_text(message)
+    if not text:
+        return "GENERAL_CHAT"
+
+    bare = text.strip("!?.,; ")
+    if bare in GREETINGS:
+        return "GENERAL_CHAT"
+    if any(phrase in text for phrase in GENERAL_PHRASES):
+        return "GENERAL_CHAT"
+
+    if DRAW_VERBS.search(text):
+        # Önceki yanıtta görsel varsa ve değişiklik ifadesi geçiyorsa mevcut görsel değiştiriliyor
+        if "![" in _last_ai_content(chat_history) and MODIFICATION_CUES.search(text):
+            return "IMAGE_MODIFICATION"
+        return "IMAGE_GENERATION"
+
+    if QUESTION_SUFFIX.search(text):
+        return "GENERAL_CHAT"
+    return None
+
+
+# --- 2. TF-IDF + LİNEER MODEL ---
+
+def model_text(message: str, chat_history: Sequence[Dict[str, str]] = ()) -> str:
+    """Modelin gördüğü metin: normalize mesaj + geçmiş bayrakları."""
+    return " ".join([normalize_text(message)] + history_flags(chat_history))
+
+
+def _tokens(text: str) -> List[str]:
+    """Kelimeler + kelime sınırlı karakter 2-4 gramları (Türkçe ekler için)."""
+    words = text.split()
+    grams = list(words)
+    for word in words:
+        if word.startswith("__"):
+            continue
+        padded = f" {word} "
+        for n in (2, 3, 4):
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+class IntentModel:
+    """
+    Hash'lenmiş TF-IDF özellikleri üzerinde çok sınıflı lojistik regresyon (saf NumPy, seyrek CSR).
+    predict() (etiket, olasılık) döner.
+    """
+
+    def __init__(self, n_features: int = 1 << 16, labels: Sequence[str] = INTENTS):
+        self.n_features = n_features
+        self.labels = list(labels)
+        self.idf = np.ones(n_features, dtype=np.float32)
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def _hash_counts(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Metinleri CSR (indptr, indices, sayım) dizilerine çevirir."""
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[float] = []
+        for text in texts:
+            row: Dict[int, float] = {}
+            for gram in _tokens(text):
+                idx = zlib.crc32(gram.encode("utf-8")) % self.n_features
+                row[idx] = row.get(idx, 0.0) + 1.0
+            indices.extend(row.keys())
+            counts.extend(row.values())
+            indptr.append(len(indices))
+        return (np.asarray(indptr, dtype=np.int64),
+                np.asarray(indices, dtype=np.int64),
+                np.asarray(counts, dtype=np.float32))
+
+    def featurize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sublinear TF * IDF, satır başına L2 normalize."""
+        indptr, indices, counts = self._hash_counts(texts)
+        values = (1.0 + np.log(counts)) * self.idf[indices]
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(indptr) - 1))
+        values = values / np.maximum(norms[rows], 1e-12)
+        return indptr, indices, values.astype(np.float32)
+
+    def _scores(self, X) -> np.ndarray:
+        indptr, indices, values = X
+        n = len(indptr) - 1
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        contrib = self.weights[indices] * values[:, None]
+        scores = np.stack([
+            np.bincount(rows, weights=contrib[:, k], minlength=n) for k in range(len(self.labels))
+        ], axis=1)
+        return (scores + self.bias).astype(np.float32)
+
+    @staticmethod
+    def _softmax(scores: np.ndarray) -> np.ndarray:
+        scores = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 300,
+            lr: float = 1.0, l2: float = 1e-4, sample_weight: Optional[Sequence[float]] = None) -> "IntentModel":
+        # IDF: log((1 + n) / (1 + df)) + 1
+        indptr, indices, _ = self._hash_counts(texts)
+        df = np.bincount(indices, minlength=self.n_features)
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+        X = self.featurize(texts)
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        y = np.array([label_index[label] for label in labels])
+        targets = np.eye(len(self.labels), dtype=np.float32)[y]
+        indptr, indices, values = X
+        rows = np.repeat(np.arange(len(y)), np.diff(indptr))
+        if sample_weight is None:
+            sample_weight = np.ones(len(y), dtype=np.float32)
+        sample_weight = np.asarray(sample_weight, dtype=np.float32)
+        sample_weight = (sample_weight / sample_weight.sum())[:, None]
+
+        self.weights[:] = 0
+        self.bias[:] = 0
+        # Tam batch gradyan inişi (küçük veri; birkaç bin kayıt saniyeler içinde eğitilir)
+        for _ in range(epochs):
+            error = (self._softmax(self._scores(X)) - targets) * sample_weight
+            nnz_error = values[:, None] * error[rows]
+            grad = np.stack([
+                np.bincount(indices, weights=nnz_error[:, k], minlength=self.n_features)
+                for k in range(len(self.labels))
+            ], axis=1).astype(np.float32)
+            self.weights -= lr * (grad + l2 * self.weights)
+            self.bias -= lr * error.sum(axis=0)
+        return self
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return self._softmax(self._scores(self.featurize(texts)))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        proba = self.predict_proba([text])[0]
+        best = int(proba.argmax())
+        return self.labels[best], float(proba[best])
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Yalnızca kullanılan ağırlık satırları saklanır (hash uzayı seyrek)
+        used = np.flatnonzero(np.abs(self.weights).sum(axis=1))
+        np.savez_compressed(
+            path, n_features=self.n_features, labels=np.array(self.labels), idf=self.idf,
+            used=used, weights=self.weights[used], bias=self.bias,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        data = np.load(path)
+        model = cls(int(data["n_features"]), [str(label) for label in data["labels"]])
+        model.idf = data["idf"]
+        model.weights[data["used"]] = data["weights"]
+        model.bias = data["bias"]
+        return model
+
+
+# --- 3. ÇALIŞMA ZAMANI ---
+
+_model: Optional[IntentModel] = None
+_model_mtime: Optional[float] = None
+_log_lock = threading.Lock()
+
+
+def get_local_model() -> Optional[IntentModel]:
+    """Model dosyası varsa yükler (dosya değişince yeniden yükler)."""
+    global _model, _model_mtime
+    try:
+        mtime = os.path.getmtime(settings.intent_model_path)
+    except OSError:
+        return None
+    if _model is None or mtime != _model_mtime:
+        try:
+            _model = IntentModel.load(settings.intent_model_path)
+            _model_mtime = mtime
+            logger.info(f"✅ Yerel niyet modeli yüklendi: {settings.intent_model_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Yerel niyet modeli yüklenemedi: {e}")
+            return None
+    return _model
+
+
+def classify_locally(message: str, chat_history: Sequence[Dict[str, str]] = ()) -> Optional[Tuple[str, float, str]]:
+    """
+    (niyet, güven, kaynak) döner; kaynak "rule" veya "model".
+    Kurallar eşleşmez ve model eşik altında kalırsa None (LLM'e gidilmeli).
+    """
+    if not settings.intent_local_enabled:
+        return None
+    intent = rule_intent(message, chat_history)
+    if intent:
+        return intent, 1.0, "rule"
+    model = get_local_model()
+    if model is None:
+        return None
+    intent, confidence = model.predict(model_text(message, chat_history))
+    if confidence >= settings.intent_local_threshold:
+        return intent, confidence, "model"
+    return None
+
+
+def log_llm_intent(message: str, chat_history: Sequence[Dict[str, str]], intent: str,
+                   local: Optional[Tuple[str, float, str]] = None) -> None:
+    """
+    LLM'in verdiği etiketi eğitim/değerlendirme kaydına ekler (JSONL).
+    local verilirse (gölge etiket) yerel karar, kaynağı ve örnekleme oranı da yazılır.
+    """
+    if not settings.intent_log_path:
+        return
+    record = {
+        "message": message,
+        "history_flags": history_flags(chat_history),
+        "intent": intent,
+        "source": "llm",
+        "created_at": datetime.now().isoformat(),
+    }
+    if local:
+        local_intent, confidence, source = local
+        record.update(
+            source=source,
+            local_intent=local_intent,
+            local_confidence=round(float(confidence), 4),
+            sample_rate=settings.intent_shadow_sample_rate,
+        )
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(settings.intent_log_path) or ".", exist_ok=True)
+            with open(settings.intent_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Niyet kaydı yazılamadı: {e}")
+
+
+def load_intent_log(path: str) -> List[Dict[str, object]]:
+    """Kayıttaki geçerli satırları okur (bilinmeyen etiketler atlanır)."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("intent") in INTENTS and record.get("message"):
+                records.append(record)
+    return records
+
+
+def record_text(record: Dict[str, object]) -> str:
+    """Kayıttan model metni (model_text ile aynı biçim)."""
+    return " ".join([normalize_text(record["message"])] + list(record.get("history_flags") or []))
+
+
+def record_weight(record: Dict[str, object]) -> float:
+    """
+    Kaydın trafikteki ağırlığı: gölge kayıtlar yerel kararların yalnızca örneklemi olduğundan 1 / örnekleme oranı.
+    Böylece eğitim ve değerlendirme, LLM'e düşen zor vakalara kaymaz.
+    """
+    rate = record.get("sample_rate")
+    return 1.0 / float(rate) if rate else 1.0
+
+
+def train_from_log(log_path: str, model_path: str, **fit_kwargs) -> IntentModel:
+    records = load_intent_log(log_path)
+    if not records:
+        raise ValueError(f"Eğitim verisi yok: {log_path}")
+    model = IntentModel().fit(
+        [record_text(r) for r in records], [r["intent"] for r in records],
+        sample_weight=[record_weight(r) for r in records], **fit_kwargs,
+    )
+    model.save(model_path)
+    logger.info(f"✅ Niyet modeli {len(records)} kayıtla eğitildi: {model_path}")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel niyet sınıflandırıcı")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="LLM etiket kaydından modeli eğit")
+    train.add_argument("--log", default=settings.intent_log_path)
+    train.add_argument("--out", default=settings.intent_model_path)
+    train.add_argument("--epochs", type=int, default=300)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    train_from_log(args.log, args.out, epochs=args.epochs)
+    print(f"Model kaydedildi: {args.out}")
@@ -4,9 +4,30 @@ Metrik ve skor hesaplama formülleri.
 Tüm iş mantığı formülleri bu servis içinde tutulur.
 """
 import math
-from typing import Optional
+from typing import Any, Dict, Mapping, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
+# Batch fonksiyonlarının kabul ettiği girdi: liste, NumPy dizisi veya pandas Series
+ArrayLike = Any
+
+
+def as_float_array(values: ArrayLike, fill: Optional[float] = None) -> np.ndarray:
+    """
+    Girdiyi float64 diziye çevirir; None değerler NaN olur.
+    fill verilirse NaN'lar bu değerle doldurulur (skaler fonksiyonlardaki `or 0` karşılığı).
+    """
+    array = np.asarray(values, dtype=np.float64)
+    if fill is not None:
+        array = np.where(np.isnan(array), fill, array)
+    return array
+
+
+def to_optional_list(values: np.ndarray) -> list:
+    """Batch sonucunu Python listesine çevirir; NaN -> None (skaler fonksiyonların None dönüşü)."""
+    return [None if math.isnan(v) else v for v in values.tolist()]
+
 
 @dataclass
 class VelocityWeights:
@@ -222,5 +243,111 @@ class MetricsService:
         return (len(available_sizes) / total_sizes) * 100
 
 
+    # ==================== BATCH (NumPy) ====================
+    # Skaler fonksiyonlarla aynı formüller, sütun dizileri üzerinde.
+    # Skalerin None döndüğü satırlar NaN olarak döner (to_optional_list ile None'a çevrilir).
+    # Sayaç girdilerindeki None/NaN 0 kabul edilir (çağıran yerlerdeki `or 0` davranışı).
+
+    def calculate_velocity_scores(
+        self,
+        basket_count: ArrayLike,
+        favorite_count: ArrayLike,
+        view_count: ArrayLike,
+        use_log_scale: bool = False
+    ) -> np.ndarray:
+        """calculate_velocity_score'un dizi karşılığı."""
+        w = self.velocity_weights
+        basket = as_float_array(basket_count, fill=0)
+        favorite = as_float_array(favorite_count, fill=0)
+        view = as_float_array(view_count, fill=0)
+
+        if use_log_scale:
+            return np.log1p(basket) * w.basket + np.log1p(favorite) * w.favorite + np.log1p(view) * w.view
+        return basket * w.basket + favorite * w.favorite + view * w.view
+
+    def calculate_discount_rates(
+        self,
+        original_price: ArrayLike,
+        discounted_price: ArrayLike
+    ) -> np.ndarray:
+        """calculate_discount_rate'in dizi karşılığı (fiyat yok/0 veya orijinal <= 0 ise NaN)."""
+        original = as_float_array(original_price)
+        discounted = as_float_array(discounted_price)
+        missing = np.isnan(original) | np.isnan(discounted) | (original == 0) | (discounted == 0) | (original <= 0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = np.where(discounted >= original, 0.0, (original - discounted) / original * 100)
+        return np.where(missing, np.nan, rates)
+
+    def calculate_engagement_scores(
+        self,
+        rating: ArrayLike,
+        review_count: ArrayLike,
+        qa_count: ArrayLike,
+        favorite_count: ArrayLike
+    ) -> np.ndarray:
+        """calculate_engagement_score'un dizi karşılığı (puan yoksa 0 kabul edilir)."""
+        return (
+            as_float_array(rating, fill=0) * 20 +
+            np.log1p(as_float_array(review_count, fill=0)) * 10 +
+            np.log1p(as_float_array(qa_count, fill=0)) * 5 +
+            np.log1p(as_float_array(favorite_count, fill=0)) * 5
+        )
+
+    def calculate_trend_scores(
+        self,
+        velocity_score: ArrayLike,
+        rating: ArrayLike,
+        review_growth_rate: ArrayLike
+    ) -> np.ndarray:
+        """calculate_trend_score'un dizi karşılığı (puan yoksa veya 0 ise 3 kabul edilir; skalerdeki `rating or 3`)."""
+        w = self.trend_weights
+        velocity_norm = np.minimum(np.log1p(as_float_array(velocity_score, fill=0)) * 5, 100)
+        ratings = as_float_array(rating, fill=3)
+        rating_norm = (np.where(ratings == 0, 3, ratings) - 1) * 25
+        growth_norm = np.minimum(as_float_array(review_growth_rate, fill=0), 100)
+
+        return (
+            velocity_norm * w.velocity +
+            rating_norm * w.rating +
+            growth_norm * w.review_growth
+        )
+
+    def calculate_price_changes(
+        self,
+        old_price: ArrayLike,
+        new_price: ArrayLike
+    ) -> np.ndarray:
+        """calculate_price_change'in dizi karşılığı (fiyat yok/0 veya eski <= 0 ise NaN)."""
+        old = as_float_array(old_price)
+        new = as_float_array(new_price)
+        missing = np.isnan(old) | np.isnan(new) | (old == 0) | (new == 0) | (old <= 0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            changes = (new - old) / old * 100
+        return np.where(missing, np.nan, changes)
+
+    def calculate_metric_scores(self, columns: Mapping[str, ArrayLike]) -> Dict[str, np.ndarray]:
+        """
+        DailyMetric kolon adlarıyla verilen sütunlardan (dict veya DataFrame) anlık skorları hesaplar.
+
+        Beklenen kolonlar: price, discounted_price, cart_count, favorite_count,
+        view_count, avg_rating, rating_count, qa_count
+
+        Returns:
+            dict: discount_rate, engagement_score, popularity_score dizileri
+            (scraper_service._map_scraped_to_daily_metric ile aynı eşleme)
+        """
+        return {
+            "discount_rate": self.calculate_discount_rates(columns["price"], columns["discounted_price"]),
+            "engagement_score": self.calculate_velocity_scores(
+                columns["cart_count"], columns["favorite_count"], columns["view_count"], use_log_scale=True
+            ),
+            "popularity_score": self.calculate_engagement_scores(
+                columns["avg_rating"], columns["rating_count"], columns["qa_count"], columns["favorite_count"]
+            ),
+        }
+
+
 # Singleton instance for easy import
 metrics = MetricsService()
@@ -6,7 +6,8 @@ import json
 import re
 import asyncio
 from typing import List, Dict, Any
-from .clients import tavily_client, openai_client
+from app.core.config import settings
+from .clients import tavily_client, openai_client, chat_completion, stream_chat_completion
 from .image_gen_service import (
     is_quality_fashion_image,
     validate_images_with_vision,
@@ -15,10 +16,34 @@ from .image_gen_service import (
 
 logger = logging.getLogger(__name__)
 
+REPORT_ERROR_TEXT = "Rapor oluşturulurken bir hata meydana geldi."
+
 
 # --- 1. VERİ TOPLAMA FONKSİYONLARI ---
 
-def analyze_runway_trends(topic: str) -> Dict[str, Any]:
+async def _search_all(queries: List[str], label: str, **search_kwargs) -> List[Dict[str, Any]]:
+    """
+    Tüm Tavily sorgularını aynı anda gönderir; zaman aşımı sorgu başına uygulanır.
+    Süresi dolan veya hata veren sorgu atlanır, tamamlananların sonucu korunur.
+    """
+    tasks = [asyncio.create_task(tavily_client.search(query=q, **search_kwargs)) for q in queries]
+    done, pending = await asyncio.wait(tasks, timeout=settings.research_search_timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(f"{label} search: {len(pending)}/{len(tasks)} sorgu {settings.research_search_timeout:.0f}sn içinde bitmedi, atlandı")
+    results = []
+    for task in tasks:
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            logger.warning(f"{label} search error: {task.exception()}")
+            continue
+        results.append(task.result())
+    return results
+
+
+async def analyze_runway_trends(topic: str) -> Dict[str, Any]:
     if not tavily_client: return {"context": "", "runway_images": []}
     logger.info(f"👠 Podyum Analizi: {topic}")
     runway_queries = [
@@ -28,16 +53,11 @@ def analyze_runway_trends(topic: str) -> Dict[str, Any]:
     runway_context = "### RUNWAY DATA ###\n"
     raw_runway_images = []
     try:
-        for q in runway_queries:
-            try:
-                response = tavily_client.search(query=q, search_depth="advanced", include_images=True, max_results=5)
-                for res in response.get('results', []):
-                    runway_context += f"KAYNAK: {res.get('title')}\nURL: {res.get('url')}\nÖZET: {res.get('content', '')[:800]}\n\n"
-                for img in response.get('images', []):
-                    if is_quality_fashion_image(img): raw_runway_images.append(img)
-            except Exception as e:
-                logger.warning(f"Runway search error: {e}")
-                continue
+        for response in await _search_all(runway_queries, "Runway", search_depth="advanced", include_images=True, max_results=5):
+            for res in response.get('results', []):
+                runway_context += f"KAYNAK: {res.get('title')}\nURL: {res.get('url')}\nÖZET: {res.get('content', '')[:800]}\n\n"
+            for img in response.get('images', []):
+                if is_quality_fashion_image(img): raw_runway_images.append(img)
 
         unique = list(set(raw_runway_images))
         return {"context": runway_context, "runway_images": unique[:4]}
@@ -45,20 +65,15 @@ def analyze_runway_trends(topic: str) -> Dict[str, Any]:
         return {"context": f"Hata: {e}", "runway_images": []}
 
 
-def deep_market_research(topic: str) -> Dict[str, Any]:
+async def deep_market_research(topic: str) -> Dict[str, Any]:
     if not tavily_client: return {"context": "", "market_images": []}
     logger.info(f"🔍 Pazar Analizi (Genel): {topic}")
     queries = [f"{topic} 2026 trends consumer behavior", f"{topic} best sellers 2025"]
     context_data = "### MARKET DATA ###\n"
     try:
-        for q in queries:
-            try:
-                res = tavily_client.search(query=q, search_depth="advanced", include_images=False, max_results=3)
-                for r in res.get('results', []):
-                    context_data += f"BAŞLIK: {r.get('title')}\nİÇERİK: {r.get('content')}\n\n"
-            except Exception as e:
-                logger.warning(f"Market search error: {e}")
-                continue
+        for res in await _search_all(queries, "Market", search_depth="advanced", include_images=False, max_results=3):
+            for r in res.get('results', []):
+                context_data += f"BAŞLIK: {r.get('title')}\nİÇERİK: {r.get('content')}\n\n"
         return {"context": context_data, "market_images": []}
     except Exception as e:
         return {"context": str(e), "market_images": []}
@@ -66,7 +81,7 @@ def deep_market_research(topic: str) -> Dict[str, Any]:
 
 # --- 2. AKILLI GÖRSEL VE STİL ÇIKARMA (GÜNCELLENDİ: CONTEXT INJECTION) ---
 
-def extract_visual_search_terms(report_text: str, user_topic: str = "") -> List[Dict[str, str]]:
+async def extract_visual_search_terms(report_text: str, user_topic: str = "") -> List[Dict[str, str]]:
     if not openai_client: return []
 
     match = re.search(r'#{1,3}\s*.*B[ÖO]L[ÜU]M\s*4', report_text, re.IGNORECASE)
@@ -102,7 +117,7 @@ def extract_visual_search_terms(report_text: str, user_topic: str = "") -> List[
     }}
     """
     try:
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o",
             messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": relevant_text}],
             response_format={"type": "json_object"}
@@ -115,7 +130,7 @@ def extract_visual_search_terms(report_text: str, user_topic: str = "") -> List[
 
 # --- 3. NOKTA ATIŞI ARAMA (GÜNCELLENDİ: GARANTİLİ SONUÇ) ---
 
-def find_visual_match_for_model(search_query: str) -> Dict[str, str]:
+async def find_visual_match_for_model(search_query: str) -> Dict[str, str]:
     if not tavily_client: return {}
 
     # GÜNCELLEME 1: Sorguyu "Alışveriş" odaklı yapıyoruz
@@ -123,7 +138,7 @@ def find_visual_match_for_model(search_query: str) -> Dict[str, str]:
 
     try:
         # 1. GENİŞ HAVUZ (Tavily'den görselleri çek)
-        res = tavily_client.search(
+        res = await tavily_client.search(
             query=query,
             search_depth="advanced",
             include_images=True,
@@ -149,8 +164,12 @@ def find_visual_match_for_model(search_query: str) -> Dict[str, str]:
 
         # Adım A: İlk 3 görseli "Sıkı Yapay Zeka Kontrolü"nden geçir.
         # Bu, rengi ve modeli birebir tutan "mükemmel" görseli arar.
-        for img_url in candidates[:3]:
-            if validate_image_content_match(img_url, search_query):
+        # Üç kontrol aynı anda çalışır; aday sırası korunur (ilk uyan seçilir)
+        matches = await asyncio.gather(
+            *(validate_image_content_match(img_url, search_query) for img_url in candidates[:3])
+        )
+        for img_url, is_match in zip(candidates, matches):
+            if is_match:
                 return {"img": img_url, "page": page_url}
 
         # Adım B (YENİ): Eğer yapay zeka hepsini reddettiyse (çok katı davrandıysa),
@@ -169,7 +188,7 @@ def find_visual_match_for_model(search_query: str) -> Dict[str, str]:
 
 # --- 4. RAPORLAMA (GÜNCELLENMİŞ TABLO MANTIĞI) ---
 
-def generate_strategic_report(user_message: str, research_data: str) -> str:
+async def generate_strategic_report(user_message: str, research_data: str, stream_callback=None) -> str:
     if not openai_client: return "OpenAI hatası."
 
     system_prompt = """
@@ -233,15 +252,25 @@ def generate_strategic_report(user_message: str, research_data: str) -> str:
 
     try:
         formatted_prompt = system_prompt.format(user_message=user_message)
-        response = openai_client.chat.completions.create(
+        messages = [
+            {"role": "system", "content": formatted_prompt},
+            {"role": "user", "content": f"VERİ:\n{research_data}"}
+        ]
+        if stream_callback:
+            # Streaming: rapor token token ai_message_chunk ile akar
+            full_content = ""
+            async for chunk in stream_chat_completion(model="gpt-4o", messages=messages, temperature=0.4):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    content = chunk.choices[0].delta.content
+                    full_content += content
+                    await stream_callback(content)
+            return full_content
+        response = await chat_completion(
             model="gpt-4o",
-            messages=[
-                {"role": "system", "content": formatted_prompt},
-                {"role": "user", "content": f"VERİ:\n{research_data}"}
-            ],
+            messages=messages,
             temperature=0.4
         )
         return response.choices[0].message.content
     except Exception as e:
         logger.error(f"Rapor oluşturma hatası: {e}")
-        return "Rapor oluşturulurken bir hata meydana geldi."
\ No newline at end of file
+        return REPORT_ERROR_TEXT
\ No newline at end of file
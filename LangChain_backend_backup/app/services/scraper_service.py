@@ -9,10 +9,11 @@ import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.models import Product, DailyMetric
-from app.services.metrics_service import metrics
+from app.services.metrics_service import metrics, to_optional_list
 
 logger = logging.getLogger(__name__)
 
@@ -87,8 +88,8 @@ class TrendyolScraperService:
             "attributes": attributes,
         }
 
-    def _map_scraped_to_daily_metric(self, scraped: dict, previous_metric: Optional[DailyMetric] = None) -> dict:
-        """Scraper verisini DailyMetric model alanlarına eşler."""
+    def _parse_scraped_metrics(self, scraped: dict) -> dict:
+        """Scraper verisinden ham metrikleri DailyMetric kolon adlarıyla çıkarır."""
         # Parse fiyatlar
         try:
             price = float(scraped.get("Price")) if scraped.get("Price") else None
@@ -100,9 +101,6 @@ class TrendyolScraperService:
         except (ValueError, TypeError):
             discounted_price = None
         
-        # İndirim oranı
-        discount_rate = metrics.calculate_discount_rate(price, discounted_price)
-        
         # Rating
         try:
             avg_rating = float(scraped.get("Rating")) if scraped.get("Rating") else None
@@ -114,33 +112,80 @@ class TrendyolScraperService:
         except (ValueError, TypeError):
             rating_count = 0
         
-        # Ham metrikler
-        cart_count = self._parse_count(scraped.get("BasketCount")) or 0
-        favorite_count = self._parse_count(scraped.get("FavoriteCount")) or 0
-        view_count = self._parse_count(scraped.get("ViewCount")) or 0
-        qa_count = self._parse_qa_count(scraped.get("QACount")) or 0
-        
         # Mevcut beden sayısı
         sizes = scraped.get("Size", [])
-        available_sizes = len(sizes) if isinstance(sizes, list) else 0
-        
-        # ==================== HESAPLANAN SKORLAR ====================
-        
-        # Engagement skoru (anlık)
-        engagement_score = metrics.calculate_velocity_score(
-            basket_count=cart_count,
-            favorite_count=favorite_count,
-            view_count=view_count,
-            use_log_scale=True  # Büyük sayılar için log scale
-        )
         
-        # Popülerlik skoru
-        popularity_score = metrics.calculate_engagement_score(
-            rating=avg_rating,
-            review_count=rating_count,
-            qa_count=qa_count,
-            favorite_count=favorite_count
-        )
+        return {
+            "price": price,
+            "discounted_price": discounted_price,
+            "avg_rating": avg_rating,
+            "rating_count": rating_count,
+            # Ham metrikler
+            "cart_count": self._parse_count(scraped.get("BasketCount")) or 0,
+            "favorite_count": self._parse_count(scraped.get("FavoriteCount")) or 0,
+            "view_count": self._parse_count(scraped.get("ViewCount")) or 0,
+            "qa_count": self._parse_qa_count(scraped.get("QACount")) or 0,
+            "available_sizes": len(sizes) if isinstance(sizes, list) else 0,
+        }
+
+    def _score_metrics(self, raw: dict) -> dict:
+        """Tek ürün için anlık skorlar (indirim oranı, engagement, popülerlik)."""
+        return {
+            # İndirim oranı
+            "discount_rate": metrics.calculate_discount_rate(raw["price"], raw["discounted_price"]),
+            # Engagement skoru (anlık)
+            "engagement_score": metrics.calculate_velocity_score(
+                basket_count=raw["cart_count"],
+                favorite_count=raw["favorite_count"],
+                view_count=raw["view_count"],
+                use_log_scale=True  # Büyük sayılar için log scale
+            ),
+            # Popülerlik skoru
+            "popularity_score": metrics.calculate_engagement_score(
+                rating=raw["avg_rating"],
+                review_count=raw["rating_count"],
+                qa_count=raw["qa_count"],
+                favorite_count=raw["favorite_count"]
+            ),
+        }
+
+    def _prepare_metrics_batch(self, products: list[dict]) -> list[dict]:
+        """
+        Batch'teki tüm ürünlerin ham metriklerini çıkarır ve skorlarını tek seferde
+        (NumPy ile, sütun bazlı) hesaplar. Sonuç _map_scraped_to_daily_metric'e `prepared` olarak verilir.
+        """
+        raws = [self._parse_scraped_metrics(scraped) for scraped in products]
+        if not raws:
+            return []
+        columns = {key: [raw[key] for raw in raws] for key in raws[0]}
+        scores = metrics.calculate_metric_scores(columns)
+        discount_rates = to_optional_list(scores["discount_rate"])
+        engagement_scores = scores["engagement_score"].tolist()
+        popularity_scores = scores["popularity_score"].tolist()
+        return [
+            {
+                **raw,
+                "discount_rate": discount_rates[i],
+                "engagement_score": engagement_scores[i],
+                "popularity_score": popularity_scores[i],
+            }
+            for i, raw in enumerate(raws)
+        ]
+
+    def _map_scraped_to_daily_metric(
+        self,
+        scraped: dict,
+        previous_metric: Optional[DailyMetric] = None,
+        prepared: Optional[dict] = None
+    ) -> dict:
+        """
+        Scraper verisini DailyMetric model alanlarına eşler.
+        prepared: _prepare_metrics_batch çıktısı (verilmezse ürün tek başına parse edilip skorlanır).
+        """
+        if prepared is None:
+            raw = self._parse_scraped_metrics(scraped)
+            prepared = {**raw, **self._score_metrics(raw)}
+        cart_count = prepared["cart_count"]
         
         # ==================== ZAMAN BAZLI METRİKLER ====================
         sales_velocity = None
@@ -171,24 +216,24 @@ class TrendyolScraperService:
         return {
             "recorded_at": datetime.now(timezone.utc),
             # Fiyat
-            "price": price,
-            "discounted_price": discounted_price,
-            "discount_rate": discount_rate,
+            "price": prepared["price"],
+            "discounted_price": prepared["discounted_price"],
+            "discount_rate": prepared["discount_rate"],
             # Stok
             "stock_status": True,
-            "available_sizes": available_sizes,
+            "available_sizes": prepared["available_sizes"],
             # Ham metrikler
             "cart_count": cart_count,
-            "favorite_count": favorite_count,
-            "view_count": view_count,
-            "qa_count": qa_count,
+            "favorite_count": prepared["favorite_count"],
+            "view_count": prepared["view_count"],
+            "qa_count": prepared["qa_count"],
             # Değerlendirmeler
-            "rating_count": rating_count,
-            "avg_rating": avg_rating,
+            "rating_count": prepared["rating_count"],
+            "avg_rating": prepared["avg_rating"],
             # Anlık skorlar
-            "engagement_score": engagement_score,
-            "popularity_score": popularity_score,
-            "velocity_score": engagement_score,  # Geriye uyumluluk
+            "engagement_score": prepared["engagement_score"],
+            "popularity_score": prepared["popularity_score"],
+            "velocity_score": prepared["engagement_score"],  # Geriye uyumluluk
             # Zaman bazlı
             "sales_velocity": sales_velocity,
             "demand_acceleration": demand_acceleration,
@@ -223,12 +268,12 @@ class TrendyolScraperService:
         logger.info(f"Yeni ürün: {product.product_code}")
         return product
 
-    def create_daily_metric(self, product: Product, scraped: dict) -> DailyMetric:
+    def create_daily_metric(self, product: Product, scraped: dict, prepared: Optional[dict] = None) -> DailyMetric:
         """Günlük metrik snapshot'ı oluşturur."""
         # Önceki metriği al (velocity hesabı için)
         previous_metric = self.get_last_metric(product.id)
         
-        metric_data = self._map_scraped_to_daily_metric(scraped, previous_metric)
+        metric_data = self._map_scraped_to_daily_metric(scraped, previous_metric, prepared)
         metric_data["product_id"] = product.id
         
         metric = DailyMetric(**metric_data)
@@ -250,26 +295,154 @@ class TrendyolScraperService:
         
         return metric
 
-    def upsert_product(self, scraped: dict, task_id: Optional[int] = None) -> Tuple[Product, bool]:
+    def upsert_product(
+        self,
+        scraped: dict,
+        task_id: Optional[int] = None,
+        prepared: Optional[dict] = None
+    ) -> Tuple[Product, bool]:
         """Ürün yoksa oluşturur, varsa daily_metric ekler."""
         product_code = str(scraped.get("product_id"))
         existing = self.get_product_by_code(product_code)
         
         if existing:
-            self.create_daily_metric(existing, scraped)
+            self.create_daily_metric(existing, scraped, prepared)
             return existing, False
         else:
             new_product = self.create_product(scraped, task_id)
-            self.create_daily_metric(new_product, scraped)
+            self.create_daily_metric(new_product, scraped, prepared)
             return new_product, True
 
     def process_scraped_batch(self, products: list[dict], task_id: Optional[int] = None) -> dict:
-        """Toplu veri işleme."""
-        stats = {"inserted": 0, "updated": 0, "errors": 0}
+        """
+        Toplu veri işleme (set bazlı):
+        1. Batch'teki ürün kodları için mevcut ürünler tek sorguda,
+        2. bu ürünlerin son metrikleri DISTINCT ON ile tek sorguda okunur,
+        3. velocity/ivme bellekte hesaplanır,
+        4. ürünler INSERT ... ON CONFLICT ile, metrikler çok satırlı INSERT ile yazılır.
+        Batch'te tekrar eden ürün kodlarının eski satırları son satıra birleştirilir ("merged").
+        Toplu yazım başarısız olursa ürün bazlı yola (upsert_product) düşülür.
+        """
+        stats = {"inserted": 0, "updated": 0, "merged": 0, "errors": 0}
+        if not products:
+            return stats
+        
+        try:
+            prepared_batch = self._prepare_metrics_batch(products)
+        except Exception as e:
+            # Parse edilemeyen satır varsa ürün bazlı hesaplamaya düş (hatalı ürün tek başına sayılır)
+            logger.warning(f"Batch skor hesaplanamadı, ürün bazlı devam ediliyor: {e}")
+            return self._process_scraped_rows(products, task_id, [None] * len(products))
+        
+        try:
+            stats = self._write_batch(products, task_id, prepared_batch)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Toplu yazım başarısız, ürün bazlı deneniyor: {e}")
+            return self._process_scraped_rows(products, task_id, prepared_batch)
         
-        for scraped in products:
+        logger.info(f"Batch tamamlandı: {stats}")
+        return stats
+
+    def _write_batch(self, products: list[dict], task_id: Optional[int], prepared_batch: list[dict]) -> dict:
+        """process_scraped_batch'in set bazlı yazımı (commit çağırana aittir)."""
+        stats = {"inserted": 0, "updated": 0, "merged": 0, "errors": 0}
+        
+        # Aynı ürün kodu batch'te tekrar ederse son veri kazanır; önceki tekrarlar yazılmaz, "merged" sayılır
+        latest_by_code: dict[str, tuple[dict, dict]] = {}
+        for scraped, prepared in zip(products, prepared_batch):
+            latest_by_code[str(scraped.get("product_id"))] = (scraped, prepared)
+        codes = list(latest_by_code)
+        
+        # 1) Mevcut ürünler
+        existing = {
+            row.product_code: row
+            for row in self.db.execute(
+                select(Product.id, Product.product_code, Product.avg_sales_velocity)
+                .where(Product.product_code.in_(codes))
+            )
+        }
+        
+        # 2) Son metrikler: ürün başına en yeni satır
+        previous_by_product = {}
+        if existing:
+            previous_by_product = {
+                row.product_id: row
+                for row in self.db.execute(
+                    select(
+                        DailyMetric.product_id, DailyMetric.recorded_at,
+                        DailyMetric.cart_count, DailyMetric.sales_velocity
+                    )
+                    .where(DailyMetric.product_id.in_([row.id for row in existing.values()]))
+                    .distinct(DailyMetric.product_id)
+                    .order_by(DailyMetric.product_id, desc(DailyMetric.recorded_at), desc(DailyMetric.id))
+                )
+            }
+        
+        # 3) Bellekte metrik + ürün özet alanları
+        now = datetime.now(timezone.utc)
+        product_rows = []
+        metric_by_code = {}
+        for code, (scraped, prepared) in latest_by_code.items():
+            current = existing.get(code)
+            previous = previous_by_product.get(current.id) if current else None
+            metric_data = self._map_scraped_to_daily_metric(scraped, previous, prepared)
+            metric_by_code[code] = metric_data
+            
+            avg_sales_velocity = current.avg_sales_velocity if current else None
+            if metric_data.get("sales_velocity") is not None:
+                if avg_sales_velocity:
+                    # Hareketli ortalama
+                    avg_sales_velocity = (avg_sales_velocity + metric_data["sales_velocity"]) / 2
+                else:
+                    avg_sales_velocity = metric_data["sales_velocity"]
+            
+            product_rows.append({
+                **self._map_scraped_to_product(scraped, task_id),
+                "last_price": metric_data.get("price"),
+                "last_discount_rate": metric_data.get("discount_rate"),
+                "last_engagement_score": metric_data.get("engagement_score"),
+                "avg_sales_velocity": avg_sales_velocity,
+                "last_scraped_at": now,
+            })
+        
+        # 4) Ürün upsert: mevcut ürünlerde yalnızca özet alanlar güncellenir (upsert_product ile aynı)
+        stmt = pg_insert(Product).values(product_rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.product_code],
+            set_={
+                "last_price": stmt.excluded.last_price,
+                "last_discount_rate": stmt.excluded.last_discount_rate,
+                "last_engagement_score": stmt.excluded.last_engagement_score,
+                "avg_sales_velocity": stmt.excluded.avg_sales_velocity,
+                "last_scraped_at": stmt.excluded.last_scraped_at,
+            }
+        ).returning(Product.id, Product.product_code)
+        product_ids = {row.product_code: row.id for row in self.db.execute(stmt)}
+        
+        # 5) Metrikler: tek çok satırlı INSERT
+        self.db.execute(insert(DailyMetric), [
+            {**metric_data, "product_id": product_ids[code]}
+            for code, metric_data in metric_by_code.items()
+        ])
+        
+        stats["inserted"] = len(set(codes) - set(existing))
+        stats["updated"] = len(codes) - stats["inserted"]
+        stats["merged"] = len(products) - len(codes)
+        return stats
+
+    def _process_scraped_rows(self, products: list[dict], task_id: Optional[int], prepared_batch: list) -> dict:
+        """
+        Ürün bazlı işleme (hatalı ürünü izole etmek için yedek yol).
+        Her ürün kendi savepoint'inde yazılır; hata yalnızca o ürünün yazımını geri alır.
+        """
+        stats = {"inserted": 0, "updated": 0, "merged": 0, "errors": 0}
+        
+        for scraped, prepared in zip(products, prepared_batch):
             try:
-                product, is_new = self.upsert_product(scraped, task_id)
+                with self.db.begin_nested():
+                    product, is_new = self.upsert_product(scraped, task_id, prepared)
                 if is_new:
                     stats["inserted"] += 1
                 else:
@@ -284,6 +457,66 @@ class TrendyolScraperService:
         
         return stats
 
+    # ==================== RESCORING ====================
+
+    def rescore_daily_metrics(self, chunk_size: int = 50_000) -> int:
+        """
+        Tüm daily_metrics geçmişinin anlık skorlarını (discount_rate, engagement_score,
+        popularity_score) güncel ağırlıklarla yeniden hesaplar. Ağırlık değişikliğinden sonra çalıştırılır.
+        id üzerinden parça parça ilerler; her parça ayrı commit edilir. Güncellenen satır sayısını döner.
+        """
+        columns = [
+            DailyMetric.id, DailyMetric.price, DailyMetric.discounted_price,
+            DailyMetric.cart_count, DailyMetric.favorite_count, DailyMetric.view_count,
+            DailyMetric.avg_rating, DailyMetric.rating_count, DailyMetric.qa_count,
+        ]
+        last_id = 0
+        total = 0
+        while True:
+            rows = self.db.execute(
+                select(*columns).where(DailyMetric.id > last_id).order_by(DailyMetric.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            
+            batch = {column.key: [getattr(row, column.key) for row in rows] for column in columns}
+            scores = metrics.calculate_metric_scores(batch)
+            discount_rates = to_optional_list(scores["discount_rate"])
+            engagement_scores = scores["engagement_score"].tolist()
+            popularity_scores = scores["popularity_score"].tolist()
+            
+            # Birincil anahtarla toplu UPDATE (executemany)
+            self.db.execute(update(DailyMetric), [
+                {
+                    "id": row_id,
+                    "discount_rate": discount_rates[i],
+                    "engagement_score": engagement_scores[i],
+                    "popularity_score": popularity_scores[i],
+                    "velocity_score": engagement_scores[i],  # Geriye uyumluluk
+                }
+                for i, row_id in enumerate(batch["id"])
+            ])
+            self.db.commit()
+            
+            total += len(rows)
+            last_id = batch["id"][-1]
+            logger.info(f"Yeniden skorlama: {total} metrik güncellendi")
+        
+        # Product özet alanlarını son metrikten yenile
+        self.db.execute(text("""
+            UPDATE products p
+            SET last_discount_rate = dm.discount_rate,
+                last_engagement_score = dm.engagement_score
+            FROM (
+                SELECT DISTINCT ON (product_id) product_id, discount_rate, engagement_score
+                FROM daily_metrics
+                ORDER BY product_id, recorded_at DESC, id DESC
+            ) dm
+            WHERE p.id = dm.product_id
+        """))
+        self.db.commit()
+        return total
+
     # ==================== STATISTICS ====================
     
     def get_product_count(self) -> int:
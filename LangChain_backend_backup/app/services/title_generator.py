@@ -3,7 +3,7 @@ AI Title Generator - Automatically generate conversation titles
 """
 import logging
 from typing import Optional
-from .clients import openai_client
+from .clients import openai_client, chat_completion
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +27,7 @@ async def generate_conversation_title(user_message: str) -> str:
     
     try:
         # OpenAI'ye başlık oluşturma isteği gönder
-        response = openai_client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-3.5-turbo",
             messages=[
                 {
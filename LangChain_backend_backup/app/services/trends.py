@@ -1,16 +1,34 @@
 """
 Google Trends Service - SerpApi ile trend analizi
+İstekler paylaşılan async httpx havuzu üzerinden gider (executor / serpapi paketi kullanılmaz).
 """
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from app.core.config import settings
+from . import clients
+from .cache import trends_cache
 
 logger = logging.getLogger(__name__)
 
+SERPAPI_URL = "https://serpapi.com/search.json"
 
-def get_google_trends(keyword: str, timeframe: str = "today 3-m", geo: str = "TR") -> Dict[str, Any]:
+
+async def _serpapi_trends(params: Dict[str, Any], data_type: str) -> Dict[str, Any]:
+    """SerpApi google_trends uç noktasına tek bir async istek (paylaşılan httpx havuzu üzerinden)."""
+    response = await clients.http_client.get(
+        SERPAPI_URL, params={**params, "data_type": data_type}, timeout=settings.serpapi_timeout
+    )
+    data = response.json()
+    if "error" in data:
+        raise RuntimeError(data["error"])
+    response.raise_for_status()
+    return data
+
+
+async def get_google_trends(keyword: str, timeframe: str = "today 3-m", geo: str = "TR") -> Dict[str, Any]:
     """
-    Google Trends verisi çeker.
+    Google Trends verisi çeker (zaman serisi, ilgili aramalar ve bölgesel ilgi istekleri aynı anda gönderilir).
     
     Args:
         keyword: Aranacak kelime (örn: "abiye elbise")
@@ -28,12 +46,12 @@ def get_google_trends(keyword: str, timeframe: str = "today 3-m", geo: str = "TR
     if not settings.serpapi_api_key:
         logger.warning("⚠️ SERPAPI_API_KEY bulunamadı")
         return {"error": "SerpApi API key not configured"}
-    
-    try:
-        from serpapi import GoogleSearch
-    except ImportError:
-        logger.error("❌ serpapi paketi yüklü değil. 'pip install google-search-results' çalıştırın.")
-        return {"error": "serpapi package not installed"}
+
+    cache_key = (keyword.strip().lower(), timeframe, geo)
+    cached = trends_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"♻️ Google Trends önbellekten: {keyword}")
+        return cached
     
     result = {
         "keyword": keyword,
@@ -45,21 +63,22 @@ def get_google_trends(keyword: str, timeframe: str = "today 3-m", geo: str = "TR
     }
     
     try:
-        # 1. Interest Over Time (Zaman Serisi)
         params = {
             "engine": "google_trends",
             "q": keyword,
-            "data_type": "TIMESERIES",
             "date": timeframe,
             "geo": geo,
             "api_key": settings.serpapi_api_key
         }
+        timeseries, related, regions = await asyncio.gather(
+            _serpapi_trends(params, "TIMESERIES"),
+            _serpapi_trends(params, "RELATED_QUERIES"),
+            _serpapi_trends(params, "GEO_MAP"),
+        )
         
-        search = GoogleSearch(params)
-        data = search.get_dict()
-        
-        if "interest_over_time" in data:
-            timeline = data["interest_over_time"].get("timeline_data", [])
+        # 1. Interest Over Time (Zaman Serisi)
+        if "interest_over_time" in timeseries:
+            timeline = timeseries["interest_over_time"].get("timeline_data", [])
             for point in timeline:
                 raw_value = point.get("values", [{}])[0].get("value", 0) if point.get("values") else 0
                 result["interest_over_time"].append({
@@ -68,12 +87,8 @@ def get_google_trends(keyword: str, timeframe: str = "today 3-m", geo: str = "TR
                 })
         
         # 2. Related Queries (İlgili Aramalar)
-        params["data_type"] = "RELATED_QUERIES"
-        search = GoogleSearch(params)
-        data = search.get_dict()
-        
-        if "related_queries" in data:
-            queries = data["related_queries"]
+        if "related_queries" in related:
+            queries = related["related_queries"]
             if queries.get("rising"):
                 result["rising_queries"] = [
                     {"query": q.get("query", ""), "value": str(q.get("value", ""))} 
@@ -86,15 +101,10 @@ def get_google_trends(keyword: str, timeframe: str = "today 3-m", geo: str = "TR
                 ]
         
         # 3. Interest by Region (Bölgesel İlgi)
-        params["data_type"] = "GEO_MAP"
-        search = GoogleSearch(params)
-        data = search.get_dict()
-        
-        if "interest_by_region" in data:
-            regions = data["interest_by_region"]
+        if "interest_by_region" in regions:
             result["interest_by_region"] = [
                 {"location": r.get("location", ""), "value": r.get("value", 0)}
-                for r in regions[:10]
+                for r in regions["interest_by_region"][:10]
             ]
         
         # Özet oluştur
@@ -111,6 +121,7 @@ def get_google_trends(keyword: str, timeframe: str = "today 3-m", geo: str = "TR
                     result["summary"] = f"📉 '{keyword}' aramaları son dönemde %{change:.0f} azaldı."
         
         logger.info(f"✅ Google Trends verisi alındı: {keyword}")
+        trends_cache.set(cache_key, result)
         return result
         
     except Exception as e:
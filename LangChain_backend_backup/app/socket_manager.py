@@ -5,7 +5,7 @@ import logging
 from typing import Optional
 import socketio
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 import asyncio
 from pydantic import ValidationError as PydanticValidationError
 
@@ -13,6 +13,7 @@ from .core.database import get_db
 from .models import Conversation, Message, User
 from .core.config import settings
 from .services.ai_orchestrator import generate_ai_response
+from .services.guest_store import guest_store
 from .schemas.socketio import UserMessageInput, GuestGetConversationInput
 
 logger = logging.getLogger(__name__)
@@ -24,8 +25,7 @@ sio = socketio.AsyncServer(
     engineio_logger=True  # Engine.IO debug için
 )
 
-guest_conversations: dict[str, dict] = {}
-GUEST_DATA_TIMEOUT_MINUTES = 30
+GUEST_CLEANUP_INTERVAL_SECONDS = 60
 
 
 def _create_guest_conversation(guest_id: str, alias: str | None = None) -> dict:
@@ -35,10 +35,35 @@ def _create_guest_conversation(guest_id: str, alias: str | None = None) -> dict:
         "id": conv_id,
         "alias": alias or "Misafir Sohbeti",
         "messages": [],
+        "message_count": 0,
         "last_activity": datetime.now(),
     }
 
 
+def _next_guest_message_id(guest_conv: dict) -> str:
+    """Mesaj listesi sınırda kırpıldığında da tekrar etmeyen mesaj ID'si üretir."""
+    guest_conv["message_count"] = guest_conv.get("message_count", len(guest_conv["messages"])) + 1
+    return f'{guest_conv["id"]}_msg_{guest_conv["message_count"]}'
+
+
+def _stream_callbacks(sid: str, conversation_id):
+    """Yanıt akışı için callback çifti: parçalar ai_message_chunk, yer tutucu düzeltmeleri ai_message_patch ile gider."""
+    async def stream_callback(chunk_content: str):
+        await sio.emit('ai_message_chunk', {
+            'conversation_id': conversation_id,
+            'content': chunk_content
+        }, room=sid)
+
+    async def patch_callback(placeholder: str, content: str):
+        await sio.emit('ai_message_patch', {
+            'conversation_id': conversation_id,
+            'placeholder': placeholder,
+            'content': content
+        }, room=sid)
+
+    return stream_callback, patch_callback
+
+
 async def get_user_from_token(token: Optional[str]) -> Optional[User]:
     """Token'dan kullanıcıyı alır."""
     if not token:
@@ -109,11 +134,10 @@ async def connect(sid, environ, auth):
         })
         # Misafir için ilk conversation oluştur ve listeyi hazırla
         first_conv = _create_guest_conversation(guest_id)
-        guest_conversations[guest_id] = {
+        await guest_store.save(guest_id, {
             "conversations": {first_conv["id"]: first_conv},
             "active_conversation_id": first_conv["id"],
-            "last_activity": datetime.now(),
-        }
+        })
         await sio.emit(
             "guest_conversation_list",
             {
@@ -132,15 +156,15 @@ async def guest_new_conversation(sid):
     """Misafir için yeni bir boş sohbet oluşturur ve aktif yapar."""
     session = await sio.get_session(sid)
     guest_id = session.get("guest_id")
-    if not guest_id or guest_id not in guest_conversations:
+    guest_state = await guest_store.get(guest_id) if guest_id else None
+    if guest_state is None:
         await sio.emit("error", {"message": "Guest session not found"}, room=sid)
         return
 
     new_conv = _create_guest_conversation(guest_id)
-    guest_state = guest_conversations[guest_id]
     guest_state["conversations"][new_conv["id"]] = new_conv
     guest_state["active_conversation_id"] = new_conv["id"]
-    guest_state["last_activity"] = datetime.now()
+    await guest_store.save(guest_id, guest_state)
 
     await sio.emit(
         "guest_conversation_created",
@@ -166,10 +190,10 @@ async def guest_get_conversation(sid, data):
     
     session = await sio.get_session(sid)
     guest_id = session.get("guest_id")
-    if not guest_id or guest_id not in guest_conversations:
+    guest_state = await guest_store.get(guest_id) if guest_id else None
+    if guest_state is None:
         await sio.emit("error", {"message": "Guest session not found"}, room=sid)
         return
-    guest_state = guest_conversations[guest_id]
     conversations = guest_state["conversations"]
 
     if not conv_id or conv_id not in conversations:
@@ -179,7 +203,7 @@ async def guest_get_conversation(sid, data):
     guest_conv = conversations[conv_id]
     guest_state["active_conversation_id"] = conv_id
     guest_conv["last_activity"] = datetime.now()
-    guest_state["last_activity"] = datetime.now()
+    await guest_store.save(guest_id, guest_state)
 
     await sio.emit(
         "guest_conversation_data",
@@ -204,8 +228,7 @@ async def disconnect(sid):
             guest_id = session.get('guest_id')
             if guest_id:
                 # Misafir conversation'ını ve tüm verilerini kalıcı olarak sil
-                if guest_id in guest_conversations:
-                    del guest_conversations[guest_id]
+                if await guest_store.delete(guest_id):
                     logger.info(f"Guest {username} (ID: {guest_id}) disconnected - All data permanently deleted")
                 else:
                     logger.info(f"Guest {username} (ID: {guest_id}) disconnected - No data found to delete")
@@ -241,11 +264,11 @@ async def user_message(sid, data):
     if is_guest:
         # Misafir kullanıcı için işlem
         guest_id = session.get('guest_id')
-        if not guest_id or guest_id not in guest_conversations:
+        guest_state = await guest_store.get(guest_id) if guest_id else None
+        if guest_state is None:
             await sio.emit('error', {'message': 'Guest session not found'}, room=sid)
             return
         
-        guest_state = guest_conversations[guest_id]
         conversations = guest_state["conversations"]
         active_conv_id = guest_state.get("active_conversation_id")
 
@@ -261,12 +284,11 @@ async def user_message(sid, data):
         
         # Son aktivite zamanını güncelle
         guest_conv['last_activity'] = datetime.now()
-        guest_state['last_activity'] = datetime.now()
         guest_state['active_conversation_id'] = conversation_id
         
         # Kullanıcı mesajını memory'ye ekle
         user_msg = {
-            'id': f'{conversation_id}_msg_{len(guest_conv["messages"]) + 1}',
+            'id': _next_guest_message_id(guest_conv),
             'sender': 'user',
             'content': message_text,
             'image_url': image_url,
@@ -290,12 +312,19 @@ async def user_message(sid, data):
                     auto_alias += "..."
                 guest_alias = auto_alias or guest_alias
                 guest_conv['alias'] = guest_alias
+        await guest_store.save(guest_id, guest_state)
         
         # AI yanıtını üret
         try:
             # Görsel üretimi: Kullanıcı butona bastığında veya mesajında istediğinde
             generate_images = validated_data.generate_images
-            ai_response = await generate_ai_response(message_text, generate_images=generate_images)
+            stream_callback, patch_callback = _stream_callbacks(sid, conversation_id)
+            ai_response = await generate_ai_response(
+                message_text,
+                generate_images=generate_images,
+                stream_callback=stream_callback,
+                patch_callback=patch_callback
+            )
             ai_response_text = ai_response['content']
             ai_image_urls = ai_response.get('image_urls', [])
             ai_image_links = ai_response.get('image_links', {})
@@ -310,8 +339,11 @@ async def user_message(sid, data):
         # AI mesajını memory'ye ekle
         ai_image_url_combined = ";".join(ai_image_urls) if ai_image_urls else None
 
+        # Yanıt üretilirken misafir ayrılmış / atılmış olabilir; durumu tekrar oku (Redis'te başka worker da yazmış olabilir)
+        guest_state = await guest_store.get(guest_id)
+        guest_conv = guest_state["conversations"].get(conversation_id) if guest_state else None
         ai_msg = {
-            'id': f'{conversation_id}_msg_{len(guest_conv["messages"]) + 1}',
+            'id': _next_guest_message_id(guest_conv) if guest_conv else f'{conversation_id}_msg_{uuid.uuid4().hex[:8]}',
             'sender': 'ai',
             'content': ai_response_text,
             'image_urls': ai_image_urls,
@@ -319,7 +351,9 @@ async def user_message(sid, data):
             'image_links': ai_image_links,  # Görsel-link eşleştirmesi
             'created_at': datetime.now().isoformat()
         }
-        guest_conv['messages'].append(ai_msg)
+        if guest_conv is not None:
+            guest_conv['messages'].append(ai_msg)
+            await guest_store.save(guest_id, guest_state)
         
         # Kullanıcıya AI yanıtını gönder (tüm görselleri gönder)
         await sio.emit('ai_message', {
@@ -408,12 +442,7 @@ async def user_message(sid, data):
                 "sender": "user"
             })
             
-            # Streaming callback fonksiyonu
-            async def stream_callback(chunk_content):
-                await sio.emit('ai_message_chunk', {
-                    'conversation_id': conversation_id,
-                    'content': chunk_content
-                }, room=sid)
+            stream_callback, patch_callback = _stream_callbacks(sid, conversation_id)
 
             # Görsel üretimi: Kullanıcı butona bastığında veya mesajında istediğinde
             generate_images = validated_data.generate_images
@@ -421,7 +450,8 @@ async def user_message(sid, data):
                 message_text, 
                 chat_history=history,
                 generate_images=generate_images,
-                stream_callback=stream_callback
+                stream_callback=stream_callback,
+                patch_callback=patch_callback
             )
             ai_response_text = ai_response['content']
             ai_image_urls = ai_response.get('image_urls', [])
@@ -518,22 +548,11 @@ async def user_message(sid, data):
 
 
 async def cleanup_old_guest_data():
-    """Eski misafir verilerini otomatik temizler."""
+    """Eski misafir verilerini otomatik temizler (depo aktiviteye göre sıralı; yalnızca süresi dolanlar okunur)."""
     while True:
         try:
-            await asyncio.sleep(300)  # Her 5 dakikada bir kontrol et
-            now = datetime.now()
-            expired_guests = []
-            
-            for guest_id, guest_state in guest_conversations.items():
-                last_activity = guest_state.get('last_activity')
-                if last_activity:
-                    time_diff = now - last_activity
-                    if time_diff > timedelta(minutes=GUEST_DATA_TIMEOUT_MINUTES):
-                        expired_guests.append(guest_id)
-            
-            for guest_id in expired_guests:
-                del guest_conversations[guest_id]
+            await asyncio.sleep(GUEST_CLEANUP_INTERVAL_SECONDS)
+            for guest_id in await guest_store.expire():
                 logger.info(f"Guest data expired and deleted: {guest_id}")
                 
         except Exception as e:
@@ -0,0 +1,33 @@
+"""
+daily_metrics skorlarını güncel ağırlıklarla yeniden hesaplayan yönetim scripti.
+Ağırlık değişikliğinden sonra sunucudan bağımsız çalıştırılır (HTTP isteğine bağlanmaz);
+ilerleme her parçada loglanır, parçalar ayrı commit edilir.
+
+    python rescore_metrics.py --dry-run
+    python rescore_metrics.py --chunk-size 20000
+"""
+import argparse
+import logging
+
+from app.database import SessionLocal
+from app.services.scraper_service import TrendyolScraperService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="daily_metrics skorlarını yeniden hesaplar")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Parça başına satır (her parça ayrı commit)")
+    parser.add_argument("--dry-run", action="store_true", help="Yalnızca etkilenecek satır sayısını yazdır")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    with SessionLocal() as db:
+        service = TrendyolScraperService(db)
+        if args.dry_run:
+            print(f"🔎 Yeniden skorlanacak metrik: {service.get_daily_metric_count()}")
+            return
+        rescored = service.rescore_daily_metrics(chunk_size=args.chunk_size)
+        print(f"✅ Yeniden skorlama tamamlandı: {rescored} metrik")
+
+
+if __name__ == "__main__":
+    main()
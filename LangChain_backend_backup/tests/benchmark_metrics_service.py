@@ -0,0 +1,140 @@
+# benchmark_metrics_service.py
+"""
+MetricsService mikro-benchmark'ı.
+Skaler (satır satır math.log) ve batch (NumPy) hesaplamayı 10k / 100k / 1M satırda karşılaştırır,
+sonuçların aynı olduğunu doğrular (indirim, etkileşim, popülerlik, trend skoru ve fiyat değişimi).
+
+Çalıştırma: python tests/benchmark_metrics_service.py [satır_sayısı ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# LangChain backend path'ini ekle (tests klasöründen bir üst dizin)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.metrics_service import MetricsService, to_optional_list
+
+
+def make_columns(n: int, seed: int = 42) -> dict:
+    """
+    DailyMetric kolon adlarıyla rastgele veri (yaklaşık %5 eksik fiyat/puan, %2 sıfır puan).
+    prev_price ve review_growth trend skoru / fiyat değişimi karşılaştırması içindir.
+    """
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(50, 2000, n).round(2)
+    discounted = (price * rng.uniform(0.5, 1.1, n)).round(2)
+    rating = rng.uniform(1, 5, n).round(1)
+
+    price_list = price.tolist()
+    discounted_list = discounted.tolist()
+    rating_list = rating.tolist()
+    prev_list = (price * rng.uniform(0.8, 1.2, n)).round(2).tolist()
+    for i in rng.choice(n, size=n // 20, replace=False).tolist():
+        price_list[i] = None
+        rating_list[i] = None
+        prev_list[i] = None
+    for i in rng.choice(n, size=n // 50, replace=False).tolist():
+        rating_list[i] = 0.0
+        prev_list[i] = 0.0
+
+    return {
+        "price": price_list,
+        "discounted_price": discounted_list,
+        "avg_rating": rating_list,
+        "cart_count": rng.integers(0, 50_000, n).tolist(),
+        "favorite_count": rng.integers(0, 200_000, n).tolist(),
+        "view_count": rng.integers(0, 500_000, n).tolist(),
+        "rating_count": rng.integers(0, 20_000, n).tolist(),
+        "qa_count": rng.integers(0, 500, n).tolist(),
+        "prev_price": prev_list,
+        "review_growth": rng.uniform(-20, 150, n).round(2).tolist(),
+    }
+
+
+def score_scalar(service: MetricsService, columns: dict) -> dict:
+    """scraper_service'in önceki yolu: her satır için skaler fonksiyonlar."""
+    discount, engagement, popularity, trend, price_change = [], [], [], [], []
+    for i in range(len(columns["price"])):
+        discount.append(service.calculate_discount_rate(columns["price"][i], columns["discounted_price"][i]))
+        engagement.append(service.calculate_velocity_score(
+            basket_count=columns["cart_count"][i],
+            favorite_count=columns["favorite_count"][i],
+            view_count=columns["view_count"][i],
+            use_log_scale=True,
+        ))
+        popularity.append(service.calculate_engagement_score(
+            rating=columns["avg_rating"][i],
+            review_count=columns["rating_count"][i],
+            qa_count=columns["qa_count"][i],
+            favorite_count=columns["favorite_count"][i],
+        ))
+        trend.append(service.calculate_trend_score(
+            velocity_score=engagement[-1],
+            rating=columns["avg_rating"][i],
+            review_growth_rate=columns["review_growth"][i],
+        ))
+        price_change.append(service.calculate_price_change(columns["prev_price"][i], columns["price"][i]))
+    return {"discount_rate": discount, "engagement_score": engagement, "popularity_score": popularity,
+            "trend_score": trend, "price_change": price_change}
+
+
+def score_batch(service: MetricsService, columns: dict) -> dict:
+    """Skaler yolun batch karşılığı: anlık skorlar + trend skoru + fiyat değişimi."""
+    scores = service.calculate_metric_scores(columns)
+    scores["trend_score"] = service.calculate_trend_scores(
+        scores["engagement_score"], columns["avg_rating"], columns["review_growth"]
+    )
+    scores["price_change"] = service.calculate_price_changes(columns["prev_price"], columns["price"])
+    return scores
+
+
+def assert_same(scalar: dict, batch: dict):
+    """Batch sonucunun skaler sonuçla aynı olduğunu (None dahil) doğrular."""
+    for key, expected in scalar.items():
+        actual = to_optional_list(batch[key])
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            if e is None or a is None:
+                assert a is None and e is None, f"{key}[{i}]: {a} != {e}"
+            else:
+                assert abs(a - e) <= 1e-9 * max(1.0, abs(e)), f"{key}[{i}]: {a} != {e}"
+
+
+def run_benchmark(sizes=(10_000, 100_000, 1_000_000)):
+    service = MetricsService()
+    print("=" * 80)
+    print("METRICS SERVICE BENCHMARK (skaler vs NumPy batch)")
+    print("=" * 80)
+    # Batch (liste): Python listelerinden; Batch (dizi): hazır float dizilerden (DataFrame / read_sql çıktısı gibi)
+    print(f"{'Satır':>10} | {'Skaler (sn)':>12} | {'Batch liste':>12} | {'Batch dizi':>12} | {'Hızlanma':>9}")
+    print("-" * 80)
+
+    for n in sizes:
+        columns = make_columns(n)
+
+        started = time.perf_counter()
+        scalar = score_scalar(service, columns)
+        scalar_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch = score_batch(service, columns)
+        batch_seconds = time.perf_counter() - started
+
+        arrays = {key: np.asarray(values, dtype=np.float64) for key, values in columns.items()}
+        started = time.perf_counter()
+        score_batch(service, arrays)
+        array_seconds = time.perf_counter() - started
+
+        assert_same(scalar, batch)
+        print(f"{n:>10,} | {scalar_seconds:>12.3f} | {batch_seconds:>12.3f} | {array_seconds:>12.3f} | "
+              f"{scalar_seconds / batch_seconds:>4.1f}x / {scalar_seconds / array_seconds:.0f}x")
+
+    print("=" * 80)
+    print("✓ Batch sonuçları skaler sonuçlarla aynı")
+
+
+if __name__ == "__main__":
+    sizes = tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000)
+    run_benchmark(sizes)
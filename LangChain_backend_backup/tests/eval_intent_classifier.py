@@ -0,0 +1,130 @@
+# eval_intent_classifier.py
+"""
+Yerel niyet sınıflandırıcının çevrimdışı değerlendirmesi.
+LLM etiket kaydını (INTENT_LOG_PATH, JSONL) okur:
+- Canlı gölge etiketleri: yerelde karar verilen mesajların örneklemi üzerinde kural ve modelin
+  kayıt anındaki kararının LLM etiketiyle uyumu
+Ardından kaydı karıştırıp eğitim/test olarak böler, test kısmında LLM etiketlerine göre doğruluğu raporlar.
+Gölge kayıtlar 1 / örnekleme oranı ağırlığı alır; oranlar trafikteki dağılımı yansıtır (LLM'e düşen zor vakalara kaymaz):
+- Kurallar: kapsama ve doğruluk
+- Model: tüm test kümesinde doğruluk ve sınıf bazında doğruluk
+- Kural + model hattı: eşik başına yerelde karar verilen oran ve o kısımdaki doğruluk
+
+Çalıştırma: python tests/eval_intent_classifier.py [--log data/intent_log.jsonl] [--test-ratio 0.2]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+# LangChain backend path'ini ekle (tests klasöründen bir üst dizin)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.services.intent_classifier import (
+    INTENTS, IntentModel, load_intent_log, record_text, record_weight, rule_intent,
+)
+
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95)
+
+
+def rule_for_record(record: dict):
+    """Kayıtta tam geçmiş yok; geçmiş bayrağından kuralın göreceği son AI mesajını canlandırır."""
+    history = [{"role": "assistant", "content": "![görsel](x)"}] if "__hist_image__" in (record.get("history_flags") or []) else []
+    return rule_intent(record["message"], history)
+
+
+def report_shadow(records: list):
+    """Kayıt anındaki yerel kararı (local_intent) aynı mesajın LLM etiketiyle karşılaştırır."""
+    shadow = [r for r in records if r.get("local_intent")]
+    print("-" * 70)
+    if not shadow:
+        print("Canlı gölge etiketi yok (INTENT_SHADOW_SAMPLE_RATE > 0 iken yerel kararlarla birikir)")
+        return
+    print(f"Canlı gölge etiketleri: {len(shadow)} kayıt")
+    for source in ("rule", "model"):
+        subset = [r for r in shadow if r.get("source") == source]
+        if not subset:
+            continue
+        agree = sum(r["local_intent"] == r["intent"] for r in subset)
+        print(f"  {source:<6} uyum {agree}/{len(subset)} ({agree / len(subset):.1%})")
+        misses = Counter((r["local_intent"], r["intent"]) for r in subset if r["local_intent"] != r["intent"])
+        for (local, llm), count in misses.most_common(3):
+            print(f"         {local} -> LLM {llm}: {count}")
+
+
+def evaluate(log_path: str, test_ratio: float, seed: int, epochs: int):
+    records = load_intent_log(log_path)
+    if len(records) < 10:
+        print(f"Yetersiz kayıt ({len(records)}): {log_path}")
+        return
+    random.Random(seed).shuffle(records)
+    split = int(len(records) * (1 - test_ratio))
+    train, test = records[:split], records[split:]
+
+    print("=" * 70)
+    print("YEREL NİYET SINIFLANDIRICI DEĞERLENDİRMESİ (referans: LLM etiketleri)")
+    print("=" * 70)
+    print(f"Kayıt: {len(records)} (eğitim {len(train)} / test {len(test)})")
+    print(f"Etiket dağılımı: {dict(Counter(r['intent'] for r in records))}")
+    report_shadow(records)
+
+    started = time.perf_counter()
+    model = IntentModel().fit([record_text(r) for r in train], [r["intent"] for r in train], epochs=epochs,
+                              sample_weight=[record_weight(r) for r in train])
+    print(f"Eğitim süresi: {time.perf_counter() - started:.1f}sn")
+
+    labels = [r["intent"] for r in test]
+    weights = [record_weight(r) for r in test]
+    total_weight = sum(weights)
+    started = time.perf_counter()
+    proba = model.predict_proba([record_text(r) for r in test])
+    per_message_ms = (time.perf_counter() - started) * 1000 / len(test)
+    predicted = [model.labels[i] for i in proba.argmax(axis=1)]
+    confidence = proba.max(axis=1)
+    rules = [rule_for_record(r) for r in test]
+
+    # 1) Kurallar (ağırlıklı)
+    ruled = [(rule, label, w) for rule, label, w in zip(rules, labels, weights) if rule]
+    ruled_weight = sum(w for _, _, w in ruled)
+    rule_correct = sum(w for rule, label, w in ruled if rule == label)
+    print("-" * 70)
+    print(f"Kurallar: kapsama {ruled_weight / total_weight:.1%}, doğruluk "
+          f"{rule_correct / ruled_weight:.1%}" if ruled else "Kurallar: eşleşme yok")
+
+    # 2) Model
+    correct = sum(w for p, l, w in zip(predicted, labels, weights) if p == l)
+    print(f"Model (tüm test): doğruluk {correct / total_weight:.1%}, tahmin {per_message_ms:.2f}ms/mesaj")
+    for intent in INTENTS:
+        idx = [i for i, l in enumerate(labels) if l == intent]
+        if idx:
+            hit = sum(predicted[i] == intent for i in idx)
+            print(f"  {intent:<20} {hit}/{len(idx)} ({hit / len(idx):.1%})")
+
+    # 3) Hat: kural -> model (eşik) -> LLM
+    print("-" * 70)
+    print(f"{'Eşik':>6} | {'Yerel karar':>11} | {'Yerel doğruluk':>14} | {'LLM çağrısı':>11}")
+    for threshold in THRESHOLDS:
+        local, local_correct = 0.0, 0.0
+        for rule, pred, conf, label, w in zip(rules, predicted, confidence, labels, weights):
+            decision = rule or (pred if conf >= threshold else None)
+            if decision:
+                local += w
+                local_correct += w if decision == label else 0
+        accuracy = f"{local_correct / local:.1%}" if local else "-"
+        marker = "  <- INTENT_LOCAL_THRESHOLD" if threshold == settings.intent_local_threshold else ""
+        print(f"{threshold:>6.2f} | {local / total_weight:>11.1%} | {accuracy:>14} | "
+              f"{(total_weight - local) / total_weight:>11.1%}{marker}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel niyet sınıflandırıcı değerlendirmesi")
+    parser.add_argument("--log", default=settings.intent_log_path)
+    parser.add_argument("--test-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--epochs", type=int, default=300)
+    args = parser.parse_args()
+    evaluate(args.log, args.test_ratio, args.seed, args.epochs)
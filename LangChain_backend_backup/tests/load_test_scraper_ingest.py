@@ -0,0 +1,130 @@
+# load_test_scraper_ingest.py
+"""
+Scraper ingest yük testi.
+/scraper/ingest'e paralel toplu istekler gönderilirken Socket.IO event loop gecikmesini ölçer.
+
+Gecikme sondası: Engine.IO polling handshake'i (GET /socket.io/?EIO=4&transport=polling).
+Bu istek sohbet akışıyla (ai_message_chunk) aynı event loop'ta, threadpool'a gitmeden yanıtlanır;
+DB çağrıları loop'u bloklarsa sonda gecikmesi doğrudan artar.
+
+Çalıştırma (sunucu ayakta iken):
+    python tests/load_test_scraper_ingest.py --base-url http://localhost:8000 --batches 20 --batch-size 1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+# Mock ürün üreticisi için tests klasörünü ekle
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from test_scraper_integration import create_mock_product
+
+
+def summarize(samples: list[float]) -> str:
+    """Gecikme örneklerini (ms) p50 / p95 / max olarak özetler."""
+    if not samples:
+        return "örnek yok"
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"n={len(ordered)} p50={statistics.median(ordered):.1f}ms p95={p95:.1f}ms max={ordered[-1]:.1f}ms"
+
+
+async def probe_loop(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    """stop set edilene kadar Engine.IO handshake gecikmesini ölçer."""
+    samples = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            response = await client.get("/socket.io/", params={"EIO": "4", "transport": "polling"})
+            if response.status_code == 200:
+                samples.append((time.perf_counter() - started) * 1000)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def ingest_worker(client: httpx.AsyncClient, api_prefix: str, queue: asyncio.Queue, results: list):
+    """Kuyruktaki batch'leri /scraper/ingest'e gönderir."""
+    while True:
+        try:
+            batch = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        response = await client.post(f"{api_prefix}/scraper/ingest", json={"products": batch}, timeout=120)
+        results.append((response.status_code, len(batch), time.perf_counter() - started))
+
+
+async def run_load_test(base_url: str, api_prefix: str, batches: int, batch_size: int,
+                        concurrency: int, baseline_seconds: float, probe_interval: float):
+    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    queue: asyncio.Queue = asyncio.Queue()
+    for b in range(batches):
+        queue.put_nowait([
+            create_mock_product(f"LOAD_{timestamp}_{b:03d}_{i:05d}") for i in range(batch_size)
+        ])
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as probe_client, \
+            httpx.AsyncClient(base_url=base_url) as ingest_client:
+        print("=" * 70)
+        print("SCRAPER INGEST YÜK TESTİ")
+        print("=" * 70)
+
+        # 1) Yük yokken referans gecikme
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_loop(probe_client, stop, probe_interval))
+        await asyncio.sleep(baseline_seconds)
+        stop.set()
+        baseline = await probe
+        print(f"Yük yok     : {summarize(baseline)}")
+
+        # 2) Ingest sürerken gecikme
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_loop(probe_client, stop, probe_interval))
+        results = []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            ingest_worker(ingest_client, api_prefix, queue, results) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        under_load = await probe
+        print(f"Ingest sırasında: {summarize(under_load)}")
+
+    ok = [r for r in results if r[0] == 200]
+    products = sum(r[1] for r in ok)
+    print("-" * 70)
+    print(f"Ingest: {len(ok)}/{len(results)} istek başarılı, {products} ürün, {elapsed:.1f}sn "
+          f"({products / elapsed if elapsed else 0:.0f} ürün/sn)")
+    if ok:
+        print(f"İstek süresi: {summarize([r[2] * 1000 for r in ok])}")
+
+    if baseline and under_load:
+        ratio = statistics.median(under_load) / statistics.median(baseline)
+        print(f"p50 gecikme oranı (yük / yük yok): {ratio:.2f}x")
+        print("✓ Event loop bloklanmıyor" if ratio < 3 else "✗ Event loop ingest sırasında bloklanıyor")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper ingest yük testi")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-prefix", default="/api")
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    asyncio.run(run_load_test(
+        args.base_url, args.api_prefix.rstrip("/"), args.batches, args.batch_size,
+        args.concurrency, args.baseline_seconds, args.probe_interval,
+    ))
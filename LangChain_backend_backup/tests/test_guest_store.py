@@ -0,0 +1,96 @@
+# test_guest_store.py
+"""
+Misafir sohbet deposu (MemoryGuestStore) için birim testleri.
+Toplam kayıt sınırı, son aktiviteye göre tahliye, süre aşımı ve sohbet/mesaj sınırları.
+"""
+import asyncio
+import os
+import sys
+
+# LangChain backend path'ini ekle (tests klasöründen bir üst dizin)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import guest_store as guest_store_module
+from app.services.guest_store import MemoryGuestStore
+
+
+def _state(conv_ids=("c1",), messages=0):
+    conversations = {
+        conv_id: {"id": conv_id, "messages": [{"id": n} for n in range(messages)], "last_activity": f"2026-01-0{i + 1}"}
+        for i, conv_id in enumerate(conv_ids)
+    }
+    return {"conversations": conversations, "active_conversation_id": conv_ids[0]}
+
+
+def _store(**overrides):
+    limits = dict(max_entries=3, ttl=60, max_conversations=10, max_messages=100)
+    limits.update(overrides)
+    return MemoryGuestStore(**limits)
+
+
+def test_store_is_bounded_under_burst_of_guests():
+    store = _store(max_entries=100)
+
+    async def burst():
+        for n in range(1000):
+            await store.save(f"g{n}", _state())
+        return await store.stats()
+
+    stats = asyncio.run(burst())
+    assert stats["size"] == 100
+    assert stats["evictions"] == 900
+
+
+def test_least_recently_active_guest_is_evicted():
+    store = _store()
+
+    async def scenario():
+        for guest_id in ("a", "b", "c"):
+            await store.save(guest_id, _state())
+        state = await store.get("a")
+        await store.save("a", state)  # a yeniden aktif olur
+        await store.save("d", _state())  # en uzun süredir pasif olan b atılır
+        return [await store.get(guest_id) is not None for guest_id in ("a", "b", "c", "d")]
+
+    assert asyncio.run(scenario()) == [True, False, True, True]
+
+
+def test_expire_removes_only_inactive_guests(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(guest_store_module.time, "monotonic", lambda: now[0])
+    store = _store(ttl=10)
+
+    async def scenario():
+        await store.save("old", _state())
+        now[0] += 8
+        await store.save("fresh", _state())
+        now[0] += 5
+        expired = await store.expire()
+        return expired, await store.get("fresh") is not None
+
+    expired, fresh_alive = asyncio.run(scenario())
+    assert expired == ["old"]
+    assert fresh_alive
+
+
+def test_conversation_and_message_caps_keep_active_conversation():
+    store = _store(max_conversations=2, max_messages=3)
+    state = _state(conv_ids=("active", "older", "newer"), messages=5)
+
+    async def scenario():
+        await store.save("g", state)
+        return await store.get("g")
+
+    saved = asyncio.run(scenario())
+    assert set(saved["conversations"]) == {"active", "newer"}
+    assert [m["id"] for m in saved["conversations"]["active"]["messages"]] == [2, 3, 4]
+
+
+def test_delete():
+    store = _store()
+
+    async def scenario():
+        await store.save("g", _state())
+        return await store.delete("g"), await store.delete("g"), await store.get("g")
+
+    assert asyncio.run(scenario()) == (True, False, None)
@@ -0,0 +1,82 @@
+# test_intent_classifier.py
+"""
+Yerel niyet sınıflandırıcı birim testleri.
+Kural kısa yolları, TF-IDF lineer modelin eğitimi ve kaydet/yükle, gölge etiket kaydı.
+"""
+import os
+import sys
+
+# LangChain backend path'ini ekle (tests klasöründen bir üst dizin)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import intent_classifier
+from app.services.intent_classifier import IntentModel, load_intent_log, model_text, record_weight, rule_intent
+
+IMAGE_HISTORY = [{"role": "assistant", "content": "![v yaka elbise](https://fal.media/x.png)"}]
+REPORT_HISTORY = [{"role": "assistant", "content": "# 💎 ABİYE - 2026 VİZYON RAPORU\n## 🌍 BÖLÜM 1"}]
+
+
+def test_rules_greetings_and_question_suffix():
+    assert rule_intent("Merhaba!") == "GENERAL_CHAT"
+    assert rule_intent("İsteklerime göre bir şeyler önerir misin") == "GENERAL_CHAT"
+    assert rule_intent("Trendler hakkında konuşalım mı?") == "GENERAL_CHAT"
+    assert rule_intent("Bu rengi sever mi?") == "GENERAL_CHAT"
+
+
+def test_rules_draw_verbs():
+    assert rule_intent("v yaka elbise çiz") == "IMAGE_GENERATION"
+    assert rule_intent("bana bir gömlek tasarla") == "IMAGE_GENERATION"
+    assert rule_intent("bunu daha koyu çiz", IMAGE_HISTORY) == "IMAGE_MODIFICATION"
+    # Sıfat-fiil çizim isteği değildir; kural karar vermez
+    assert rule_intent("tasarlanmış abiye trendlerini analiz et") is None
+    assert rule_intent("2026 abiye trendleri analiz et") is None
+
+
+def test_model_learns_and_round_trips(tmp_path):
+    samples = {
+        "MARKET_RESEARCH": ["abiye trendlerini analiz et", "mont modası raporu hazırla", "ayakkabı trendlerini araştır"],
+        "FOLLOW_UP": ["bu fiyat neden yüksek", "ikinci maddeyi detaylandır", "kumaşı değiştir"],
+        "GENERAL_CHAT": ["bugün hava nasıl", "bana bir şaka anlat", "adın ne"],
+        "IMAGE_GENERATION": ["kırmızı elbise görseli", "bana bir çanta göster", "mavi gömlek resmi"],
+        "IMAGE_MODIFICATION": ["aynısından bir daha", "rengini maviye çevir", "farklı açıdan göster"],
+    }
+    history = {"FOLLOW_UP": REPORT_HISTORY, "IMAGE_MODIFICATION": IMAGE_HISTORY}
+    texts, labels = [], []
+    for intent, messages in samples.items():
+        for message in messages:
+            texts.append(model_text(message, history.get(intent, [])))
+            labels.append(intent)
+
+    model = IntentModel(n_features=1 << 12).fit(texts, labels, epochs=200)
+    intent, confidence = model.predict(model_text("gelinlik trendlerini analiz et"))
+    assert intent == "MARKET_RESEARCH"
+    assert 0.0 < confidence <= 1.0
+
+    path = str(tmp_path / "intent_model.npz")
+    model.save(path)
+    loaded = IntentModel.load(path)
+    assert loaded.predict(texts[0]) == model.predict(texts[0])
+
+
+def test_shadow_record_keeps_local_decision_and_weight(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "intent_log.jsonl")
+    monkeypatch.setattr(intent_classifier.settings, "intent_log_path", log_path)
+    monkeypatch.setattr(intent_classifier.settings, "intent_shadow_sample_rate", 0.05)
+    intent_classifier.log_llm_intent("abiye trendlerini analiz et", [], "MARKET_RESEARCH")
+    intent_classifier.log_llm_intent("Merhaba", [], "GENERAL_CHAT", ("GENERAL_CHAT", 1.0, "rule"))
+
+    llm, shadow = load_intent_log(log_path)
+    assert llm["source"] == "llm" and "local_intent" not in llm
+    assert shadow["source"] == "rule" and shadow["local_intent"] == "GENERAL_CHAT"
+    assert record_weight(llm) == 1.0
+    assert record_weight(shadow) == 20.0
+
+
+def test_sample_weight_shifts_decision():
+    texts = [model_text("kırmızı elbise"), model_text("kırmızı elbise")]
+    labels = ["IMAGE_GENERATION", "MARKET_RESEARCH"]
+    model = IntentModel(n_features=1 << 10)
+    model.fit(texts, labels, epochs=100, sample_weight=[1.0, 20.0])
+    assert model.predict(texts[0])[0] == "MARKET_RESEARCH"
+    model.fit(texts, labels, epochs=100, sample_weight=[20.0, 1.0])
+    assert model.predict(texts[0])[0] == "IMAGE_GENERATION"
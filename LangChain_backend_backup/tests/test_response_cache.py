@@ -0,0 +1,56 @@
+# test_response_cache.py
+"""
+Katmanlı önbelleğin 1. katmanı (TTLCache) için birim testleri.
+LRU tahliyesi, TTL süresi ve isabet oranı metrikleri.
+"""
+import os
+import sys
+
+# LangChain backend path'ini ekle (tests klasöründen bir üst dizin)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import cache as cache_module
+from app.services.cache import TTLCache
+
+
+def test_get_set_and_hit_rate():
+    cache = TTLCache("test", maxsize=4, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", {"v": 1})
+    assert cache.get("a") == {"v": 1}
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache("test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a en son kullanılan olur
+    cache.set("c", 3)  # b tahliye edilir
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache("test", maxsize=4, ttl=10)
+    cache.set("a", 1)
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_single_tier_leaves_others():
+    cache_module.trends_cache.set(("abiye", "today 3-m", "TR"), {"summary": "x"})
+    cache_module.tavily_cache.set(("abiye", "{}"), {"results": []})
+    removed = cache_module.invalidate_cache("trends")
+    assert removed == {"trends": 1}
+    assert cache_module.trends_cache.get(("abiye", "today 3-m", "TR")) is None
+    assert cache_module.tavily_cache.get(("abiye", "{}")) == {"results": []}
+    cache_module.invalidate_cache("tavily")
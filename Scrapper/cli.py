@@ -22,19 +22,28 @@ Komutlar:
   export      Verileri Excel'e aktar
   reset       Veritabanını sıfırla
   stats       Hızlı istatistikler
+  pool        Paylaşılan tarayıcı havuzunu başlat
+  partition   daily_metrics'i aylık partition'lara taşı (PostgreSQL)
+  latest      latest_metrics tablosunu geçmişten yeniden doldur
+  summary     products.last_* özet kolonlarını latest_metrics'ten doldur
+  parquet     Metrikleri tarih/kategori bölümlü Parquet'e aktar
+  pool-status Tarayıcı havuzu doluluğunu göster
 
 Örnek:
   python cli.py scrape
   python cli.py export rapor.xlsx
   python cli.py check --limit 50
+  python cli.py parquet -o exports/daily_metrics --since 2024-01-01
         """
     )
     
     parser.add_argument('command', nargs='?', default='help',
-                       choices=['scrape', 'analyze', 'check', 'export', 'reset', 'stats', 'help'],
+                       choices=['scrape', 'analyze', 'check', 'export', 'reset', 'stats', 'pool', 'pool-status',
+                                'partition', 'latest', 'summary', 'parquet', 'help'],
                        help='Çalıştırılacak komut')
     parser.add_argument('--limit', type=int, default=20, help='Gösterilecek kayıt sayısı')
     parser.add_argument('--output', '-o', type=str, help='Çıktı dosya adı')
+    parser.add_argument('--since', type=str, help='Parquet aktarımı başlangıç günü (YYYY-MM-DD)')
     
     args = parser.parse_args()
     
@@ -68,6 +77,58 @@ Komutlar:
         from tools.db_tools import stats
         stats()
 
+    elif args.command == 'partition':
+        from tools.db_tools import partition_metrics
+        partition_metrics()
+
+    elif args.command == 'latest':
+        from tools.db_tools import backfill_latest_metrics
+        backfill_latest_metrics()
+
+    elif args.command == 'summary':
+        from tools.db_tools import backfill_product_summary
+        backfill_product_summary()
+
+    elif args.command == 'parquet':
+        from tools.db_tools import export_parquet
+        export_parquet(output_dir=args.output, since=args.since)
+
+    elif args.command == 'pool':
+        import asyncio
+        from playwright.async_api import async_playwright
+        from src.config import load_config
+        from src.utils.browser_pool import BrowserPoolService
+
+        settings = load_config().settings
+
+        async def run_pool():
+            async with async_playwright() as p:
+                service = BrowserPoolService(
+                    p,
+                    headless=settings.headless,
+                    max_leases_per_browser=settings.browser_pool_max_leases,
+                    recycle_after_pages=settings.browser_pool_recycle_pages,
+                    recycle_memory_mb=settings.browser_pool_recycle_memory_mb,
+                    host=settings.browser_pool_host,
+                    port=settings.browser_pool_port,
+                )
+                await service.serve_forever()
+
+        console.print("[cyan]🏊 Tarayıcı havuzu başlatılıyor...[/cyan]")
+        asyncio.run(run_pool())
+
+    elif args.command == 'pool-status':
+        import asyncio
+        from src.config import load_config
+        from src.utils.browser_pool import pool_request, print_pool_stats
+
+        settings = load_config().settings
+        try:
+            print_pool_stats(asyncio.run(pool_request(
+                {'command': 'stats'}, settings.browser_pool_host, settings.browser_pool_port)))
+        except Exception as e:
+            console.print(f"[red]❌ Tarayıcı havuzuna ulaşılamadı: {e}[/red]")
+
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,8 @@
 import asyncio
 import argparse
 import os
+import random
+import time
 from datetime import datetime
 from playwright.async_api import async_playwright
 from rich.console import Console
@@ -8,10 +10,17 @@ from rich.table import Table
 
 from src.config import load_config
 from src.config.loader import get_enabled_platforms
-from src.database import DatabaseManager
+from src.database import DatabaseManager, RescrapePolicy, RescrapeReason
+from src.database.database_manager import default_lease_owner
+from src.database.bulk_writer import BulkProductWriter
 from src.scrapers.trendyol_scraper import TrendyolScraper
 from src.scrapers.amazon_scraper import AmazonScraper
 from src.utils.stealth import apply_stealth
+from src.utils.worker_pool import ConcurrencyLimiter, WorkerStats, print_worker_stats
+from src.utils.link_queue import LinkQueue, LinkItem
+from src.utils.request_router import RequestRouter
+from src.utils.browser_pool import BROWSER_ARGS, PoolLease
+from src.scrapers.readiness import WAIT_METRICS
 
 console = Console()
 
@@ -22,7 +31,32 @@ SCRAPER_CLASSES = {
 }
 
 
-async def run_platform_scraper(platform_name: str, platform_config, settings, browser):
+# Direkt URL modu context ayarları (havuz kirasında aynı ayarlarla sıcak context hazırlanır)
+DIRECT_CONTEXT_OPTIONS = dict(
+    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    viewport={'width': 1920, 'height': 1080},
+    extra_http_headers={
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+        "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+    }
+)
+
+
+async def new_direct_context(browser, router=None, lease=None):
+    """
+    Direkt URL modu için tarayıcı context'i oluşturur (router verilirse kaynak engelleme uygulanır).
+    Havuzdan kiralanmış tarayıcıda context kira üzerinden açılır (sıcak, stealth + sayfa sayacı).
+    """
+    if lease:
+        context = await lease.new_context(**DIRECT_CONTEXT_OPTIONS)
+    else:
+        context = await browser.new_context(**DIRECT_CONTEXT_OPTIONS)
+    if router:
+        await router.attach(context)
+    return context
+
+
+async def run_platform_scraper(platform_name: str, platform_config, settings, browser, lease=None):
     """Run scraper for a single platform"""
     
     console.print(f"\n[bold blue]{'='*50}[/bold blue]")
@@ -38,19 +72,29 @@ async def run_platform_scraper(platform_name: str, platform_config, settings, br
     # Initialize database
     db_manager = DatabaseManager(
         connection_url=platform_config.database.connection_url,
-        platform=platform_name
+        platform=platform_name,
+        rescrape_policy=RescrapePolicy.from_settings(settings)
     )
     db_manager.create_tables()
     
     # Create browser context with specific User-Agent and viewport
-    context = await browser.new_context(
+    context_options = dict(
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
         viewport={'width': 1920, 'height': 1080},
         locale="tr-TR"
     )
-    
-    # Apply anti-detection scripts
-    await apply_stealth(context)
+    if lease:
+        # Havuz context'i stealth scriptleri uygulanmış olarak döner
+        context = await lease.new_context(**context_options)
+    else:
+        context = await browser.new_context(**context_options)
+        # Apply anti-detection scripts
+        await apply_stealth(context)
+
+    # Gereksiz kaynakları engelle (görsel, font, tracker...)
+    router = RequestRouter.from_selectors(platform_config.selectors, platform_name)
+    if router:
+        await router.attach(context)
     
     # Create page from context
     page = await context.new_page()
@@ -61,6 +105,7 @@ async def run_platform_scraper(platform_name: str, platform_config, settings, br
         config={
             'request_delay': settings.request_delay,
             'scroll_count': settings.scroll_count,
+            'extraction_mode': settings.extraction_mode,
         },
         selectors=platform_config.selectors
     )
@@ -169,6 +214,8 @@ async def run_platform_scraper(platform_name: str, platform_config, settings, br
     # Close page and database
     await page.close()
     db_manager.close()
+    if router:
+        router.print_summary()
     
     # Summary
     console.print(f"\n[bold green]✅ {platform_name.upper()} tamamlandı![/bold green]")
@@ -203,18 +250,24 @@ async def main():
     try:
         # Launch browser
         async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=config.settings.headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-infobars',
-                    '--window-position=0,0',
-                    '--ignore-certificate-errors',
-                    '--ignore-ssl-errors'
-                ]
-            )
+            # Havuz açıksa sıcak tarayıcı kirala, ulaşılamazsa kendi tarayıcımızı aç
+            pool_lease = None
+            if config.settings.browser_pool_enabled:
+                pool_lease = PoolLease(config.settings.browser_pool_host, config.settings.browser_pool_port)
+                try:
+                    browser = await pool_lease.acquire(p)
+                    if args.url:
+                        # Linker + (izole ise) işçi context'leri görev ayarları okunurken arka planda hazırlanır
+                        workers = max(1, config.settings.detail_workers) if config.settings.isolated_contexts else 0
+                        pool_lease.prewarm(1 + workers, **DIRECT_CONTEXT_OPTIONS)
+                except Exception as e:
+                    console.print(f"[yellow]⚠️ Tarayıcı havuzuna ulaşılamadı ({e}), yerel tarayıcı açılıyor...[/yellow]")
+                    pool_lease = None
+            if pool_lease is None:
+                browser = await p.chromium.launch(
+                    headless=config.settings.headless,
+                    args=BROWSER_ARGS
+                )
             
             # Run each enabled platform (Şu an sadece Trendyol aktif varsayıyoruz)
             for platform_name, platform_config in enabled_platforms.items():
@@ -223,7 +276,13 @@ async def main():
                     platform_config.keywords = ["DIRECT_URL"] # Placeholder
                     # Scraper sınıfını al
                     ScraperClass = SCRAPER_CLASSES.get(platform_name)
-                    db_manager = DatabaseManager(connection_url=platform_config.database.connection_url, platform=platform_name)
+                    db_manager = DatabaseManager(
+                        connection_url=platform_config.database.connection_url,
+                        platform=platform_name,
+                        rescrape_policy=RescrapePolicy.from_settings(config.settings)
+                    )
+                    # latest_metrics / snapshot / parmak izi tabloları ve tetikleyici admin panel yolunda da hazır olsun
+                    db_manager.create_tables()
                     
                     # KELİME ÇIKARMA
                     import urllib.parse
@@ -262,35 +321,180 @@ async def main():
                         config.settings.request_delay = int(task_config['request_delay'])
                         console.print(f"[bold yellow]⚡ Task Ayarı: Hız Limiti = {config.settings.request_delay} sn[/bold yellow]")
 
+                    if 'extraction_mode' in task_config:
+                        config.settings.extraction_mode = str(task_config['extraction_mode'])
+                        console.print(f"[bold yellow]🧬 Task Ayarı: Çıkarım Modu = {config.settings.extraction_mode}[/bold yellow]")
+
+                    if 'link_discovery' in task_config:
+                        config.settings.link_discovery = str(task_config['link_discovery'])
+                        console.print(f"[bold yellow]🔎 Task Ayarı: Link Toplama = {config.settings.link_discovery}[/bold yellow]")
+
+                    if 'change_detection' in task_config:
+                        config.settings.change_detection = bool(task_config['change_detection'])
+                        console.print(f"[bold yellow]🧮 Task Ayarı: Değişim Takibi = {'açık' if config.settings.change_detection else 'kapalı'}[/bold yellow]")
+                    db_manager.rescrape_policy = RescrapePolicy.from_settings(config.settings)
+
+                    if 'cards_only' in task_config:
+                        config.settings.cards_only = bool(task_config['cards_only'])
+                    if 'detail_sample_rate' in task_config:
+                        config.settings.detail_sample_rate = float(task_config['detail_sample_rate'])
+                    if config.settings.cards_only:
+                        console.print(f"[bold yellow]🃏 Task Ayarı: Sadece Kart Modu (detay örnekleme %{config.settings.detail_sample_rate * 100:.0f})[/bold yellow]")
+
+                    if 'detail_workers' in task_config:
+                        config.settings.detail_workers = int(task_config['detail_workers'])
+                        console.print(f"[bold yellow]👷 Task Ayarı: Detay İşçisi = {config.settings.detail_workers}[/bold yellow]")
+
                     log_id = db_manager.start_log(keyword=clean_kw, task_id=args.task_id, target_url=args.url)
                     
                     # Stealth context settings
-                    context = await browser.new_context(
-                        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-                        viewport={'width': 1920, 'height': 1080},
-                        extra_http_headers={
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                            "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
-                        }
-                    )
+                    router = RequestRouter.from_selectors(platform_config.selectors, platform_name)
+                    context = await new_direct_context(browser, router, pool_lease)
+                    scraper_config = {
+                        'request_delay': config.settings.request_delay,
+                        'scroll_count': config.settings.scroll_count,
+                        'extraction_mode': config.settings.extraction_mode,
+                        'link_discovery': config.settings.link_discovery,
+                    }
                     
                     page_linker = await context.new_page()
-                    page_scraper = await context.new_page()
-                    
-                    linker_scraper = ScraperClass(page=page_linker, config={'request_delay': config.settings.request_delay, 'scroll_count': config.settings.scroll_count}, selectors=platform_config.selectors)
-                    detail_scraper = ScraperClass(page=page_scraper, config={'request_delay': config.settings.request_delay, 'scroll_count': config.settings.scroll_count}, selectors=platform_config.selectors)
+                    linker_scraper = ScraperClass(page=page_linker, config={**scraper_config, 'extraction_mode': 'dom'}, selectors=platform_config.selectors)
+
+                    # DETAY İŞÇİ HAVUZU: Her işçinin kendi sayfası (opsiyonel olarak kendi context'i) var
+                    worker_count = max(1, config.settings.detail_workers)
+                    worker_contexts = []
+                    detail_pages = []
+                    detail_scrapers = []
+                    for _ in range(worker_count):
+                        worker_context = context
+                        if config.settings.isolated_contexts:
+                            worker_context = await new_direct_context(browser, router, pool_lease)
+                            worker_contexts.append(worker_context)
+                        worker_page = await worker_context.new_page()
+                        detail_pages.append(worker_page)
+                        detail_scrapers.append(ScraperClass(page=worker_page, config=scraper_config, selectors=platform_config.selectors))
+
+                    limiter = ConcurrencyLimiter(
+                        per_platform=config.settings.max_concurrency_per_platform,
+                        per_host=config.settings.max_concurrency_per_host
+                    )
+                    worker_stats = [WorkerStats(worker_id=i) for i in range(1, worker_count + 1)]
+                    console.print(f"[cyan]👷 {worker_count} detay işçisi hazır (izole context: {'evet' if config.settings.isolated_contexts else 'hayır'})[/cyan]")
                     
-                    stats = {"added": 0, "updated": 0, "errors": 0}
+                    stats = {"added": 0, "updated": 0, "errors": 0, "skipped": 0, "cards": 0}
+
+                    def on_products_flushed(results):
+                        """Her batch yazımından sonra sayaçları ve canlı dashboard'u günceller."""
+                        for is_new, msg in results:
+                            if is_new: stats["added"] += 1
+                            elif msg.startswith("❌"): stats["errors"] += 1
+                            elif msg.startswith("🔁"): continue  # Aynı batch'teki tekrar, son satıra birleştirildi
+                            else: stats["updated"] += 1
+                        db_manager.update_log_progress(log_id, stats["added"], stats["updated"], stats["errors"])
+
+                    # Besleyici satırları kendi adına kiralar, işçi aldığında kira işçiye devredilir;
+                    # sonuç yalnızca kira hâlâ o işçideyse yazılır
+                    lease_owner = default_lease_owner("feeder")
+                    worker_owners = [default_lease_owner(f"w{i}") for i in range(1, worker_count + 1)]
+
+                    # Ürün + metrik yazımı batch halinde (boyut veya süre dolunca tek transaction)
+                    product_writer = BulkProductWriter(
+                        db_manager,
+                        batch_size=config.settings.write_batch_size,
+                        flush_interval=config.settings.write_flush_seconds,
+                        on_flush=on_products_flushed
+                    )
+
+                    # Besleyici -> işçiler arası bellek içi kuyruk; satırlar DB'den toplu kiralanır
+                    link_queue = LinkQueue(worker_count=worker_count, maxsize=config.settings.link_queue_size)
+                    links_added = asyncio.Event()
+                    linker_done = asyncio.Event()
+
+                    async def queue_feeder():
+                        """
+                        Bekleyen satırları claim_queue_batch ile toplu kiralar ve işçilere devreder.
+                        claim_queue_batch her çağrıda süresi dolmuş kiraları geri aldığından önceki / çökmüş
+                        çalıştırmalardan kalan satırlar da buradan gelir; yeni link gelmese de
+                        lease_rescan_seconds aralığıyla yeniden taranır. Linker bitip kiralanacak satır kalmayınca kapanır.
+                        """
+                        fed = 0
+                        try:
+                            while True:
+                                links_added.clear()
+                                finished = linker_done.is_set()
+                                # Bellekte bekleyen kiralı satır sayısı kuyruk boyutunu aşmasın (kira bellekte dolmasın)
+                                limit = min(config.settings.claim_batch_size, max(1, link_queue.free_slots()))
+                                rows = db_manager.claim_queue_batch(args.task_id, lease_owner, limit=limit)
+                                for row in rows:
+                                    await link_queue.put(LinkItem(id=row.id, url=row.url))
+                                fed += len(rows)
+                                if rows:
+                                    continue
+                                if finished:
+                                    break
+                                try:
+                                    await asyncio.wait_for(links_added.wait(), timeout=config.settings.lease_rescan_seconds)
+                                except asyncio.TimeoutError:
+                                    pass
+                        finally:
+                            # İşçilere akışın bittiğini bildir
+                            await link_queue.close()
+                        console.print(f"[cyan]📬 Besleyici: {fed} link kiralanıp işçilere devredildi.[/cyan]")
+
+                    async def lease_heartbeat():
+                        """Kuyrukta, işçide veya yazım tamponunda bekleyen kiralı satırların süresini düzenli uzatır."""
+                        while True:
+                            await asyncio.sleep(config.settings.lease_renew_seconds)
+                            db_manager.renew_leases([lease_owner, *worker_owners])
 
                     async def linker_worker():
-                        """Sadece linkleri bulur ve veritabanı kuyruğuna ekler."""
+                        """Linkleri bulur, veritabanına kaydeder ve besleyiciyi uyandırır."""
+                        try:
+                            await collect_links()
+                        finally:
+                            flush_cards()
+                            linker_done.set()
+                            links_added.set()
+                        console.print("[bold green]✅ Linker: İşlem tamamlandı.[/bold green]")
+                        if stats["cards"]:
+                            console.print(f"[cyan]🃏 Linker: {stats['cards']} kart snapshot'ı kaydedildi.[/cyan]")
+                        if stats["skipped"]:
+                            console.print(f"[cyan]⏭️ Linker: {stats['skipped']} ürün için detay ziyareti atlandı.[/cyan]")
+
+                    card_buffer = []
+
+                    def flush_cards():
+                        """Biriken kart verilerini tek transaction'da listing_snapshots'a yazar."""
+                        if card_buffer:
+                            stats["cards"] += db_manager.save_listing_snapshots(card_buffer, task_id=args.task_id)
+                            card_buffer.clear()
+
+                    def wants_detail(reason: RescrapeReason) -> bool:
+                        """Sadece kart modunda detay ziyareti: kartı değişenler öncelikli, kalanlar örneklenir."""
+                        if not config.settings.cards_only:
+                            return True
+                        return reason is RescrapeReason.CARD_CHANGED or random.random() < config.settings.detail_sample_rate
+
+                    async def collect_links():
+                        """Hedef listeden linkleri toplar, yenilerini DB'ye ve bellek kuyruğuna ekler."""
                         console.print("[bold yellow]📡 Linker: Link toplama başlatıldı...[/bold yellow]")
                         found_any = False
                         try:
                             async for url in linker_scraper.collect_product_urls_from_link(args.url, platform_config.max_pages):
                                 found_any = True
-                                added = db_manager.add_to_queue(args.task_id, url)
-                                if added:
+                                card = linker_scraper.listing_cards.pop(url, None)
+                                if card:
+                                    card_buffer.append({**card, 'url': url, 'product_id': linker_scraper.get_trendyol_id(url)})
+                                    if len(card_buffer) >= config.settings.write_batch_size:
+                                        flush_cards()
+                                # Değişim takibi: kart verisi aynıysa ve takvim gelmediyse detay ziyaretini atla
+                                due, reason = db_manager.rescrape_decision(url, card)
+                                if not due or not wants_detail(reason):
+                                    stats["skipped"] += 1
+                                    continue
+                                queue_id = db_manager.add_to_queue(args.task_id, url)
+                                if queue_id:
+                                    links_added.set()
                                     console.print(f"[dim green]🔗 Yeni link kuyruğa eklendi: {url[:40]}...[/dim green]")
                             
                             if not found_any:
@@ -319,26 +523,32 @@ async def main():
                             
                             db_manager.log_error(log_id, f"Linker Hatası: {str(e)}", screenshot_path=filename)
                             db_manager.update_log_progress(log_id, stats["added"], stats["updated"], stats["errors"])
-                        console.print("[bold green]✅ Linker: İşlem tamamlandı.[/bold green]")
 
-                    async def scraper_worker():
-                        """Kuyruktaki linkleri sırayla kazır."""
-                        console.print("[bold blue]🔍 Scraper: Kazıma motoru hazır, kuyruk bekleniyor...[/bold blue]")
-                        empty_count = 0
-                        while empty_count < 30: # Kuyruk 30 kere boş gelirse (yaklaşık 1 dk) bitir
-                            item = db_manager.get_next_from_queue(args.task_id)
-                            if not item:
-                                empty_count += 1
-                                await asyncio.sleep(2)
-                                continue
+                    async def scraper_worker(worker_id: int):
+                        """Kuyruktaki linkleri sırayla kazır (havuzdaki tek bir işçi)."""
+                        detail_scraper = detail_scrapers[worker_id - 1]
+                        page_scraper = detail_pages[worker_id - 1]
+                        w_stats = worker_stats[worker_id - 1]
+                        worker_owner = worker_owners[worker_id - 1]
+                        console.print(f"[bold blue]🔍 Scraper #{worker_id}: Kazıma motoru hazır, kuyruk bekleniyor...[/bold blue]")
+                        while True:
+                            item = await link_queue.get()
+                            if item is None: # Linker bitti ve kuyruk boşaldı
+                                break
                             
-                            empty_count = 0 # Bir tane bulduysak sayacı sıfırla
+                            # Besleyicinin kiraladığı satır bu işçiye devredilir; kira kaybedildiyse başka süreç işliyordur
+                            if not db_manager.transfer_lease(item.id, lease_owner, worker_owner):
+                                console.print(f"[yellow]⏭️ #{worker_id} Kira kaybedildi, atlanıyor:[/yellow] {item.url[:50]}")
+                                continue
                             url = item.url
-                            console.print(f"[cyan]🚀 Kazılıyor:[/cyan] {url[:50]}...")
+                            console.print(f"[cyan]🚀 #{worker_id} Kazılıyor:[/cyan] {url[:50]}...")
                             
+                            started = time.monotonic()
+                            success = False
                             try:
                                 # SENIN ÖZEL DOM KAZIMA MANTIĞIN BURADA ÇALIŞIYOR
-                                data = await detail_scraper.scrape_product(url)
+                                async with limiter.slot(platform_name, url):
+                                    data = await detail_scraper.scrape_product(url)
                                 if data and data.get('name'):
                                     product_data = {
                                         'url': url, 'product_id': detail_scraper.get_trendyol_id(url),
@@ -350,13 +560,12 @@ async def main():
                                         'review_count': data.get('rating_count', data.get('reviews', 0)),
                                         'favorite_count': data.get('favs', 0), 'cart_count': data.get('basket', 0), 'view_count': data.get('views', 0)
                                     }
-                                    is_new, msg = db_manager.save_product(product_data)
-                                    if is_new: stats["added"] += 1
-                                    else: stats["updated"] += 1
-                                    db_manager.update_queue_status(item.id, "completed")
+                                    # Kuyruk satırı batch yazımıyla aynı transaction'da 'completed' olur
+                                    product_writer.submit(product_data, queue_id=item.id, lease_owner=worker_owner)
+                                    success = True
                                 else:
                                     stats["errors"] += 1
-                                    db_manager.update_queue_status(item.id, "failed", "Veri çekilemedi")
+                                    db_manager.update_queue_status(item.id, "failed", "Veri çekilemedi", owner=worker_owner)
                                     
                                     # Screenshot al
                                     os.makedirs("static/captures", exist_ok=True)
@@ -368,7 +577,7 @@ async def main():
                                     db_manager.log_error(log_id, f"Veri çekilemedi: {url}", screenshot_path=filename)
                             except Exception as e:
                                 stats["errors"] += 1
-                                db_manager.update_queue_status(item.id, "failed", str(e))
+                                db_manager.update_queue_status(item.id, "failed", str(e), owner=worker_owner)
                                 
                                 # Screenshot al
                                 os.makedirs("static/captures", exist_ok=True)
@@ -380,33 +589,57 @@ async def main():
                                 db_manager.log_error(log_id, f"Scraper Hatası ({url}): {str(e)}", screenshot_path=filename)
                                 console.print(f"[red]Hata ({url[:30]}): {e}[/red]")
                             
-                            # Canlı Dashboard Güncellemesi
-                            db_manager.update_log_progress(log_id, stats["added"], stats["updated"], stats["errors"])
+                            w_stats.record(success, time.monotonic() - started, path=data.get('extraction_path') if success else None)
+
+                            # Canlı Dashboard Güncellemesi (başarılı ürünler batch flush'ında yazılır)
+                            if not success:
+                                db_manager.update_log_progress(log_id, stats["added"], stats["updated"], stats["errors"])
                             await asyncio.sleep(config.settings.request_delay)
                         
-                        console.print("[bold green]🏁 Scraper: Kuyruk bitti![/bold green]")
+                        console.print(f"[bold green]🏁 Scraper #{worker_id}: Kuyruk bitti! ({w_stats.succeeded} ürün, {w_stats.products_per_hour:.0f}/saat)[/bold green]")
 
+                    heartbeat = None
                     try:
                         if "/p/" in args.url:
                             # Tek ürün sayfasıysa paralel sisteme gerek yok, direkt kazı
-                            data = await detail_scraper.scrape_product(args.url)
+                            data = await detail_scrapers[0].scrape_product(args.url)
                             if data and data.get('name'):
                                 # ... (Tek ürün işleme mantığı - aynı kalıyor)
                                 pass
                         else:
                             # Kategori/Arama listesiyse PARALEL MODU ÇALIŞTIR!
-                            await asyncio.gather(linker_worker(), scraper_worker())
+                            product_writer.start()
+                            heartbeat = asyncio.create_task(lease_heartbeat())
+                            await asyncio.gather(
+                                linker_worker(),
+                                queue_feeder(),
+                                *(scraper_worker(i) for i in range(1, worker_count + 1))
+                            )
+                            print_worker_stats(worker_stats)
+                            if router:
+                                router.print_summary()
                     finally:
+                        await product_writer.close()
+                        # Tampondaki satırlar yazılana kadar kiralar uzatılmaya devam eder
+                        if heartbeat:
+                            heartbeat.cancel()
                         db_manager.finish_log(log_id, pages=1, found=stats["added"] + stats["updated"], added=stats["added"], updated=stats["updated"], errors=stats["errors"])
                         await page_linker.close()
-                        await page_scraper.close()
+                        for worker_page in detail_pages:
+                            await worker_page.close()
+                        for worker_context in worker_contexts:
+                            await worker_context.close()
                         db_manager.close()
                 else:
                     # Eski tip toplu tarama (config keywords'leri)
-                    await run_platform_scraper(platform_name, platform_config, config.settings, browser)
+                    await run_platform_scraper(platform_name, platform_config, config.settings, browser, pool_lease)
             
-            await browser.close()
+            if pool_lease:
+                await pool_lease.release()
+            else:
+                await browser.close()
         
+        WAIT_METRICS.print_summary()
         console.print("\n[bold green]🏁 TÜM İŞLEMLER TAMAMLANDI![/bold green]")
     except Exception as global_e:
         console.print(f"[bold red]❌ KRİTİK HATA (Sistem Çöktü): {global_e}[/bold red]")
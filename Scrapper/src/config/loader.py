@@ -48,6 +48,31 @@ class Settings:
     request_delay: int = 2
     scroll_count: int = 5
     retry_count: int = 3
+    detail_workers: int = 1
+    isolated_contexts: bool = False
+    max_concurrency_per_platform: int = 0
+    max_concurrency_per_host: int = 0
+    link_queue_size: int = 100
+    claim_batch_size: int = 10
+    lease_rescan_seconds: float = 30.0
+    lease_renew_seconds: float = 60.0
+    write_batch_size: int = 50
+    write_flush_seconds: float = 5.0
+    extraction_mode: str = "dom"
+    link_discovery: str = "dom"
+    browser_pool_enabled: bool = False
+    browser_pool_host: str = "127.0.0.1"
+    browser_pool_port: int = 9400
+    browser_pool_max_leases: int = 4
+    browser_pool_recycle_pages: int = 500
+    browser_pool_recycle_memory_mb: int = 1500
+    change_detection: bool = False
+    rescrape_min_minutes: int = 60
+    rescrape_max_minutes: int = 4320
+    rescrape_initial_minutes: int = 360
+    rescrape_backoff: float = 2.0
+    cards_only: bool = False
+    detail_sample_rate: float = 0.1
 
 
 @dataclass
@@ -122,7 +147,32 @@ def load_config(config_path: str = "config.yaml", selectors_path: str = "platfor
         loop_interval_minutes=settings_data.get('loop_interval_minutes', 15),
         request_delay=settings_data.get('request_delay', 2),
         scroll_count=settings_data.get('scroll_count', 5),
-        retry_count=settings_data.get('retry_count', 3)
+        retry_count=settings_data.get('retry_count', 3),
+        detail_workers=settings_data.get('detail_workers', 1),
+        isolated_contexts=settings_data.get('isolated_contexts', False),
+        max_concurrency_per_platform=settings_data.get('max_concurrency_per_platform', 0),
+        max_concurrency_per_host=settings_data.get('max_concurrency_per_host', 0),
+        link_queue_size=settings_data.get('link_queue_size', 100),
+        claim_batch_size=settings_data.get('claim_batch_size', 10),
+        lease_rescan_seconds=settings_data.get('lease_rescan_seconds', 30.0),
+        lease_renew_seconds=settings_data.get('lease_renew_seconds', 60.0),
+        write_batch_size=settings_data.get('write_batch_size', 50),
+        write_flush_seconds=settings_data.get('write_flush_seconds', 5.0),
+        extraction_mode=settings_data.get('extraction_mode', 'dom'),
+        link_discovery=settings_data.get('link_discovery', 'dom'),
+        browser_pool_enabled=settings_data.get('browser_pool_enabled', False),
+        browser_pool_host=settings_data.get('browser_pool_host', '127.0.0.1'),
+        browser_pool_port=settings_data.get('browser_pool_port', 9400),
+        browser_pool_max_leases=settings_data.get('browser_pool_max_leases', 4),
+        browser_pool_recycle_pages=settings_data.get('browser_pool_recycle_pages', 500),
+        browser_pool_recycle_memory_mb=settings_data.get('browser_pool_recycle_memory_mb', 1500),
+        change_detection=settings_data.get('change_detection', False),
+        rescrape_min_minutes=settings_data.get('rescrape_min_minutes', 60),
+        rescrape_max_minutes=settings_data.get('rescrape_max_minutes', 4320),
+        rescrape_initial_minutes=settings_data.get('rescrape_initial_minutes', 360),
+        rescrape_backoff=settings_data.get('rescrape_backoff', 2.0),
+        cards_only=settings_data.get('cards_only', False),
+        detail_sample_rate=settings_data.get('detail_sample_rate', 0.1)
     )
     
     return ScraperConfig(platforms=platforms, settings=settings)
@@ -1,3 +1,5 @@
 
 from .database_manager import DatabaseManager
-from .models import Base, Product, DailyMetric, ScrapingLog, ScrapingTask, ScrapingQueue
+from .bulk_writer import BulkProductWriter
+from .models import Base, Product, DailyMetric, LatestMetric, ListingSnapshot, ProductFingerprint, ScrapingLog, ScrapingTask, ScrapingQueue
+from .fingerprints import RescrapePolicy, RescrapeReason
@@ -0,0 +1,92 @@
+"""
+Bulk Product Writer - Buffered write path for scraped products
+Ürünleri ve metrikleri biriktirir, boyut veya süre dolunca tek transaction'da yazar.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+from .database_manager import DatabaseManager
+
+console = Console()
+
+
+class BulkProductWriter:
+    """
+    DatabaseManager.save_products_bulk üzerine asenkron tampon.
+    submit() her ürün için bir Future döner; Future, ürünün yazıldığı batch
+    flush edildiğinde save_product ile aynı (is_new, mesaj) sonucuyla tamamlanır.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = 50, flush_interval: float = 5.0,
+                 on_flush: Optional[Callable[[List[Tuple[bool, str]]], None]] = None):
+        self.db_manager = db_manager
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._items: List[Dict[str, Any]] = []
+        self._queue_ids: List[Optional[int]] = []
+        self._lease_owners: List[Optional[str]] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def start(self):
+        """Süre bazlı flush döngüsünü başlatır."""
+        if self._timer is None and self.flush_interval > 0:
+            self._timer = asyncio.create_task(self._flush_loop())
+
+    def submit(self, product_data: Dict[str, Any], queue_id: Optional[int] = None,
+               lease_owner: Optional[str] = None) -> asyncio.Future:
+        """Ürünü tampona ekler; batch dolduysa hemen yazar. lease_owner, kuyruk satırını tamamlarken kontrol edilir."""
+        if self._closed:
+            raise RuntimeError("BulkProductWriter kapatıldıktan sonra ürün eklenemez")
+        future = asyncio.get_running_loop().create_future()
+        self._items.append(product_data)
+        self._queue_ids.append(queue_id)
+        self._lease_owners.append(lease_owner)
+        self._futures.append(future)
+        if len(self._items) >= self.batch_size:
+            self.flush()
+        return future
+
+    def flush(self):
+        """Tampondaki her şeyi tek batch olarak yazar."""
+        if not self._items:
+            return
+        items, queue_ids, lease_owners, futures = self._items, self._queue_ids, self._lease_owners, self._futures
+        self._items, self._queue_ids, self._lease_owners, self._futures = [], [], [], []
+
+        try:
+            results = self.db_manager.save_products_bulk(items, queue_ids=queue_ids, lease_owners=lease_owners)
+        except Exception as e:
+            results = [(False, f"❌ Hata: {e}")] * len(items)
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+        if self.on_flush:
+            try:
+                self.on_flush(results)
+            except Exception as e:
+                console.print(f"[dim]⚠️ Flush callback hatası: {e}[/dim]")
+
+    async def _flush_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    async def close(self):
+        """Zamanlayıcıyı durdurur ve kalan ürünleri yazar."""
+        self._closed = True
+        if self._timer:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        self.flush()
@@ -3,16 +3,41 @@ Database Manager - Handle database connections and operations
 Supports Product + DailyMetric historical data model (Actual Schema)
 """
 
-from typing import Optional, Dict, Any, Tuple
-from datetime import datetime
-from sqlalchemy import create_engine
+import math
+import os
+import socket
+from typing import Optional, Dict, Any, Tuple, List
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select, update, insert, func, literal_column, or_, tuple_
 from sqlalchemy.orm import sessionmaker, Session
 from rich.console import Console
 
-from .models import Base, Product, DailyMetric, ScrapingLog, ScrapingQueue, ScrapingTask
+from .models import (Base, Product, DailyMetric, LatestMetric, ListingSnapshot, ProductFingerprint, ScrapingLog,
+                     ScrapingQueue, ScrapingTask)
+from .partitions import ensure_latest_metrics_trigger, ensure_metric_partitions
+from .fingerprints import RescrapePolicy, RescrapeReason, card_fingerprint, detail_fingerprint
 
 console = Console()
 
+# Kiralanan kuyruk satırının varsayılan ömrü (sn). Süresi dolan satırlar başka işçilerce geri alınır.
+DEFAULT_LEASE_SECONDS = 300
+
+# Backend MetricsService.calculate_velocity_score(use_log_scale=True) ile aynı ağırlıklar
+ENGAGEMENT_WEIGHTS = {'cart_count': 3.0, 'favorite_count': 2.0, 'view_count': 1.0}
+# products üzerindeki son metrik özeti kolonları
+SUMMARY_COLUMNS = ('last_price', 'last_discount_rate', 'last_engagement_score')
+
+
+def default_lease_owner(suffix: str = "") -> str:
+    """Kiralama sahibini tanımlayan etiket (host:pid[:suffix])"""
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{owner}:{suffix}" if suffix else owner
+
+
+def engagement_score(data: Dict[str, Any]) -> float:
+    """Etkileşim skoru: log(sepet+1)×3 + log(favori+1)×2 + log(görüntülenme+1) (backend ile aynı formül)"""
+    return sum(math.log(max(0, data.get(key) or 0) + 1) * weight for key, weight in ENGAGEMENT_WEIGHTS.items())
+
 
 class DatabaseManager:
     """
@@ -20,9 +45,12 @@ class DatabaseManager:
     Implements Product + DailyMetric pattern for historical data.
     """
     
-    def __init__(self, connection_url: str, platform: str = "trendyol"):
+    def __init__(self, connection_url: str, platform: str = "trendyol",
+                 rescrape_policy: Optional[RescrapePolicy] = None):
         self.connection_url = connection_url
         self.platform = platform
+        # None ise değişim takibi kapalı: her kazımada DailyMetric yazılır
+        self.rescrape_policy = rescrape_policy
         self.engine = create_engine(connection_url, echo=False)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self._session: Optional[Session] = None
@@ -31,6 +59,11 @@ class DatabaseManager:
         """Create database tables if they don't exist"""
         try:
             Base.metadata.create_all(bind=self.engine)
+            # daily_metrics partition'lıysa önümüzdeki aylar için partition aç
+            ensure_metric_partitions(self.engine)
+            # latest_metrics'i backend ingest / rescore yazımlarında da güncel tut (PostgreSQL)
+            with self.engine.begin() as conn:
+                ensure_latest_metrics_trigger(conn)
         except Exception as e:
             console.print(f"[red]❌ Tablo oluşturma hatası: {e}[/red]")
     
@@ -54,7 +87,7 @@ class DatabaseManager:
         url = product_data.get('url')
         
         if not url:
-            return False, "URL eksik"
+            return False, "❌ URL eksik"
         
         try:
             # 1. Product (Statik)
@@ -69,7 +102,8 @@ class DatabaseManager:
                     name=product_data.get('name', ''),
                     image_url=product_data.get('image_url', ''),
                     first_seen_at=datetime.utcnow(),
-                    last_scraped_at=datetime.utcnow()
+                    last_scraped_at=datetime.utcnow(),
+                    **self._summary_values(product_data)
                 )
                 session.add(product)
                 session.flush()
@@ -78,29 +112,23 @@ class DatabaseManager:
                 product.name = product_data.get('name') or product.name
                 product.image_url = product_data.get('image_url') or product.image_url
                 product.last_scraped_at = datetime.utcnow()
+                for key, value in self._summary_values(product_data).items():
+                    setattr(product, key, value)
             
-            # 2. DailyMetric (Dinamik)
-            metric = DailyMetric(
-                product_id=product.id,
-                recorded_at=datetime.utcnow(),
-                price=product_data.get('original_price', 0),
-                discounted_price=product_data.get('discounted_price', 0),
-                discount_rate=product_data.get('discount_rate', 0),
-                
-                # Correct mapped columns
-                avg_rating=product_data.get('rating', 0),         # rating -> avg_rating
-                rating_count=product_data.get('review_count', 0), # review_count -> rating_count
-                
-                favorite_count=product_data.get('favorite_count', 0),
-                cart_count=product_data.get('cart_count', 0),
-                clicks_24h=product_data.get('view_count', 0),
-            )
-            session.add(metric)
+            # 2. DailyMetric (Dinamik) - değişim takibi açıksa sadece değişimde / günün ilk kazımasında
+            now = datetime.utcnow()
+            changed = self._apply_fingerprints(session, {url: product_data}, {url: product.id}, now)
+            if url in changed:
+                values = self._metric_values(product_data, now)
+                session.add(DailyMetric(product_id=product.id, **values))
+                self._upsert_latest_metrics(session, [{'product_id': product.id, **values}])
             session.commit()
             
             name = product_data.get('name', '')[:40]
             if is_new:
                 return True, f"➕ Eklendi: {name}..."
+            elif url not in changed:
+                return False, f"⏸️ Değişmedi: {name}..."
             else:
                 return False, f"🔄 Güncellendi: {name}..."
                 
@@ -108,6 +136,306 @@ class DatabaseManager:
             session.rollback()
             return False, f"❌ Hata: {e}"
     
+    @staticmethod
+    def _metric_values(product_data: Dict[str, Any], recorded_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Scraper verisini daily_metrics kolonlarına eşler"""
+        return {
+            'recorded_at': recorded_at or datetime.utcnow(),
+            'price': product_data.get('original_price', 0),
+            'discounted_price': product_data.get('discounted_price', 0),
+            'discount_rate': product_data.get('discount_rate', 0),
+            # Correct mapped columns
+            'avg_rating': product_data.get('rating', 0),          # rating -> avg_rating
+            'rating_count': product_data.get('review_count', 0),  # review_count -> rating_count
+            'favorite_count': product_data.get('favorite_count', 0),
+            'cart_count': product_data.get('cart_count', 0),
+            'clicks_24h': product_data.get('view_count', 0),
+        }
+
+    @staticmethod
+    def _summary_values(product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """products tablosundaki son metrik özeti (backend create_daily_metric ile aynı alanlar)"""
+        return {
+            'last_price': product_data.get('original_price', 0),
+            'last_discount_rate': product_data.get('discount_rate', 0),
+            'last_engagement_score': engagement_score(product_data),
+        }
+
+    def save_products_bulk(self, items: List[Dict[str, Any]], queue_ids: Optional[List[Optional[int]]] = None,
+                           lease_owners: Optional[List[Optional[str]]] = None) -> List[Tuple[bool, str]]:
+        """
+        Ürün listesini tek transaction'da kaydeder:
+        INSERT ... ON CONFLICT (url) DO UPDATE ... RETURNING id, ardından daily_metrics'e çok satırlı INSERT.
+        Aynı URL batch'te tekrar ederse son veri kazanır; öncekiler yazılmaz ve "birleştirildi" sonucu alır.
+        queue_ids verilirse ilgili kuyruk satırları da aynı transaction'da 'completed' yapılır
+        (lease_owners verilirse her satır yalnızca hâlâ kendi sahibine kiralıysa).
+        Her eleman için save_product ile aynı (is_new, mesaj) sonucunu döner.
+        """
+        if not items:
+            return []
+
+        owners = lease_owners or [None] * len(items)
+        results: List[Optional[Tuple[bool, str]]] = [None] * len(items)
+        valid = []
+        for i, data in enumerate(items):
+            if data.get('url'):
+                valid.append(i)
+            else:
+                results[i] = (False, "❌ URL eksik")
+                if queue_ids and queue_ids[i]:
+                    self.update_queue_status(queue_ids[i], "failed", "URL eksik", owner=owners[i])
+        if not valid:
+            return results
+
+        # Aynı URL tekrar ederse son geçiş yazılır, öncekiler ona birleştirilir
+        last_index = {items[i]['url']: i for i in valid}
+        merged = {i for i in valid if last_index[items[i]['url']] != i}
+        for i in merged:
+            results[i] = (False, f"🔁 Birleştirildi: {(items[i].get('name') or '')[:40]}...")
+        latest = [i for i in valid if i not in merged]
+
+        session = self.get_session()
+        now = datetime.utcnow()
+        try:
+            rows_by_url: Dict[str, Dict[str, Any]] = {}
+            for i in latest:
+                data = items[i]
+                rows_by_url[data['url']] = {
+                    'product_code': data.get('product_id'),
+                    'url': data['url'],
+                    'brand': data.get('brand', ''),
+                    'name': data.get('name', ''),
+                    'image_url': data.get('image_url', ''),
+                    'first_seen_at': now,
+                    'last_scraped_at': now,
+                    **self._summary_values(data),
+                }
+            product_ids, new_urls = self._upsert_products(session, rows_by_url)
+
+            data_by_url = {items[i]['url']: items[i] for i in latest}
+            metric_urls = self._apply_fingerprints(session, data_by_url, product_ids, now)
+            metrics = [
+                {'product_id': product_ids[url], **self._metric_values(data, now)}
+                for url, data in data_by_url.items() if url in metric_urls
+            ]
+            if metrics:
+                session.execute(insert(DailyMetric), metrics)
+                self._upsert_latest_metrics(session, metrics)
+
+            done = [(queue_ids[i], owners[i]) for i in valid if queue_ids and queue_ids[i]]
+            owned = [(qid, owner) for qid, owner in done if owner]
+            unowned = [qid for qid, owner in done if not owner]
+            conditions = []
+            if owned:
+                conditions.append(tuple_(ScrapingQueue.id, ScrapingQueue.lease_owner).in_(owned))
+            if unowned:
+                conditions.append(ScrapingQueue.id.in_(unowned))
+            if conditions:
+                session.execute(
+                    update(ScrapingQueue)
+                    .where(or_(*conditions))
+                    .values(status="completed", processed_at=now, lease_owner=None, lease_expires_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            console.print(f"[yellow]⚠️ Toplu kayıt başarısız, tek tek deneniyor: {e}[/yellow]")
+            # Hatalı satırı izole etmek için tekil yola düş (birleştirilen tekrarlar yeniden yazılmaz)
+            for i in valid:
+                if i not in merged:
+                    results[i] = self.save_product(items[i])
+                qid = queue_ids[i] if queue_ids else None
+                if qid:
+                    failed = results[i][1].startswith("❌")
+                    self.update_queue_status(qid, "failed" if failed else "completed", results[i][1] if failed else None,
+                                             owner=owners[i])
+            return results
+
+        for i in latest:
+            url = items[i]['url']
+            name = (items[i].get('name') or '')[:40]
+            if url in new_urls:
+                results[i] = (True, f"➕ Eklendi: {name}...")
+            elif url not in metric_urls:
+                results[i] = (False, f"⏸️ Değişmedi: {name}...")
+            else:
+                results[i] = (False, f"🔄 Güncellendi: {name}...")
+        return results
+
+    def _upsert_products(self, session: Session, rows_by_url: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, int], set]:
+        """
+        Ürün satırlarını INSERT ... ON CONFLICT (url) DO UPDATE ile yazar (commit çağırana aittir).
+        Satırlarda son metrik özeti (SUMMARY_COLUMNS) varsa aynı ifadede güncellenir.
+        (url -> product id, yeni eklenen url'ler) döner.
+        """
+        urls = list(rows_by_url.keys())
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            # xmax = 0 -> satır bu ifadeyle eklendi (güncellenmedi)
+            inserted_col = literal_column("(xmax = 0)").label("inserted")
+            existing_urls = None
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            inserted_col = None
+            existing_urls = set(session.execute(select(Product.url).where(Product.url.in_(urls))).scalars())
+
+        rows = list(rows_by_url.values())
+        stmt = dialect_insert(Product).values(rows)
+        excluded = stmt.excluded
+        set_ = {
+            # Boş gelen alan mevcut değeri ezmesin (save_product ile aynı davranış)
+            'brand': func.coalesce(func.nullif(excluded.brand, ''), Product.brand),
+            'name': func.coalesce(func.nullif(excluded.name, ''), Product.name),
+            'image_url': func.coalesce(func.nullif(excluded.image_url, ''), Product.image_url),
+            'last_scraped_at': excluded.last_scraped_at,
+        }
+        set_.update({key: excluded[key] for key in SUMMARY_COLUMNS if key in rows[0]})
+        stmt = stmt.on_conflict_do_update(index_elements=[Product.url], set_=set_)
+        returning = [Product.id, Product.url] + ([inserted_col] if inserted_col is not None else [])
+        product_rows = session.execute(stmt.returning(*returning)).all()
+
+        product_ids = {row.url: row.id for row in product_rows}
+        if existing_urls is None:
+            new_urls = {row.url for row in product_rows if row.inserted}
+        else:
+            new_urls = set(urls) - existing_urls
+        return product_ids, new_urls
+
+    def _upsert_latest_metrics(self, session: Session, metrics: List[Dict[str, Any]]):
+        """
+        latest_metrics'i yazılan metrik satırlarıyla günceller (commit çağırana aittir).
+        Daha eski tarihli bir satır mevcut son değeri ezmez.
+        PostgreSQL'de bu işi daily_metrics tetikleyicisi yapar (ensure_latest_metrics_trigger).
+        """
+        if not metrics or self.engine.dialect.name == "postgresql":
+            return
+        # Aynı ürün batch'te tekrar ederse son satır kazanır
+        rows = list({m['product_id']: m for m in metrics}.values())
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        columns = [c.name for c in LatestMetric.__table__.columns]
+        stmt = dialect_insert(LatestMetric).values([{k: m.get(k) for k in columns} for m in rows])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LatestMetric.product_id],
+            set_={k: stmt.excluded[k] for k in columns if k != 'product_id'},
+            where=or_(LatestMetric.recorded_at.is_(None), LatestMetric.recorded_at <= stmt.excluded.recorded_at)
+        )
+        session.execute(stmt)
+
+    def save_listing_snapshots(self, cards: List[Dict[str, Any]], task_id: Optional[int] = None) -> int:
+        """
+        Listeleme kartlarını detay ziyareti olmadan kaydeder: ürün satırı (yoksa) + listing_snapshots satırı.
+        DailyMetric'e yazılmaz; kartta social-proof sayıları olmadığından zaman serisini bozmasın.
+        Yazılan snapshot sayısını döner.
+        """
+        cards = [c for c in cards if c.get('url')]
+        if not cards:
+            return 0
+        session = self.get_session()
+        now = datetime.utcnow()
+        try:
+            rows_by_url = {
+                c['url']: {
+                    'product_code': c.get('product_id'),
+                    'url': c['url'],
+                    'brand': c.get('brand') or '',
+                    'name': c.get('name') or '',
+                    'image_url': c.get('image_url') or '',
+                    'task_id': task_id,
+                    'first_seen_at': now,
+                    'last_scraped_at': now,
+                }
+                for c in cards
+            }
+            product_ids, _ = self._upsert_products(session, rows_by_url)
+            session.execute(insert(ListingSnapshot), [
+                {
+                    'product_id': product_ids[c['url']],
+                    'task_id': task_id,
+                    'recorded_at': now,
+                    'price': c.get('original_price') or c.get('discounted_price') or 0,
+                    'discounted_price': c.get('discounted_price') or 0,
+                    'discount_rate': c.get('discount_rate') or 0,
+                    'avg_rating': c.get('rating') or 0,
+                    'rating_count': c.get('review_count') or 0,
+                    'page': c.get('page'),
+                    'position': c.get('position'),
+                }
+                for c in cards
+            ])
+            session.commit()
+            return len(cards)
+        except Exception as e:
+            session.rollback()
+            console.print(f"[yellow]⚠️ Kart snapshot kaydı başarısız: {e}[/yellow]")
+            return 0
+
+    def _apply_fingerprints(self, session: Session, data_by_url: Dict[str, Dict[str, Any]],
+                            product_ids: Dict[str, int], now: datetime) -> set:
+        """
+        Parmak izlerini ve yeniden kazıma takvimini günceller (commit çağırana aittir).
+        DailyMetric yazılması gereken URL'leri döner: yeni ürün, değişen veri veya bugün henüz satırı olmayan ürün.
+        Değişim takibi kapalıysa tüm URL'ler döner.
+        """
+        urls = set(data_by_url)
+        policy = self.rescrape_policy
+        if policy is None or not urls:
+            return urls
+
+        existing = {
+            fp.url: fp for fp in
+            session.query(ProductFingerprint).filter(ProductFingerprint.url.in_(urls)).all()
+        }
+        metric_urls = set()
+        for url, data in data_by_url.items():
+            fingerprint = detail_fingerprint(data)
+            fp = existing.get(url)
+            if fp is None:
+                fp = ProductFingerprint(url=url, interval_minutes=policy.initial_minutes, unchanged_streak=0)
+                session.add(fp)
+                changed = True
+            else:
+                changed = fp.fingerprint != fingerprint
+                fp.interval_minutes = policy.next_interval(fp.interval_minutes, changed)
+
+            fp.product_id = product_ids.get(url, fp.product_id)
+            fp.card_fingerprint = card_fingerprint(data)
+            fp.last_scraped_at = now
+            fp.next_scrape_at = policy.next_scrape_at(now, fp.interval_minutes)
+            if changed:
+                fp.fingerprint = fingerprint
+                fp.last_changed_at = now
+                fp.unchanged_streak = 0
+            else:
+                fp.unchanged_streak = (fp.unchanged_streak or 0) + 1
+
+            if changed or fp.last_metric_at is None or fp.last_metric_at.date() != now.date():
+                fp.last_metric_at = now
+                metric_urls.add(url)
+        return metric_urls
+
+    def rescrape_decision(self, url: str, card: Optional[Dict[str, Any]] = None) -> Tuple[bool, RescrapeReason]:
+        """
+        Linkin detay sayfasının şimdi ziyaret edilip edilmeyeceğine karar verir.
+        - Parmak izi yoksa: kazı (yeni ürün)
+        - Kart verisi varsa ve kartta görünen alanlar değiştiyse: takvimi beklemeden kazı
+        - Takvimdeki zaman gelmediyse: atla
+        """
+        if self.rescrape_policy is None:
+            return True, RescrapeReason.DISABLED
+        session = self.get_session()
+        fp = session.execute(
+            select(ProductFingerprint.card_fingerprint, ProductFingerprint.next_scrape_at)
+            .where(ProductFingerprint.url == url)
+        ).first()
+        if fp is None:
+            return True, RescrapeReason.NEW
+        if card and card_fingerprint(card) != fp.card_fingerprint:
+            return True, RescrapeReason.CARD_CHANGED
+        if fp.next_scrape_at and datetime.utcnow() < fp.next_scrape_at:
+            return False, RescrapeReason.UNCHANGED
+        return True, RescrapeReason.DUE
+
     def get_product_count(self) -> int:
         session = self.get_session()
         return session.query(Product).count()
@@ -144,14 +472,18 @@ class DatabaseManager:
             session.commit()
 
     def update_log_progress(self, log_id: int, added: int, updated: int, errors: int):
-        """Log kaydını canlı olarak günceller."""
+        """Log kaydını canlı olarak günceller (SELECT olmadan tek UPDATE)."""
         session = self.get_session()
-        log = session.query(ScrapingLog).filter(ScrapingLog.id == log_id).first()
-        if log:
-            log.products_added = added
-            log.products_updated = updated
-            log.errors = errors
+        try:
+            session.execute(
+                update(ScrapingLog)
+                .where(ScrapingLog.id == log_id)
+                .values(products_added=added, products_updated=updated, errors=errors)
+                .execution_options(synchronize_session=False)
+            )
             session.commit()
+        except Exception:
+            session.rollback()
 
     def log_error(self, log_id: int, error_message: str, screenshot_path: str = None):
         """Hata detayını veritabanına kaydeder."""
@@ -181,8 +513,8 @@ class DatabaseManager:
                 
             session.commit()
 
-    def add_to_queue(self, task_id: int, url: str):
-        """Linki kazıma kuyruğuna ekler (Eğer yoksa)"""
+    def add_to_queue(self, task_id: int, url: str) -> Optional[int]:
+        """Linki kazıma kuyruğuna ekler (Eğer yoksa). Yeni satırın id'sini, zaten varsa None döner."""
         session = self.get_session()
         # Zaten ekli mi kontrol et (pending veya processing ise tekrar ekleme)
         exists = session.query(ScrapingQueue).filter(
@@ -195,33 +527,140 @@ class DatabaseManager:
             new_item = ScrapingQueue(task_id=task_id, url=url, status="pending")
             session.add(new_item)
             session.commit()
-            return True
-        return False
+            return new_item.id
+        return None
 
     def get_next_from_queue(self, task_id: int):
         """Sıradaki bekleyen linki çeker ve durumunu 'processing' yapar."""
+        items = self.claim_queue_batch(task_id, owner=default_lease_owner(), limit=1)
+        return items[0] if items else None
+
+    def claim_queue_batch(self, task_id: int, owner: str, limit: int = 10,
+                          lease_seconds: int = DEFAULT_LEASE_SECONDS) -> List[Any]:
+        """
+        Bekleyen en eski `limit` linki tek sorguda atomik olarak kiralar.
+        PostgreSQL'de FOR UPDATE SKIP LOCKED ile eşzamanlı işçiler birbirini beklemez;
+        SQLite'ta tek UPDATE ifadesi veritabanı yazma kilidi altında çalıştığından aynı garantiyi verir.
+        Dönen satırlarda `id` ve `url` alanları bulunur.
+        """
         session = self.get_session()
-        item = session.query(ScrapingQueue).filter(
-            ScrapingQueue.task_id == task_id,
-            ScrapingQueue.status == "pending"
-        ).order_by(ScrapingQueue.discovered_at.asc()).first()
-        
-        if item:
-            item.status = "processing"
+        now = datetime.utcnow()
+        try:
+            # Çökmüş işçilerin süresi dolmuş kiralarını kuyruğa geri koy
+            self._release_expired_leases(session, task_id, now)
+
+            candidates = (
+                select(ScrapingQueue.id)
+                .where(ScrapingQueue.task_id == task_id, ScrapingQueue.status == "pending")
+                .order_by(ScrapingQueue.discovered_at.asc())
+                .limit(limit)
+            )
+            if self.engine.dialect.name == "postgresql":
+                candidates = candidates.with_for_update(skip_locked=True)
+
+            stmt = (
+                update(ScrapingQueue)
+                .where(ScrapingQueue.id.in_(candidates.scalar_subquery()))
+                .values(
+                    status="processing",
+                    lease_owner=owner,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds)
+                )
+                .returning(ScrapingQueue.id, ScrapingQueue.url)
+                .execution_options(synchronize_session=False)
+            )
+            items = session.execute(stmt).all()
             session.commit()
-            return item
-        return None
+            return items
+        except Exception as e:
+            session.rollback()
+            console.print(f"[red]❌ Kuyruk kiralama hatası: {e}[/red]")
+            return []
 
-    def update_queue_status(self, queue_id: int, status: str, error: str = None):
-        """Kuyruktaki linkin durumunu günceller."""
+    def transfer_lease(self, queue_id: int, from_owner: str, to_owner: str,
+                       lease_seconds: int = DEFAULT_LEASE_SECONDS) -> bool:
+        """
+        Kiralı satırı from_owner'dan to_owner'a devreder ve süresini yeniler (besleyici -> işçi).
+        Kira bu arada başka sahibe geçtiyse False döner; satır kazınmamalıdır.
+        """
         session = self.get_session()
-        item = session.query(ScrapingQueue).filter(ScrapingQueue.id == queue_id).first()
-        if item:
-            item.status = status
-            item.processed_at = datetime.utcnow()
-            if error:
-                item.error_msg = error
+        try:
+            moved = session.execute(
+                update(ScrapingQueue)
+                .where(
+                    ScrapingQueue.id == queue_id,
+                    ScrapingQueue.status == "processing",
+                    ScrapingQueue.lease_owner == from_owner
+                )
+                .values(lease_owner=to_owner, lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+                .execution_options(synchronize_session=False)
+            ).rowcount or 0
             session.commit()
+            return moved > 0
+        except Exception as e:
+            session.rollback()
+            console.print(f"[red]❌ Kira devri hatası: {e}[/red]")
+            return False
+
+    def renew_leases(self, owners: List[str], lease_seconds: int = DEFAULT_LEASE_SECONDS) -> int:
+        """
+        Verilen sahiplerin hâlâ işlenmekte olan tüm satırlarının kira süresini uzatır (heartbeat).
+        Bellek içi kuyrukta veya yazım tamponunda bekleyen satırlar böylece başka sürece geçmez.
+        Uzatılan satır sayısını döner.
+        """
+        if not owners:
+            return 0
+        session = self.get_session()
+        try:
+            renewed = session.execute(
+                update(ScrapingQueue)
+                .where(ScrapingQueue.status == "processing", ScrapingQueue.lease_owner.in_(owners))
+                .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+                .execution_options(synchronize_session=False)
+            ).rowcount or 0
+            session.commit()
+            return renewed
+        except Exception as e:
+            session.rollback()
+            console.print(f"[red]❌ Kira yenileme hatası: {e}[/red]")
+            return 0
+
+    def _release_expired_leases(self, session: Session, task_id: Optional[int], now: datetime) -> int:
+        stmt = (
+            update(ScrapingQueue)
+            .where(
+                ScrapingQueue.status == "processing",
+                ScrapingQueue.lease_expires_at.isnot(None),
+                ScrapingQueue.lease_expires_at < now
+            )
+            .values(status="pending", lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        if task_id is not None:
+            stmt = stmt.where(ScrapingQueue.task_id == task_id)
+        return session.execute(stmt).rowcount or 0
+
+    def update_queue_status(self, queue_id: int, status: str, error: str = None, owner: Optional[str] = None) -> bool:
+        """
+        Kuyruktaki linkin durumunu günceller ve kirayı bırakır.
+        owner verilirse satır yalnızca hâlâ bu sahibe kiralıysa güncellenir
+        (kira süresi dolup başka işçiye geçen satırın sonucu ezilmez). Güncellendiyse True döner.
+        """
+        session = self.get_session()
+        query = session.query(ScrapingQueue).filter(ScrapingQueue.id == queue_id)
+        if owner is not None:
+            query = query.filter(ScrapingQueue.lease_owner == owner)
+        item = query.first()
+        if not item:
+            return False
+        item.status = status
+        item.processed_at = datetime.utcnow()
+        item.lease_owner = None
+        item.lease_expires_at = None
+        if error:
+            item.error_msg = error
+        session.commit()
+        return True
 
     def get_task_config(self, task_id: int):
         """Görev ayarlarını çeker (max_pages vb.)"""
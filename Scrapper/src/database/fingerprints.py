@@ -0,0 +1,84 @@
+"""
+Change Detection - Ürün parmak izi ve uyarlamalı yeniden kazıma aralığı
+Fiyat, puan ve social-proof sayılarından kısa bir özet (fingerprint) üretilir.
+Değişen ürünlerin aralığı kısalır, değişmeyenlerinki uzar; böylece pahalı
+detay ziyaretleri değişken ürünlere yoğunlaşır.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class RescrapeReason(str, Enum):
+    """DatabaseManager.rescrape_decision'ın gerekçesi (değerler log / ekran içindir, karşılaştırma üyeyle yapılır)"""
+    DISABLED = "takip kapalı"
+    NEW = "yeni"
+    CARD_CHANGED = "kart değişti"
+    UNCHANGED = "değişmedi"
+    DUE = "zamanı geldi"
+
+
+@dataclass
+class RescrapePolicy:
+    """Yeniden kazıma aralığı sınırları (dakika)"""
+    min_minutes: int = 60
+    max_minutes: int = 4320
+    initial_minutes: int = 360
+    backoff: float = 2.0
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional["RescrapePolicy"]:
+        """settings.change_detection kapalıysa None döner (her ürün her seferinde kazınır)."""
+        if not settings.change_detection:
+            return None
+        return cls(
+            min_minutes=settings.rescrape_min_minutes,
+            max_minutes=settings.rescrape_max_minutes,
+            initial_minutes=settings.rescrape_initial_minutes,
+            backoff=settings.rescrape_backoff,
+        )
+
+    def next_interval(self, current: Optional[int], changed: bool) -> int:
+        """Değişim varsa aralığı yarıya indirir, yoksa backoff katsayısıyla uzatır."""
+        current = current or self.initial_minutes
+        interval = current / self.backoff if changed else current * self.backoff
+        return int(min(self.max_minutes, max(self.min_minutes, interval)))
+
+    def next_scrape_at(self, now: datetime, interval: int) -> datetime:
+        return now + timedelta(minutes=interval)
+
+
+def _normalize(value: Any, ndigits: int) -> str:
+    try:
+        return f"{round(float(value or 0), ndigits)}"
+    except (TypeError, ValueError):
+        return "0"
+
+
+def _digest(parts) -> str:
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def card_fingerprint(data: Dict[str, Any]) -> str:
+    """
+    Listeleme kartında da görünen alanların özeti (fiyat kuruş, puan 1 hane hassasiyetinde).
+    Detay verisinden ve kart verisinden aynı anahtarlarla hesaplanır, böylece karşılaştırılabilir.
+    """
+    return _digest([
+        _normalize(data.get('discounted_price'), 2),
+        _normalize(data.get('rating'), 1),
+        _normalize(data.get('review_count'), 0),
+    ])
+
+
+def detail_fingerprint(data: Dict[str, Any]) -> str:
+    """Detay sayfası verisinin (fiyat + puan + social-proof) özeti."""
+    return _digest([
+        card_fingerprint(data),
+        _normalize(data.get('original_price'), 2),
+        _normalize(data.get('favorite_count'), 0),
+        _normalize(data.get('cart_count'), 0),
+    ])
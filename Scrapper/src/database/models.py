@@ -4,7 +4,7 @@ Matches ACTUAL Database Schema (verified via inspection)
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -28,6 +28,11 @@ class Product(Base):
     attributes = Column(JSONB)
     task_id = Column(Integer, ForeignKey("scraping_tasks.id"), nullable=True)
     
+    # Son metriğin özeti (backend ile ortak kolonlar; daily_metrics JOIN'i olmadan hızlı erişim)
+    last_price = Column(Float)
+    last_discount_rate = Column(Float)
+    last_engagement_score = Column(Float, index=True)
+    
     first_seen_at = Column(DateTime, default=datetime.utcnow)
     last_scraped_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -61,6 +66,56 @@ class DailyMetric(Base):
     product = relationship("Product", back_populates="daily_metrics")
 
 
+class LatestMetric(Base):
+    """Ürün başına en son DailyMetric'in kopyası (yazımda güncellenir; MAX(id) taraması gerekmez)"""
+    __tablename__ = "latest_metrics"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    recorded_at = Column(DateTime, index=True)
+    price = Column(Float, default=0)
+    discounted_price = Column(Float, default=0)
+    discount_rate = Column(Float, default=0)
+    avg_rating = Column(Float, default=0)
+    rating_count = Column(Integer, default=0)
+    favorite_count = Column(Integer, default=0)
+    cart_count = Column(Integer, default=0)
+    clicks_24h = Column(Integer, default=0)
+
+
+class ListingSnapshot(Base):
+    """Listeleme kartından okunan hafif metrik (detay ziyareti olmadan; social-proof içermez)"""
+    __tablename__ = "listing_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    task_id = Column(Integer, ForeignKey("scraping_tasks.id"), nullable=True)
+    recorded_at = Column(DateTime, default=datetime.utcnow, index=True)
+    price = Column(Float, default=0)
+    discounted_price = Column(Float, default=0)
+    discount_rate = Column(Float, default=0)
+    avg_rating = Column(Float, default=0)
+    rating_count = Column(Integer, default=0)
+    page = Column(Integer) # Listeleme sayfası
+    position = Column(Integer) # Sayfa içindeki sıra (listeleme sıralaması)
+
+
+class ProductFingerprint(Base):
+    """Ürün değişim özeti ve uyarlamalı yeniden kazıma takvimi"""
+    __tablename__ = "product_fingerprints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), unique=True, nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=True, index=True)
+    fingerprint = Column(String(32)) # Fiyat + puan + social-proof özeti
+    card_fingerprint = Column(String(32)) # Sadece kartta görünen alanların özeti
+    interval_minutes = Column(Integer, default=360)
+    unchanged_streak = Column(Integer, default=0)
+    last_scraped_at = Column(DateTime)
+    last_changed_at = Column(DateTime)
+    last_metric_at = Column(DateTime) # Son DailyMetric satırı (günde en az bir satır yazılır)
+    next_scrape_at = Column(DateTime, index=True)
+
+
 class ScrapingLog(Base):
     """Log tablosu"""
     __tablename__ = "scraping_logs"
@@ -101,6 +156,10 @@ class ScrapingTask(Base):
 class ScrapingQueue(Base):
     """Bulunan ama henüz detayları kazılmamış linkler havuzu"""
     __tablename__ = "scraping_queue"
+    __table_args__ = (
+        # claim_queue_batch sorgusu: task_id + status filtresi, discovered_at sıralaması
+        Index("ix_scraping_queue_task_status_discovered", "task_id", "status", "discovered_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("scraping_tasks.id"), nullable=False)
@@ -109,3 +168,5 @@ class ScrapingQueue(Base):
     discovered_at = Column(DateTime, default=datetime.utcnow)
     processed_at = Column(DateTime)
     error_msg = Column(Text)
+    lease_owner = Column(String(100), nullable=True) # Satırı kiralayan işçi (host:pid:worker)
+    lease_expires_at = Column(DateTime, nullable=True) # Bu zamandan sonra satır geri alınabilir
@@ -0,0 +1,225 @@
+"""
+Daily Metrics Partitioning - daily_metrics tablosunu recorded_at üzerinden aylık
+native PostgreSQL partition'larına böler.
+- convert_daily_metrics(): mevcut tabloyu tek seferlik partitioned tabloya taşır
+- ensure_metric_partitions(): gelecek aylar için partition'ları önceden açar
+- ensure_latest_metrics_trigger(): latest_metrics'i daily_metrics'e yazan her süreç için (scraper,
+  backend ingest, rescore) veritabanı tetikleyicisiyle güncel tutar
+SQLite ve partition'sız tablolarda bu fonksiyonlar hiçbir şey yapmaz.
+"""
+
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from rich.console import Console
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from .models import LatestMetric
+
+console = Console()
+
+TABLE = "daily_metrics"
+DEFAULT_PARTITION = f"{TABLE}_default"
+# Kopya sırasında güncellenen / silinen satırların id'leri (son kilitli adımda yeniden eşitlenir)
+SYNC_TABLE = f"{TABLE}_sync"
+LATEST_TRIGGER = "trg_latest_metrics"
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(d: date, table: str = TABLE) -> str:
+    return f"{table}_{d:%Y_%m}"
+
+
+def is_partitioned(conn: Connection, table: str = TABLE) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+    ), {"table": table}).scalar())
+
+
+def create_month_partition(conn: Connection, month: date, table: str = TABLE):
+    """[month, month+1) aralığı için partition açar (varsa dokunmaz)."""
+    start = month_start(month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start, table)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+    ))
+
+
+def ensure_metric_partitions(engine: Engine, months_ahead: int = 2) -> int:
+    """Bu ay ve sonraki `months_ahead` ay için partition'ları açar. Açılan/kontrol edilen ay sayısını döner."""
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return 0
+        this_month = month_start(datetime.utcnow().date())
+        for offset in range(months_ahead + 1):
+            create_month_partition(conn, add_months(this_month, offset))
+        return months_ahead + 1
+
+
+def ensure_latest_metrics_trigger(conn: Connection, table: str = TABLE):
+    """
+    daily_metrics'e eklenen / fiyat-puan-sayaç kolonları güncellenen her satırı latest_metrics'e yansıtır.
+    Daha eski tarihli satır mevcut son değeri ezmez (DatabaseManager._upsert_latest_metrics ile aynı kural).
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    columns = [c.name for c in LatestMetric.__table__.columns]
+    values = [c for c in columns if c != "product_id"]
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{c}" for c in columns)
+    assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in values)
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION latest_metrics_upsert() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.recorded_at IS NULL THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO latest_metrics ({column_list}) VALUES ({new_values})
+            ON CONFLICT (product_id) DO UPDATE SET {assignments}
+            WHERE latest_metrics.recorded_at IS NULL OR latest_metrics.recorded_at <= EXCLUDED.recorded_at;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """))
+    # Her açılışta tetikleyiciyi yeniden kurmak tabloyu kilitler; yalnızca yoksa oluştur
+    if conn.execute(text(
+        "SELECT 1 FROM pg_trigger WHERE tgname = :name AND tgrelid = to_regclass(:table)"
+    ), {"name": LATEST_TRIGGER, "table": table}).scalar():
+        return
+    conn.execute(text(
+        f"CREATE TRIGGER {LATEST_TRIGGER} AFTER INSERT OR UPDATE OF {', '.join(values)} ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION latest_metrics_upsert()"
+    ))
+
+
+def _backfill_recorded_at(conn: Connection) -> int:
+    """
+    recorded_at'i boş satırlara ürünün ilk görülme zamanını yazar.
+    Partition kolonu birincil anahtarda olduğundan boş değer yeni tabloya kopyalanamaz.
+    """
+    return conn.execute(text(
+        f"UPDATE {TABLE} dm SET recorded_at = COALESCE(p.first_seen_at, now() AT TIME ZONE 'utc') "
+        f"FROM products p WHERE p.id = dm.product_id AND dm.recorded_at IS NULL"
+    )).rowcount or 0
+
+
+def _copy_range(conn: Connection, source: str, target: str, where: str, params: dict) -> int:
+    return conn.execute(text(f"INSERT INTO {target} SELECT * FROM {source} WHERE {where}"), params).rowcount or 0
+
+
+def convert_daily_metrics(engine: Engine, months_ahead: int = 2) -> Tuple[int, Optional[str]]:
+    """
+    daily_metrics'i aylık partition'lı tabloya taşır:
+    1. LIKE ile partitioned kopya + aylık partition'lar + DEFAULT partition
+    2. Mevcut satırlar ay ay kopyalanır (her ay ayrı transaction; tablo yazılabilir kalır).
+       Bu sırada güncellenen / silinen satırların id'leri tetikleyiciyle daily_metrics_sync'e yazılır.
+    3. Kısa ACCESS EXCLUSIVE kilit altında değişen satırlar yeniden eşitlenir, kopyadan sonra gelen
+       satırlar alınır ve isimler değiştirilir
+    recorded_at'i boş satırlar önce ürünün ilk görülme zamanıyla doldurulur.
+    Eski tablo daily_metrics_legacy olarak kalır. (kopyalanan satır, eski tablo adı) döner.
+    """
+    if engine.dialect.name != "postgresql":
+        console.print("[yellow]⚠️ Partition yalnızca PostgreSQL'de desteklenir.[/yellow]")
+        return 0, None
+
+    staging = f"{TABLE}_part"
+    legacy = f"{TABLE}_legacy"
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            console.print("[green]✅ daily_metrics zaten partition'lı.[/green]")
+            return 0, None
+        backfilled = _backfill_recorded_at(conn)
+        if backfilled:
+            console.print(f"[yellow]⚠️ recorded_at'i boş {backfilled:,} satır ürünün ilk görülme zamanıyla dolduruldu[/yellow]")
+        # Kopya boyunca değişen satırları kaydet (id <= max_id aralığı ay ay kopyalanırken güncellenebilir)
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {SYNC_TABLE} (id BIGINT NOT NULL)"))
+        conn.execute(text(f"TRUNCATE {SYNC_TABLE}"))
+        conn.execute(text(f"""
+            CREATE OR REPLACE FUNCTION {SYNC_TABLE}_log() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO {SYNC_TABLE} (id) VALUES (OLD.id);
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """))
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {SYNC_TABLE}_trg ON {TABLE}"))
+        conn.execute(text(
+            f"CREATE TRIGGER {SYNC_TABLE}_trg AFTER UPDATE OR DELETE ON {TABLE} "
+            f"FOR EACH ROW EXECUTE FUNCTION {SYNC_TABLE}_log()"
+        ))
+        bounds = conn.execute(text(f"SELECT MIN(recorded_at), MAX(recorded_at), MAX(id) FROM {TABLE}")).first()
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging} CASCADE"))
+        conn.execute(text(
+            f"CREATE TABLE {staging} (LIKE {TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (recorded_at)"
+        ))
+        # Partitioned tabloda birincil anahtar partition kolonunu içermek zorunda
+        conn.execute(text(f"ALTER TABLE {staging} ADD PRIMARY KEY (id, recorded_at)"))
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION}_new PARTITION OF {staging} DEFAULT"))
+
+        today = month_start(datetime.utcnow().date())
+        first = month_start(bounds[0].date()) if bounds[0] else today
+        last = add_months(max(today, month_start(bounds[1].date()) if bounds[1] else today), months_ahead)
+        months = []
+        month = first
+        while month <= last:
+            months.append(month)
+            create_month_partition(conn, month, staging)
+            month = add_months(month, 1)
+    max_id = bounds[2] or 0
+
+    copied = 0
+    for month in months:
+        with engine.begin() as conn:
+            n = _copy_range(conn, TABLE, staging,
+                            "recorded_at >= :start AND recorded_at < :end AND id <= :max_id",
+                            {"start": month, "end": add_months(month, 1), "max_id": max_id})
+        copied += n
+        if n:
+            console.print(f"[dim]   - {month:%Y-%m}: {n:,} satır kopyalandı[/dim]")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+        # Kopya sırasında boş recorded_at ile gelen satırlar (güncellenenler sync tablosuna düşer)
+        _backfill_recorded_at(conn)
+        conn.execute(text(f"DROP TRIGGER {SYNC_TABLE}_trg ON {TABLE}"))
+        # Kopyalandıktan sonra güncellenen / silinen satırlar: kopyayı sil, kaynaktaki son hali (varsa) al
+        conn.execute(text(f"DELETE FROM {staging} WHERE id IN (SELECT id FROM {SYNC_TABLE})"))
+        resynced = _copy_range(conn, TABLE, staging,
+                               f"id <= :max_id AND id IN (SELECT id FROM {SYNC_TABLE})", {"max_id": max_id})
+        if resynced:
+            console.print(f"[dim]   - kopya sırasında değişen {resynced:,} satır yeniden eşitlendi[/dim]")
+        # Kopya sırasında gelenler son haliyle alınır
+        copied += _copy_range(conn, TABLE, staging, "id > :max_id", {"max_id": max_id})
+        conn.execute(text(f"DROP TABLE {SYNC_TABLE}"))
+        conn.execute(text(f"DROP FUNCTION {SYNC_TABLE}_log()"))
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {LATEST_TRIGGER} ON {TABLE}"))
+        conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {legacy}"))
+        conn.execute(text(f"ALTER TABLE {staging} RENAME TO {TABLE}"))
+        conn.execute(text(f"ALTER TABLE {DEFAULT_PARTITION}_new RENAME TO {DEFAULT_PARTITION}"))
+        for month in months:
+            conn.execute(text(f"ALTER TABLE {partition_name(month, staging)} RENAME TO {partition_name(month)}"))
+        # id varsayılanı aynı sequence'i kullanır; sahipliği yeni tabloya geçir
+        conn.execute(text(
+            f"ALTER SEQUENCE IF EXISTS {TABLE}_id_seq OWNED BY {TABLE}.id"
+        ))
+        conn.execute(text(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_product_id_fkey "
+            f"FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE"
+        ))
+        # Partitioned index'ler tüm partition'lara otomatik uygulanır
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_product_recorded ON {TABLE} (product_id, recorded_at DESC)"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_recorded_at_p ON {TABLE} (recorded_at)"))
+        ensure_latest_metrics_trigger(conn)
+    return copied, legacy
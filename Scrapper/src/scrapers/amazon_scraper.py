@@ -43,7 +43,7 @@ class AmazonScraper(BaseScraper):
             
             try:
                 await self.page.goto(url, wait_until='networkidle', timeout=60000)
-                await asyncio.sleep(3)
+                await self.wait_listing_ready()
                 await self.scroll_page()
                 
                 # Try each selector
@@ -90,7 +90,7 @@ class AmazonScraper(BaseScraper):
         """Scrape a single Amazon product page"""
         try:
             await self.page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            await asyncio.sleep(3)
+            await self.wait_product_ready('#productTitle')
         except:
             return None
         
@@ -0,0 +1,80 @@
+"""
+API Capture - Sayfanın yaptığı JSON API çağrılarını beklenebilir Future'lara dönüştürür
+Sabit bekleme (sleep) yerine gerekli API yanıtları gelir gelmez devam etmeyi sağlar.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from playwright.async_api import Page, Response
+
+from .readiness import WAIT_METRICS
+
+
+class ApiCapture:
+    """
+    URL desenine (regex) göre isimlendirilmiş API yanıtlarını yakalar.
+
+    Kullanım:
+        capture = ApiCapture(page, {'product': r'public/products', 'social_proof': r'social-proof'})
+        capture.arm()                       # goto'dan ÖNCE
+        await page.goto(url)
+        payloads = await capture.wait(timeout=4.0)
+    """
+
+    def __init__(self, page: Page, patterns: Dict[str, str]):
+        self.page = page
+        self.patterns = {name: re.compile(pattern) for name, pattern in patterns.items()}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self.page.on("response", self._on_response)
+
+    def arm(self):
+        """Yeni bir sayfa yüklemesi için bekleyen Future'ları sıfırlar."""
+        loop = asyncio.get_running_loop()
+        for future in self._futures.values():
+            if not future.done():
+                future.cancel()
+        self._futures = {name: loop.create_future() for name in self.patterns}
+
+    async def _on_response(self, response: Response):
+        if response.status != 200:
+            return
+        for name, pattern in self.patterns.items():
+            future = self._futures.get(name)
+            if future is None or future.done() or not pattern.search(response.url):
+                continue
+            try:
+                data = await response.json()
+            except Exception:
+                continue
+            if not future.done():
+                future.set_result(data)
+
+    async def wait(self, names: Optional[Iterable[str]] = None, timeout: float = 5.0,
+                   metric_name: str = 'api_capture') -> Dict[str, Any]:
+        """
+        İstenen yanıtların hepsi gelene veya süre dolana kadar bekler.
+        Süre dolduğunda o ana kadar gelenleri döner (eksikler sonuçta yer almaz).
+        """
+        names = list(names) if names is not None else list(self._futures)
+        futures = [self._futures[n] for n in names if n in self._futures]
+        pending = [f for f in futures if not f.done()]
+        started = time.monotonic()
+        if pending and timeout > 0:
+            # asyncio.wait süre dolunca Future'ları iptal etmez; geç gelen yanıt yine yakalanır
+            _, pending = await asyncio.wait(pending, timeout=timeout)
+        WAIT_METRICS.observe(metric_name, time.monotonic() - started, satisfied=not pending)
+        return {
+            n: self._futures[n].result()
+            for n in names
+            if n in self._futures and self._futures[n].done() and not self._futures[n].cancelled()
+        }
+
+    def collected(self) -> Dict[str, Any]:
+        """Beklemeden, o ana kadar gelmiş yanıtları döner."""
+        return {
+            n: f.result() for n, f in self._futures.items()
+            if f.done() and not f.cancelled()
+        }
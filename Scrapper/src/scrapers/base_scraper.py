@@ -8,6 +8,8 @@ from playwright.async_api import Page
 import asyncio
 import re
 
+from .readiness import Readiness
+
 
 class BaseScraper(ABC):
     """
@@ -20,6 +22,14 @@ class BaseScraper(ABC):
         self.config = config
         self.selectors = selectors
         self.platform_name = "base"
+        self.readiness = Readiness(page, selectors.get('readiness', {}))
+        # Link toplarken kartta görünen veriler (url -> {discounted_price, rating, review_count, ...})
+        self.listing_cards: Dict[str, Dict[str, Any]] = {}
+
+        # Listeleme API'si tanımlıysa, scroll/yükleme beklemeleri için istekleri baştan izle
+        listing_api = self.readiness.settings('listing_network').get('pattern')
+        if listing_api:
+            self.readiness.track_endpoint(listing_api)
     
     # ==================== ABSTRACT METHODS ====================
     
@@ -105,11 +115,47 @@ class BaseScraper(ABC):
             return 0.0
         return ((original_price - discounted_price) / original_price) * 100
     
+    def listing_card_selector(self) -> str:
+        """Listeleme sayfasındaki ürün kartı selector'larını tek CSS ifadesine birleştirir"""
+        return ", ".join(self.selectors.get('listing', {}).get('product_card', []))
+
+    async def wait_listing_ready(self) -> bool:
+        """Listeleme sayfası açıldıktan sonra ilk ürün kartları ve listeleme API'si için bekler"""
+        ready = self.readiness.settings('listing_ready', min_count=1, timeout_ms=8000)
+        card_selector = ready.get('selector') or self.listing_card_selector()
+        ok = True
+        if card_selector:
+            ok = await self.readiness.wait_for_selector_count(
+                'listing_ready', card_selector, ready['min_count'], ready['timeout_ms'])
+        network = self.readiness.settings('listing_network', quiet_ms=400, timeout_ms=4000)
+        if network.get('pattern'):
+            await self.readiness.wait_for_network_quiet(
+                'listing_network', network['pattern'], network['quiet_ms'], network['timeout_ms'])
+        return ok
+
+    async def wait_product_ready(self, default_selector: str) -> bool:
+        """Ürün detay sayfasında ana içerik (başlık/fiyat) görünene kadar bekler"""
+        ready = self.readiness.settings('product_ready', selector=default_selector, timeout_ms=5000)
+        return await self.readiness.wait_for_selector_count('product_ready', ready['selector'], 1, ready['timeout_ms'])
+
     async def scroll_page(self, scroll_count: int = 5, scroll_amount: int = 1000, delay: float = 0.8):
-        """Scroll page to trigger lazy loading"""
+        """
+        Scroll page to trigger lazy loading.
+        Her adımda sabit `delay` yerine (varsa) listeleme API'sinin susmasını ve kart sayısının sabitlenmesini bekler.
+        """
+        card_selector = self.listing_card_selector()
+        step = self.readiness.settings('scroll_step', stable_ms=300, timeout_ms=int(delay * 2000), quiet_ms=300)
+        network = self.readiness.settings('listing_network')
         for _ in range(scroll_count):
             await self.page.mouse.wheel(0, scroll_amount)
-            await asyncio.sleep(delay)
+            if not card_selector:
+                await asyncio.sleep(delay)
+                continue
+            if network.get('pattern'):
+                await self.readiness.wait_for_network_quiet(
+                    'scroll_network', network['pattern'], step['quiet_ms'], step['timeout_ms'])
+            await self.readiness.wait_for_stable_count(
+                'scroll_step', card_selector, step['stable_ms'], step['timeout_ms'])
     
     async def wait_for_content(self, selector: str, timeout: int = 10000) -> bool:
         """Wait for specific content to load"""
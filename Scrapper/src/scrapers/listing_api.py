@@ -0,0 +1,221 @@
+"""
+Listing API Paginator - Listeleme sayfalarını render etmeden link toplama
+Tarayıcı yalnızca oturumu başlatmak (ilk listeleme API çağrısını yakalamak) ve
+gerektiğinde yenilemek için kullanılır; sayfalar httpx ile doğrudan API'den çekilir.
+Ayarlar platform_selectors.yaml -> <platform>.listing_api altındadır.
+"""
+
+import asyncio
+import re
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from playwright.async_api import Page, Request
+from rich.console import Console
+
+console = Console()
+
+# Yakalanan istekten HTTP istemcisine taşınmayacak başlıklar
+SKIP_HEADERS = {'cookie', 'content-length', 'host', 'accept-encoding', 'connection'}
+# Oturumun düştüğünü gösteren durum kodları (tarayıcı ile yenilenir)
+REFRESH_STATUSES = {401, 403, 429}
+
+
+class ListingApiError(Exception):
+    """Listeleme API'si yakalanamadı veya oturum yenilense de yanıt alınamadı."""
+
+
+@dataclass
+class ListingApiItem:
+    """API'den gelen tek bir ürün kartı"""
+    url: str
+    product_id: Optional[str]
+    page: int
+    position: int = 0  # Sayfa içindeki sıra (1'den başlar)
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+
+class ListingApiPaginator:
+    """
+    Listeleme sayfasının yaptığı ilk arama API çağrısını yakalar ve aynı URL'yi
+    sayfa parametresiyle httpx üzerinden gezer.
+
+    Kullanım:
+        paginator = ListingApiPaginator(page, selectors['listing_api'], base_url='https://www.trendyol.com')
+        async for item in paginator.iter_products(target_url, max_pages=50):
+            ...
+    """
+
+    def __init__(self, page: Page, config: Dict[str, Any], base_url: str = ""):
+        self.page = page
+        self.base_url = base_url
+        self.pattern = re.compile(config.get('pattern', r'discovery-.*search|infinite-scroll'))
+        self.page_param = config.get('page_param', 'pi')
+        self.products_path = config.get('products_path', 'result.products')
+        self.total_path = config.get('total_path', 'result.totalCount')
+        self.url_field = config.get('url_field', 'url')
+        self.id_field = config.get('id_field', 'id')
+        self.concurrency = max(1, int(config.get('concurrency', 4)))
+        self.page_delay = float(config.get('page_delay', 0.2))
+        self.timeout_ms = int(config.get('timeout_ms', 10000))
+        self.bootstrap_timeout_ms = int(config.get('bootstrap_timeout_ms', 8000))
+        self.bootstrap_scrolls = int(config.get('bootstrap_scrolls', 4))
+        self.max_refreshes = int(config.get('max_refreshes', 2))
+
+        self.api_url: Optional[str] = None
+        self.headers: Dict[str, str] = {}
+        self.client: Optional[httpx.AsyncClient] = None
+        self.refreshes = 0
+        self.pages_fetched = 0
+        self._session = 0
+        self._refresh_lock = asyncio.Lock()
+
+    async def bootstrap(self, target_url: str):
+        """Listeleme sayfasını tarayıcıda açar, ilk API isteğini ve oturum çerezlerini yakalar."""
+        loop = asyncio.get_running_loop()
+        captured: asyncio.Future = loop.create_future()
+
+        def on_request(request: Request):
+            if not captured.done() and self.pattern.search(request.url):
+                captured.set_result(request)
+
+        self.page.on("request", on_request)
+        try:
+            await self.page.goto(target_url, wait_until='domcontentloaded', timeout=30000)
+            deadline = time.monotonic() + self.bootstrap_timeout_ms / 1000
+            scrolls = 0
+            # İlk sayfa sunucuda render ediliyorsa API ancak scroll ile tetiklenir
+            while not captured.done() and time.monotonic() < deadline:
+                if scrolls < self.bootstrap_scrolls:
+                    await self.page.mouse.wheel(0, 1500)
+                    scrolls += 1
+                await asyncio.wait([captured], timeout=0.5)
+        finally:
+            self.page.remove_listener("request", on_request)
+
+        if not captured.done():
+            raise ListingApiError("Listeleme API isteği yakalanamadı")
+
+        request: Request = captured.result()
+        self.api_url = request.url
+        self.headers = {
+            k: v for k, v in (await request.all_headers()).items()
+            if not k.startswith(':') and k.lower() not in SKIP_HEADERS
+        }
+        await self._open_client()
+        self._session += 1
+
+    async def _open_client(self):
+        """Tarayıcının çerezleri ve başlıklarıyla yeni bir HTTP istemcisi açar."""
+        if self.client:
+            await self.client.aclose()
+        cookies = httpx.Cookies()
+        for c in await self.page.context.cookies():
+            cookies.set(c['name'], c['value'], domain=c.get('domain', ''), path=c.get('path', '/'))
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            cookies=cookies,
+            timeout=self.timeout_ms / 1000,
+            follow_redirects=True,
+        )
+
+    async def refresh(self, target_url: str):
+        """Oturumu tarayıcıyla yeniler (çerezler / imzalı başlıklar)."""
+        self.refreshes += 1
+        console.print(f"[yellow]🔄 Listeleme API oturumu yenileniyor ({self.refreshes}/{self.max_refreshes})...[/yellow]")
+        await self.bootstrap(target_url)
+
+    def page_url(self, page_num: int) -> str:
+        """Yakalanan API URL'sinde sayfa parametresini değiştirir."""
+        parts = urllib.parse.urlsplit(self.api_url)
+        query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True) if k != self.page_param]
+        query.append((self.page_param, str(page_num)))
+        return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+    @staticmethod
+    def _dig(data: Any, path: str) -> Any:
+        for key in path.split('.'):
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+
+    async def fetch_page(self, page_num: int) -> Optional[List[Dict[str, Any]]]:
+        """Tek bir API sayfasını çeker; oturum düştüyse None döner."""
+        response = await self.client.get(self.page_url(page_num))
+        if response.status_code in REFRESH_STATUSES:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        self.pages_fetched += 1
+        if page_num == 1 and self.total_path:
+            total = self._dig(data, self.total_path)
+            if total:
+                console.print(f"[dim]   - Listeleme API: toplam {total} ürün[/dim]")
+        return self._dig(data, self.products_path) or []
+
+    async def _fetch_with_refresh(self, page_num: int, target_url: str) -> List[Dict[str, Any]]:
+        while True:
+            session = self._session
+            products = await self.fetch_page(page_num)
+            if products is not None:
+                return products
+            async with self._refresh_lock:
+                # Paralel sayfalardan biri oturumu zaten yenilediyse tekrar yenileme
+                if session != self._session:
+                    continue
+                if self.refreshes >= self.max_refreshes:
+                    raise ListingApiError(f"Sayfa {page_num}: oturum yenilense de API yanıt vermedi")
+                await self.refresh(target_url)
+
+    def _to_item(self, product: Dict[str, Any], page_num: int, position: int = 0) -> Optional[ListingApiItem]:
+        href = product.get(self.url_field)
+        if not href:
+            return None
+        if not href.startswith('http'):
+            href = self.base_url + href
+        product_id = product.get(self.id_field)
+        return ListingApiItem(
+            url=href,
+            product_id=str(product_id) if product_id is not None else None,
+            page=page_num,
+            position=position,
+            raw=product,
+        )
+
+    async def iter_products(self, target_url: str, max_pages: int) -> AsyncIterator[ListingApiItem]:
+        """
+        Sayfaları `concurrency` kadarlık pencerelerle paralel çeker, sırayla yield eder.
+        Boş sayfa gelince durur. Aynı URL bir kez döner.
+        """
+        if self.client is None:
+            await self.bootstrap(target_url)
+        seen = set()
+        try:
+            for window_start in range(1, max_pages + 1, self.concurrency):
+                page_nums = list(range(window_start, min(window_start + self.concurrency, max_pages + 1)))
+                results = await asyncio.gather(*(self._fetch_with_refresh(n, target_url) for n in page_nums))
+                for page_num, products in zip(page_nums, results):
+                    if not products:
+                        return
+                    new_count = 0
+                    for position, product in enumerate(products, 1):
+                        item = self._to_item(product, page_num, position)
+                        if item is None or item.url in seen:
+                            continue
+                        seen.add(item.url)
+                        new_count += 1
+                        yield item
+                    console.print(f"[green]✅ API Sayfa {page_num}: {new_count} ürün bulundu[/green]")
+                if self.page_delay > 0:
+                    await asyncio.sleep(self.page_delay)
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
@@ -5,6 +5,9 @@ from typing import Dict, List, Optional
 from rich.console import Console
 from playwright.async_api import Page, Response
 
+from .api_capture import ApiCapture
+from .readiness import Readiness
+
 console = Console()
 
 class ProductScraper:
@@ -13,6 +16,13 @@ class ProductScraper:
         self.api_data: Dict = {}
         self.product_data: Dict = {}
         self.page.on("response", self._handle_response)
+        self.readiness = Readiness(page)
+        # Sabit bekleme yerine API yanıtları gelince devam etmek için
+        self.api_capture = ApiCapture(page, {
+            'product': r'public/products',
+            'social_proof': r'social-proof',
+            'reviews': r'reviews.*summary',
+        })
 
     async def _handle_response(self, response: Response):
         """API yanıtlarını dinler ve ürün verilerini yakalar"""
@@ -36,6 +46,20 @@ class ProductScraper:
 
         except: pass
 
+    def _merge_api_payloads(self, payloads: Dict):
+        """ApiCapture ile gelen yanıtları, _handle_response henüz işlemediyse state'e yazar"""
+        product = (payloads.get('product') or {}).get('result')
+        if product and not self.product_data:
+            self.product_data = product
+        social = (payloads.get('social_proof') or {}).get('result')
+        if social and not self.api_data.get('favorite_count'):
+            self.api_data['view_count'] = social.get('viewCount', 0)
+            self.api_data['favorite_count'] = social.get('favoriteCount', 0)
+        reviews = (payloads.get('reviews') or {}).get('result')
+        if reviews and not self.api_data.get('review_count'):
+            self.api_data['rating_score'] = reviews.get('averageRating', 0)
+            self.api_data['review_count'] = reviews.get('totalCount', 0)
+
     async def scrape_product(self, product_url: str) -> Optional[Dict]:
         """
         Ürün detay sayfasını hem API hem HTML yöntemleriyle tarar.
@@ -49,12 +73,15 @@ class ProductScraper:
             self.api_data = {'view_count': 0, 'favorite_count': 0, 'rating_score': 0, 'review_count': 0}
 
             # Sayfaya git
+            self.api_capture.arm()
             try:
                 await self.page.goto(product_url, wait_until='domcontentloaded', timeout=60000)
             except: pass
             
-            # API ve Dinamik içerik için bekle - ✅ Optimizasyon: 4sn -> 2.4sn
-            await asyncio.sleep(2.4)  # %40 azaltıldı
+            # API ve Dinamik içerik için bekle - ✅ Optimizasyon: sabit 2.4sn yerine
+            # üç API yanıtı da geldiği anda devam et (en fazla 2.4sn)
+            payloads = await self.api_capture.wait(timeout=2.4, metric_name='product_api')
+            self._merge_api_payloads(payloads)
 
             # ✅ DEBUG SCREENSHOT KALDIRILDI (Gereksiz I/O eliminasyonu)
             # await self.page.screenshot(path="debug_view.png", full_page=False)
@@ -650,7 +677,8 @@ class ProductScraper:
         
         try:
             await self.page.goto(review_url, wait_until='domcontentloaded', timeout=60000)
-            await asyncio.sleep(1.8)  # ✅ Optimizasyon: 3sn -> 1.8sn
+            # ✅ Optimizasyon: sabit 1.8sn yerine ilk yorum kartı görünene kadar (en fazla 5sn)
+            await self.readiness.wait_for_selector_count('reviews_ready', '.review', 1, timeout_ms=5000)
             
             reviews = []
             while len(reviews) < limit:
@@ -676,9 +704,9 @@ class ProductScraper:
                 
                 prev_height = await self.page.evaluate('document.body.scrollHeight')
                 await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(1.2)  # ✅ Optimizasyon: 2sn -> 1.2sn
-                new_height = await self.page.evaluate('document.body.scrollHeight')
-                if new_height == prev_height: break 
+                # ✅ Optimizasyon: sabit 1.2sn yerine yeni yorumlar yüklenip sayfa uzayana kadar
+                grew = await self.readiness.wait_for_height_change('reviews_scroll', prev_height, timeout_ms=2500)
+                if not grew: break 
             
             return reviews[:limit]
         except Exception as e:
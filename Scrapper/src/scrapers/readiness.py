@@ -0,0 +1,179 @@
+"""
+Readiness - Sabit asyncio.sleep beklemeleri yerine somut sinyallere göre bekleme katmanı
+- Selector sayısı (örn. en az 1 ürün kartı)
+- Belirli endpoint'lerde ağ sessizliği (in-flight istek kalmaması)
+- Ürün kartı sayısının sabitlenmesi (infinite scroll)
+Zaman aşımları platform_selectors.yaml -> <platform>.readiness altında tanımlanır.
+Her bekleme WAIT_METRICS histogramına süre ve sonuç olarak yazılır.
+"""
+
+import asyncio
+import bisect
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import Page
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# Histogram kova sınırları (saniye)
+WAIT_BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0]
+
+
+class WaitMetrics:
+    """Bekleme adı başına süre histogramı"""
+
+    def __init__(self, buckets: List[float] = WAIT_BUCKETS):
+        self.buckets = buckets
+        self._hist: Dict[str, List[int]] = {}
+        self._totals: Dict[str, float] = {}
+        self._timeouts: Dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float, satisfied: bool = True):
+        counts = self._hist.setdefault(name, [0] * (len(self.buckets) + 1))
+        counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self._totals[name] = self._totals.get(name, 0.0) + seconds
+        if not satisfied:
+            self._timeouts[name] = self._timeouts.get(name, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                'count': sum(counts),
+                'total_seconds': self._totals.get(name, 0.0),
+                'timeouts': self._timeouts.get(name, 0),
+                'buckets': dict(zip([f"<={b}s" for b in self.buckets] + ["+Inf"], counts)),
+            }
+            for name, counts in self._hist.items()
+        }
+
+    def print_summary(self):
+        if not self._hist:
+            return
+        labels = [f"≤{b:g}s" for b in self.buckets] + [">"]
+        table = Table(title="⏱️ Bekleme Süreleri", show_header=True, header_style="bold magenta")
+        table.add_column("Bekleme")
+        for label in labels:
+            table.add_column(label, justify="right")
+        table.add_column("Ort.", justify="right", style="cyan")
+        table.add_column("Timeout", justify="right", style="red")
+        for name, counts in sorted(self._hist.items()):
+            total = sum(counts)
+            avg = self._totals.get(name, 0.0) / total if total else 0.0
+            table.add_row(name, *[str(c) for c in counts], f"{avg:.2f}s", str(self._timeouts.get(name, 0)))
+        console.print(table)
+
+
+WAIT_METRICS = WaitMetrics()
+
+
+class Readiness:
+    """Sayfa hazır olma koşullarını bekler; tüm beklemeler zaman aşımında sessizce devam eder."""
+
+    def __init__(self, page: Page, config: Optional[Dict[str, Any]] = None, metrics: WaitMetrics = WAIT_METRICS):
+        self.page = page
+        self.config = config or {}
+        self.metrics = metrics
+        self._inflight: Dict[str, int] = {}
+        self._last_activity: Dict[str, float] = {}
+        self._tracked: Dict[str, re.Pattern] = {}
+
+    def settings(self, name: str, **defaults) -> Dict[str, Any]:
+        """YAML'daki readiness.<name> ayarını varsayılanlarla birleştirir."""
+        return {**defaults, **(self.config.get(name) or {})}
+
+    def _observe(self, name: str, started: float, satisfied: bool) -> bool:
+        self.metrics.observe(name, time.monotonic() - started, satisfied)
+        return satisfied
+
+    async def wait_for_selector_count(self, name: str, selector: str, min_count: int = 1, timeout_ms: int = 8000) -> bool:
+        """Selector'a uyan eleman sayısı min_count'a ulaşana kadar bekler."""
+        started = time.monotonic()
+        try:
+            await self.page.wait_for_function(
+                "([sel, n]) => document.querySelectorAll(sel).length >= n",
+                arg=[selector, min_count],
+                timeout=timeout_ms,
+            )
+            return self._observe(name, started, True)
+        except Exception:
+            return self._observe(name, started, False)
+
+    async def wait_for_stable_count(self, name: str, selector: str, stable_ms: int = 600,
+                                    timeout_ms: int = 5000, poll_ms: int = 150,
+                                    previous: Optional[int] = None) -> int:
+        """
+        Eleman sayısı stable_ms boyunca değişmeyene kadar bekler ve son sayıyı döner.
+        previous verilirse sayı önce bu değerin üstüne çıkmalı (scroll sonrası yeni kart gelmesi).
+        """
+        started = time.monotonic()
+        deadline = started + timeout_ms / 1000
+        count_js = "(sel) => document.querySelectorAll(sel).length"
+        last = await self.page.evaluate(count_js, selector)
+        grew = previous is None or last > previous
+        stable_since = time.monotonic()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_ms / 1000)
+            current = await self.page.evaluate(count_js, selector)
+            if current != last:
+                last = current
+                stable_since = time.monotonic()
+                grew = grew or previous is None or current > previous
+                continue
+            if grew and (time.monotonic() - stable_since) * 1000 >= stable_ms:
+                self._observe(name, started, True)
+                return last
+        self._observe(name, started, False)
+        return last
+
+    def track_endpoint(self, pattern: str):
+        """Belirli bir endpoint desenine uyan isteklerin in-flight sayısını izlemeye başlar."""
+        if pattern in self._tracked:
+            return
+        regex = re.compile(pattern)
+        self._tracked[pattern] = regex
+        self._inflight[pattern] = 0
+        self._last_activity[pattern] = time.monotonic()
+
+        def on_request(request):
+            if regex.search(request.url):
+                self._inflight[pattern] += 1
+                self._last_activity[pattern] = time.monotonic()
+
+        def on_done(request):
+            if regex.search(request.url):
+                self._inflight[pattern] = max(0, self._inflight[pattern] - 1)
+                self._last_activity[pattern] = time.monotonic()
+
+        self.page.on("request", on_request)
+        self.page.on("requestfinished", on_done)
+        self.page.on("requestfailed", on_done)
+
+    async def wait_for_network_quiet(self, name: str, pattern: str, quiet_ms: int = 500,
+                                     timeout_ms: int = 6000, poll_ms: int = 100) -> bool:
+        """Desene uyan in-flight istek kalmayıp quiet_ms boyunca yeni istek gelmeyene kadar bekler."""
+        self.track_endpoint(pattern)
+        started = time.monotonic()
+        deadline = started + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            idle_for = (time.monotonic() - self._last_activity[pattern]) * 1000
+            if self._inflight[pattern] == 0 and idle_for >= quiet_ms:
+                return self._observe(name, started, True)
+            await asyncio.sleep(poll_ms / 1000)
+        return self._observe(name, started, False)
+
+    async def wait_for_height_change(self, name: str, previous_height: int, timeout_ms: int = 3000) -> bool:
+        """Sayfa yüksekliği (scrollHeight) değişene kadar bekler (yorum listesi gibi lazy-load alanlar için)."""
+        started = time.monotonic()
+        try:
+            await self.page.wait_for_function(
+                "(h) => document.body.scrollHeight !== h",
+                arg=previous_height,
+                timeout=timeout_ms,
+            )
+            return self._observe(name, started, True)
+        except Exception:
+            return self._observe(name, started, False)
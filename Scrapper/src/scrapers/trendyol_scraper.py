@@ -9,9 +9,86 @@ from playwright.async_api import Page
 from rich.console import Console
 
 from .base_scraper import BaseScraper
+from .api_capture import ApiCapture
+from .listing_api import ListingApiPaginator
 
 console = Console()
 
+# API-first modunda kullanılan varsayılan API desenleri (platform_selectors.yaml -> api ile ezilebilir)
+DEFAULT_API_PATTERNS = {
+    'product': r'public/products',
+    'social_proof': r'social-proof',
+    'reviews': r'reviews.*summary',
+}
+DEFAULT_API_REQUIRED_FIELDS = ['name', 'price']
+# Beklenmesi zorunlu yanıtlar; diğer desenler (social-proof, yorum özeti) için yalnızca kısa ek süre tanınır
+DEFAULT_API_REQUIRED_PAYLOADS = ['product']
+# Opsiyonel yanıt süresinde gelmezse bu alanlar 0 değil eksik sayılır ve DOM'dan okunur
+API_PAYLOAD_FIELDS = {
+    'social_proof': ['favs', 'views', 'basket'],
+    'reviews': ['rating', 'reviews'],
+}
+CDN_BASE_URL = 'https://cdn.dsmcdn.com'
+SITE_BASE_URL = 'https://www.trendyol.com'
+
+# Listeleme sayfasında yalnızca henüz işlenmemiş kartları okur ve işaretler (data-harvested).
+# Böylece her scroll adımında önceki linkler yeniden taranmaz.
+# args.fields verilirse kart kapsayıcısından fiyat/puan/marka gibi ham metinler de okunur.
+HARVEST_LINKS_JS = '''(args) => {
+    const out = [];
+    const seen = new Set();
+    let cards = 0;
+    const pick = (root, sels, attr) => {
+        for (const s of sels || []) {
+            const el = root.querySelector(s);
+            if (!el) continue;
+            const v = attr ? (el.getAttribute(attr) || '') : (el.innerText || '').trim();
+            if (v) return v;
+        }
+        return null;
+    };
+    const starRating = (root, sel) => {
+        if (!sel) return null;
+        let total = 0;
+        root.querySelectorAll(sel).forEach(s => { total += (parseFloat(s.style.width) || 0) / 100; });
+        return total ? total.toFixed(1) : null;
+    };
+    for (const selector of args.selectors) {
+        const elements = document.querySelectorAll(selector);
+        elements.forEach(a => {
+            let href = a.getAttribute('href');
+            if (!href || !href.includes(args.linkContains)) return;
+            cards++;
+            if (a.dataset.harvested) return;
+            a.dataset.harvested = '1';
+            if (!href.startsWith('http')) href = args.baseUrl + href;
+            if (seen.has(href)) return;
+            seen.add(href);
+            let card = null;
+            const f = args.fields;
+            if (f) {
+                const root = (args.container && a.closest(args.container)) || a;
+                card = {
+                    brand: pick(root, f.brand),
+                    name: pick(root, f.name),
+                    price: pick(root, f.price),
+                    original_price: pick(root, f.original_price),
+                    rating: pick(root, f.rating) || starRating(root, f.rating_stars),
+                    review_count: pick(root, f.review_count),
+                    image: pick(root, f.image, 'src'),
+                    position: cards,
+                };
+            }
+            out.push({ url: href, card: card });
+        });
+        if (cards > 0) break;
+    }
+    return { links: out, cards: cards };
+}'''
+PRODUCT_READY_SELECTOR = 'h1.product-title, .product-price-container, .price-container'
+# Favori / sepet / görüntülenme sayıları başlık ve fiyattan sonra ayrı bir istekle yüklenir
+SOCIAL_PROOF_SELECTOR = '.social-proof-content'
+
 
 class TrendyolScraper(BaseScraper):
     """
@@ -22,6 +99,14 @@ class TrendyolScraper(BaseScraper):
     def __init__(self, page: Page, config: Dict[str, Any], selectors: Dict[str, Any]):
         super().__init__(page, config, selectors)
         self.platform_name = "trendyol"
+
+        # API-first modu: ürün/social-proof/yorum API'leri gelir gelmez DOM'u atla
+        self.extraction_mode = self.config.get('extraction_mode', 'dom')
+        self.api_config = self.selectors.get('api', {})
+        self.api_capture: Optional[ApiCapture] = None
+        if self.extraction_mode == 'api_first':
+            patterns = self.api_config.get('patterns') or DEFAULT_API_PATTERNS
+            self.api_capture = ApiCapture(page, patterns)
     
     def get_trendyol_id(self, url: str) -> Optional[str]:
         """Extract Trendyol product ID from URL"""
@@ -41,7 +126,7 @@ class TrendyolScraper(BaseScraper):
             
             try:
                 await self.page.goto(url, wait_until='networkidle', timeout=60000)
-                await asyncio.sleep(3)
+                await self.wait_listing_ready()
                 
                 # ÖZEL KONTROL: Bot tespiti veya Sonuç Bulunamadı ekranı mı?
                 is_blocked = await self.page.evaluate("""() => {
@@ -98,10 +183,110 @@ class TrendyolScraper(BaseScraper):
         console.print(f"\n[bold green]🎯 Toplam {len(unique_urls)} benzersiz ürün URL'si toplandı![/bold green]\n")
         return unique_urls
 
+    async def _harvest_new_links(self, product_selectors: List[str], link_contains: str) -> Dict[str, Any]:
+        """
+        Sayfadaki henüz okunmamış ürün linklerini ({url, card}) ve toplam kart sayısını (cards) döner.
+        listing.card_fields tanımlıysa card ham kart metinlerini içerir, değilse None.
+        """
+        listing = self.selectors.get('listing', {})
+        return await self.page.evaluate(HARVEST_LINKS_JS, {
+            'selectors': product_selectors,
+            'linkContains': link_contains,
+            'baseUrl': SITE_BASE_URL,
+            'container': listing.get('card_container'),
+            'fields': listing.get('card_fields') if listing.get('extract_cards', True) else None,
+        })
+
+    def _parse_card(self, raw: Dict[str, Any], page_num: int) -> Dict[str, Any]:
+        """Kartın ham metinlerini sayısal alanlara çevirir (DailyMetric ile aynı anahtarlar)."""
+        discounted = self.clean_price(raw.get('price'))
+        original = self.clean_price(raw.get('original_price')) or discounted
+        try:
+            rating = float(str(raw.get('rating') or 0).replace(',', '.'))
+        except ValueError:
+            rating = 0.0
+        return {
+            'brand': raw.get('brand') or '',
+            'name': raw.get('name') or '',
+            'image_url': raw.get('image') or '',
+            'discounted_price': discounted,
+            'original_price': original,
+            'discount_rate': self.calculate_discount_rate(original, discounted),
+            'rating': rating,
+            'review_count': self.parse_metric((raw.get('review_count') or '').strip('()')),
+            'page': page_num,
+            'position': raw.get('position'),
+        }
+
+    async def _scroll_and_harvest(self, product_selectors: List[str], link_contains: str):
+        """
+        Scroll ederken yeni gelen ürün linklerini adım adım akıtır.
+        Kart sayısı `patience` adım boyunca artmazsa scroll durur.
+        """
+        step = self.readiness.settings('scroll_step', stable_ms=300, timeout_ms=1600, quiet_ms=300,
+                                       max_steps=30, patience=2, amount=1000)
+        network = self.readiness.settings('listing_network')
+        card_selector = self.listing_card_selector()
+
+        harvest = await self._harvest_new_links(product_selectors, link_contains)
+        for link in harvest['links']:
+            yield link['url'], link['card']
+        cards = harvest['cards']
+
+        idle_steps = 0
+        for _ in range(step['max_steps']):
+            await self.page.mouse.wheel(0, step['amount'])
+            if network.get('pattern'):
+                await self.readiness.wait_for_network_quiet(
+                    'scroll_network', network['pattern'], step['quiet_ms'], step['timeout_ms'])
+            if card_selector:
+                await self.readiness.wait_for_stable_count(
+                    'scroll_step', card_selector, step['stable_ms'], step['timeout_ms'], previous=cards)
+            else:
+                await asyncio.sleep(step['stable_ms'] / 1000)
+
+            harvest = await self._harvest_new_links(product_selectors, link_contains)
+            for link in harvest['links']:
+                yield link['url'], link['card']
+
+            if harvest['cards'] > cards:
+                cards = harvest['cards']
+                idle_steps = 0
+            else:
+                idle_steps += 1
+                if idle_steps >= step['patience']:
+                    break
+
     async def collect_product_urls_from_link(self, target_url: str, max_pages: int):
-        """Collect product URLs directly from a given category or search link"""
+        """
+        Collect product URLs directly from a given category or search link.
+        Linkler scroll sırasında bulundukça yield edilir; aynı link tüm sayfalar boyunca bir kez döner.
+        Kartta görünen veriler (fiyat, puan, yorum sayısı...) self.listing_cards[url] içine yazılır.
+        link_discovery=api ise sayfalar render edilmeden listeleme API'sinden gezilir;
+        API yakalanamazsa veya yarıda kalırsa DOM yoluna düşülür.
+        """
         product_selectors = self.selectors.get('listing', {}).get('product_card', [])
         link_contains = self.selectors.get('listing', {}).get('product_link_contains', '-p-')
+        yielded = set()
+
+        if self.config.get('link_discovery', 'dom') == 'api':
+            paginator = ListingApiPaginator(self.page, self.selectors.get('listing_api', {}), base_url=SITE_BASE_URL)
+            started = datetime.now()
+            try:
+                async for item in paginator.iter_products(target_url, max_pages):
+                    if item.url in yielded:
+                        continue
+                    yielded.add(item.url)
+                    self.listing_cards[item.url] = self._card_from_api(item.raw, item.page, item.position)
+                    yield item.url
+                elapsed = (datetime.now() - started).total_seconds()
+                console.print(f"[bold green]⚡ Listeleme API: {paginator.pages_fetched} sayfa, {len(yielded)} link, {elapsed:.1f} sn[/bold green]")
+                if yielded:
+                    return
+            except Exception as e:
+                console.print(f"[yellow]⚠️ Listeleme API kullanılamadı ({e}), DOM ile devam ediliyor...[/yellow]")
+            finally:
+                await paginator.close()
         
         base_url = target_url
         if '?' not in base_url: base_url += '?'
@@ -119,8 +304,8 @@ class TrendyolScraper(BaseScraper):
             try:
                 console.print(f"[dim]   - Sayfaya gidiliyor...[/dim]")
                 await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
-                console.print(f"[dim]   - Sayfa yüklendi, bekletiliyor...[/dim]")
-                await asyncio.sleep(3)
+                console.print(f"[dim]   - Sayfa yüklendi, ürün kartları bekleniyor...[/dim]")
+                await self.wait_listing_ready()
                 
                 # ÖZEL KONTROL: Bot tespiti veya Sonuç Bulunamadı ekranı mı?
                 is_blocked = await self.page.evaluate("""() => {
@@ -135,30 +320,18 @@ class TrendyolScraper(BaseScraper):
                     console.print(f"[bold red]   - BLOK GÖRÜLDÜ![/bold red]")
                     raise Exception("⛔ BLOKLANDI: Trendyol 'Sonuç Bulunamadı' veya doğrulama ekranı gösterdi.")
 
-                console.print(f"[dim]   - Sayfa kaydırılıyor...[/dim]")
-                await self.scroll_page()
-                console.print(f"[dim]   - Linkler toplanıyor...[/dim]")
-                links = await self.page.evaluate('''(args) => {
-                    const selectors = args.selectors;
-                    const linkContains = args.linkContains;
-                    const urls = [];
-                    for (const selector of selectors) {
-                        const elements = document.querySelectorAll(selector);
-                        elements.forEach(a => {
-                            let href = a.getAttribute('href');
-                            if (href && href.includes(linkContains)) {
-                                if (!href.startsWith('http')) href = 'https://www.trendyol.com' + href;
-                                if (!urls.includes(href)) urls.push(href);
-                            }
-                        });
-                        if (urls.length > 0) break;
-                    }
-                    return urls;
-                }''', {'selectors': product_selectors, 'linkContains': link_contains})
-                if links:
-                    console.print(f"[green]✅ Sayfa {page_num}: {len(links)} ürün bulundu[/green]")
-                    for l in links:
-                        yield l
+                console.print(f"[dim]   - Sayfa kaydırılıyor, linkler akış halinde toplanıyor...[/dim]")
+                page_links = 0
+                async for link, card in self._scroll_and_harvest(product_selectors, link_contains):
+                    page_links += 1
+                    if link in yielded:
+                        continue
+                    yielded.add(link)
+                    if card:
+                        self.listing_cards[link] = self._parse_card(card, page_num)
+                    yield link
+                if page_links:
+                    console.print(f"[green]✅ Sayfa {page_num}: {page_links} ürün bulundu[/green]")
                 else:
                     console.print(f"[yellow]⚠️ Sayfa {page_num}: Ürün bulunamadı. Ekran görüntüsü alınıyor...[/yellow]")
                     import os
@@ -171,16 +344,159 @@ class TrendyolScraper(BaseScraper):
                 console.print(f"[red]❌ Sayfa {page_num} hatası: {e}[/red]")
             await asyncio.sleep(self.config.get('request_delay', 2))
     
+    def _card_from_api(self, raw: Dict[str, Any], page_num: Optional[int] = None,
+                       position: Optional[int] = None) -> Dict[str, Any]:
+        """Listeleme API ürününden kartta görünen alanları çıkarır (_parse_card ile aynı anahtarlar)."""
+        price = raw.get('price') or {}
+        rating = raw.get('ratingScore') or {}
+        brand = raw.get('brand')
+        images = raw.get('images') or []
+        image = images[0] if images else ''
+        if image and not image.startswith('http'):
+            image = CDN_BASE_URL + image
+        discounted = price.get('discountedPrice') or price.get('sellingPrice') or 0
+        original = price.get('originalPrice') or discounted
+        return {
+            'brand': brand.get('name', '') if isinstance(brand, dict) else (brand or ''),
+            'name': raw.get('name') or '',
+            'image_url': image,
+            'discounted_price': discounted,
+            'original_price': original,
+            'discount_rate': self.calculate_discount_rate(original, discounted),
+            'rating': rating.get('averageRating') or 0,
+            'review_count': rating.get('totalCount') or 0,
+            'page': page_num,
+            'position': position,
+        }
+
     async def scrape_product(self, url: str) -> Optional[Dict[str, Any]]:
-        """Scrape a single Trendyol product page"""
+        """
+        Scrape a single Trendyol product page.
+        api_first modunda gerekli API yanıtları geldiği anda döner; yalnızca eksik alan varsa DOM'a düşer.
+        Dönen veride `extraction_path` hangi yolun kullanıldığını gösterir: 'api', 'api+dom' veya 'dom'.
+        """
+        if self.api_capture:
+            return await self._scrape_product_api_first(url)
+
         try:
             await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
             await self.page.mouse.wheel(0, 500)
-            await asyncio.sleep(2)
+            await self.wait_product_ready(PRODUCT_READY_SELECTOR)
+            await self.wait_social_proof()
         except Exception as e:
             console.print(f"[red]❌ Ürün sayfasına gidilemedi ({url}): {e}[/red]")
             return None
-        
+
+        data = await self._extract_dom()
+        if data is not None:
+            data['extraction_path'] = 'dom'
+        return data
+
+    async def wait_social_proof(self) -> bool:
+        """
+        Social-proof kutusu görünene kadar kısa süre bekler; gelmezse sayılar 0 okunur.
+        Her üründe bu alan olmadığından zaman aşımı product_ready'den kısa tutulur.
+        """
+        proof = self.readiness.settings('social_proof', selector=SOCIAL_PROOF_SELECTOR, timeout_ms=2500)
+        return await self.readiness.wait_for_selector_count('social_proof', proof['selector'], 1, proof['timeout_ms'])
+
+    async def _scrape_product_api_first(self, url: str) -> Optional[Dict[str, Any]]:
+        """API yanıtlarını bekleyerek ürünü kazır, eksik alanlar için DOM'a düşer."""
+        timeout = self.api_config.get('timeout_ms', 6000) / 1000
+        grace = self.api_config.get('optional_grace_ms', 800) / 1000
+        required = self.api_config.get('required_fields') or DEFAULT_API_REQUIRED_FIELDS
+        required_payloads = self.api_config.get('required_payloads') or DEFAULT_API_REQUIRED_PAYLOADS
+
+        self.api_capture.arm()
+        try:
+            await self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        except Exception as e:
+            console.print(f"[red]❌ Ürün sayfasına gidilemedi ({url}): {e}[/red]")
+            return None
+
+        # Ürün yanıtı gelir gelmez devam; social-proof / yorum isteği olmayan sayfa tüm süreyi beklemez
+        payloads = await self.api_capture.wait(required_payloads, timeout=timeout, metric_name='product_api')
+        optional = [name for name in self.api_capture.patterns if name not in required_payloads]
+        if optional:
+            payloads.update(await self.api_capture.wait(optional, timeout=grace, metric_name='product_api_optional'))
+        data = self._parse_api_payloads(payloads)
+        missing = [f for f in required if not data.get(f)]
+        missing += [f for name in optional if name not in payloads for f in API_PAYLOAD_FIELDS.get(name, [])]
+        if not missing:
+            data['extraction_path'] = 'api'
+            return data
+
+        # Eksik alan var -> DOM yolu (sayfa bu noktada büyük ölçüde render edilmiş olur)
+        try:
+            await self.page.mouse.wheel(0, 500)
+            await self.wait_product_ready(PRODUCT_READY_SELECTOR)
+            await self.wait_social_proof()
+        except Exception:
+            pass
+        # DOM beklenirken geç gelen opsiyonel yanıtlar da kullanılır
+        payloads.update(self.api_capture.collected())
+        data = self._parse_api_payloads(payloads)
+        dom_data = await self._extract_dom()
+        if dom_data is None:
+            # Eksik alanlar None kalır (DailyMetric'e 0 yerine NULL yazılır)
+            return data if data.get('name') else None
+
+        # API'den gelen dolu alanlar öncelikli, boş veya gelmemiş olanlar DOM'dan tamamlanır
+        for key, value in data.items():
+            if value:
+                dom_data[key] = value
+        dom_data['extraction_path'] = 'api+dom' if payloads else 'dom'
+        return dom_data
+
+    def _parse_api_payloads(self, payloads: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Yakalanan API yanıtlarını DOM çıktısıyla aynı şemaya çevirir.
+        Gelmeyen opsiyonel yanıtın alanları (API_PAYLOAD_FIELDS) 0 değil None olur.
+        """
+        res = {
+            'brand': '', 'name': '',
+            'price': 0, 'org_price': 0,
+            'rating': None, 'reviews': None,
+            'favs': None, 'views': None, 'basket': None,
+            'images': [],
+        }
+
+        product = (payloads.get('product') or {}).get('result') or {}
+        if product:
+            res['name'] = product.get('name', '') or ''
+            brand = product.get('brand') or {}
+            res['brand'] = brand.get('name', '') if isinstance(brand, dict) else str(brand)
+
+            price_info = product.get('price') or {}
+            discounted = (price_info.get('discountedPrice') or {}).get('value', 0) or 0
+            selling = (price_info.get('sellingPrice') or {}).get('value', 0) or 0
+            original = (price_info.get('originalPrice') or {}).get('value', 0) or 0
+            res['price'] = float(discounted if discounted > 0 else selling)
+            res['org_price'] = float(original if original > 0 else res['price'])
+            if res['org_price'] < res['price']:
+                res['org_price'] = res['price']
+
+            for img in product.get('images') or []:
+                img_url = img.get('url', '') if isinstance(img, dict) else str(img)
+                if img_url:
+                    res['images'].append(img_url if img_url.startswith('http') else CDN_BASE_URL + img_url)
+                    break
+
+        social = (payloads.get('social_proof') or {}).get('result')
+        if social is not None:
+            res['views'] = int(social.get('viewCount', 0) or 0)
+            res['favs'] = int(social.get('favoriteCount', 0) or 0)
+            res['basket'] = int(social.get('basketCount', 0) or 0)
+
+        reviews = (payloads.get('reviews') or {}).get('result')
+        if reviews is not None:
+            res['rating'] = float(reviews.get('averageRating', 0) or 0)
+            res['reviews'] = int(reviews.get('totalCount', 0) or 0)
+
+        return res
+
+    async def _extract_dom(self) -> Optional[Dict[str, Any]]:
+        """Ürün sayfasındaki verileri DOM üzerinden çıkarır."""
         product_selectors = self.selectors.get('product', {})
         
         data = await self.page.evaluate('''(selectors) => {
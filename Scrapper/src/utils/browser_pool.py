@@ -0,0 +1,341 @@
+"""
+Tarayıcı Havuzu (Browser Pool) Servisi
+Her bot sürecinin kendi Chromium'unu açması yerine tek bir yerel servis sıcak
+tarayıcıları tutar; botlar CDP üzerinden bağlanır ve kiraladıkları tarayıcıda
+kendi context'lerini açar.
+- Kontrol kanalı: 127.0.0.1 üzerinde satır bazlı JSON (lease / release / stats)
+- Geri dönüşüm: N sayfa sonra veya bellek eşiği aşılınca yeni tarayıcıya geçilir,
+  eskisi son kira bırakılınca kapatılır
+- Kira sahibi süreç ölürse kira otomatik düşer
+- Sıcak context'ler: kira alındığında stealth uygulanmış context'ler arka planda önceden açılır,
+  new_context() hazır olanı verir, stok biterse tek yedek açar. Context'ler servis tarafında değil
+  kiralayan süreçte tutulur: connect_over_cdp ile bağlanan Playwright başka bağlantının açtığı
+  context'i yönetemez (route / init script / sayfa açma), bu yüzden havuz yalnızca tarayıcıyı paylaşır.
+Çalıştırma: python cli.py pool  |  Durum: python cli.py pool-status
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import psutil
+from playwright.async_api import Browser, BrowserContext, Playwright
+from rich.console import Console
+from rich.table import Table
+
+from .stealth import apply_stealth
+
+console = Console()
+
+DEFAULT_POOL_HOST = "127.0.0.1"
+DEFAULT_POOL_PORT = 9400
+# Havuzdaki tarayıcılar bu porttan itibaren sırayla CDP portu alır
+CDP_BASE_PORT = 9500
+
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-infobars',
+    '--window-position=0,0',
+    '--ignore-certificate-errors',
+    '--ignore-ssl-errors',
+]
+
+
+@dataclass
+class PooledBrowser:
+    """Havuzdaki tek bir Chromium süreci"""
+    browser_id: int
+    browser: Browser
+    cdp_port: int
+    launched_at: float = field(default_factory=time.monotonic)
+    leases: Dict[str, int] = field(default_factory=dict)  # lease_id -> kiralayan pid
+    pages_served: int = 0
+    draining: bool = False
+
+    @property
+    def cdp_url(self) -> str:
+        return f"http://{DEFAULT_POOL_HOST}:{self.cdp_port}"
+
+    def memory_mb(self) -> float:
+        """CDP portuyla eşleşen Chromium ana süreci ve alt süreçlerinin toplam RSS'i."""
+        marker = f"--remote-debugging-port={self.cdp_port}"
+        total = 0
+        for proc in psutil.process_iter(['cmdline']):
+            try:
+                if marker in (proc.info['cmdline'] or []):
+                    total += proc.memory_info().rss
+                    total += sum(c.memory_info().rss for c in proc.children(recursive=True))
+                    break
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / 1_048_576
+
+
+class BrowserPoolService:
+    """Sıcak tarayıcıları tutan, kiralayan ve geri dönüştüren yerel servis."""
+
+    def __init__(self, playwright: Playwright, headless: bool = True, max_leases_per_browser: int = 4,
+                 recycle_after_pages: int = 500, recycle_memory_mb: int = 1500,
+                 host: str = DEFAULT_POOL_HOST, port: int = DEFAULT_POOL_PORT, sweep_seconds: float = 15.0):
+        self.playwright = playwright
+        self.headless = headless
+        self.max_leases_per_browser = max(1, max_leases_per_browser)
+        self.recycle_after_pages = recycle_after_pages
+        self.recycle_memory_mb = recycle_memory_mb
+        self.host = host
+        self.port = port
+        self.sweep_seconds = sweep_seconds
+
+        self.browsers: List[PooledBrowser] = []
+        self._ids = itertools.count(1)
+        self._lease_ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self.total_leases = 0
+        self.recycled = 0
+
+    async def _launch(self) -> PooledBrowser:
+        browser_id = next(self._ids)
+        cdp_port = CDP_BASE_PORT + browser_id
+        browser = await self.playwright.chromium.launch(
+            headless=self.headless,
+            args=BROWSER_ARGS + [f'--remote-debugging-port={cdp_port}']
+        )
+        pooled = PooledBrowser(browser_id=browser_id, browser=browser, cdp_port=cdp_port)
+        self.browsers.append(pooled)
+        console.print(f"[green]🌐 Havuz: Tarayıcı #{browser_id} açıldı (CDP {cdp_port})[/green]")
+        return pooled
+
+    async def _retire(self, pooled: PooledBrowser):
+        self.browsers.remove(pooled)
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+        console.print(f"[yellow]♻️ Havuz: Tarayıcı #{pooled.browser_id} kapatıldı ({pooled.pages_served} sayfa)[/yellow]")
+
+    def _needs_recycle(self, pooled: PooledBrowser) -> bool:
+        if self.recycle_after_pages and pooled.pages_served >= self.recycle_after_pages:
+            return True
+        return bool(self.recycle_memory_mb) and pooled.memory_mb() >= self.recycle_memory_mb
+
+    async def lease(self, pid: int) -> Dict[str, Any]:
+        async with self._lock:
+            candidates = [b for b in self.browsers
+                          if not b.draining and len(b.leases) < self.max_leases_per_browser]
+            pooled = min(candidates, key=lambda b: len(b.leases)) if candidates else await self._launch()
+            lease_id = f"{pooled.browser_id}-{next(self._lease_ids)}"
+            pooled.leases[lease_id] = pid
+            self.total_leases += 1
+            return {'ok': True, 'lease_id': lease_id, 'cdp_url': pooled.cdp_url}
+
+    async def release(self, lease_id: str, pages: int = 0) -> Dict[str, Any]:
+        async with self._lock:
+            for pooled in self.browsers:
+                if lease_id in pooled.leases:
+                    del pooled.leases[lease_id]
+                    pooled.pages_served += max(0, pages)
+                    await self._maybe_recycle(pooled)
+                    return {'ok': True}
+        return {'ok': False, 'error': 'kira bulunamadı'}
+
+    async def _maybe_recycle(self, pooled: PooledBrowser):
+        if not pooled.draining and self._needs_recycle(pooled):
+            pooled.draining = True
+            self.recycled += 1
+        if pooled.draining and not pooled.leases:
+            await self._retire(pooled)
+
+    async def sweep(self):
+        """Ölü süreçlerin kiralarını düşürür, boşalan/şişen tarayıcıları geri dönüştürür."""
+        async with self._lock:
+            for pooled in list(self.browsers):
+                for lease_id, pid in list(pooled.leases.items()):
+                    if not psutil.pid_exists(pid):
+                        del pooled.leases[lease_id]
+                await self._maybe_recycle(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        capacity = len([b for b in self.browsers if not b.draining]) * self.max_leases_per_browser
+        active = sum(len(b.leases) for b in self.browsers)
+        return {
+            'ok': True,
+            'browsers': [
+                {
+                    'id': b.browser_id,
+                    'cdp_port': b.cdp_port,
+                    'leases': len(b.leases),
+                    'pages_served': b.pages_served,
+                    'memory_mb': round(b.memory_mb(), 1),
+                    'draining': b.draining,
+                    'uptime_seconds': round(time.monotonic() - b.launched_at),
+                }
+                for b in self.browsers
+            ],
+            'active_leases': active,
+            'capacity': capacity,
+            'utilisation': round(active / capacity, 2) if capacity else 0.0,
+            'total_leases': self.total_leases,
+            'recycled': self.recycled,
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await reader.readline()
+            request = json.loads(line or b'{}')
+            command = request.get('command')
+            if command == 'lease':
+                response = await self.lease(int(request.get('pid', 0)))
+            elif command == 'release':
+                response = await self.release(str(request.get('lease_id')), int(request.get('pages', 0)))
+            elif command == 'stats':
+                response = self.stats()
+            else:
+                response = {'ok': False, 'error': f'bilinmeyen komut: {command}'}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        writer.write((json.dumps(response) + "\n").encode())
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_forever(self, warm_browsers: int = 1):
+        """Servisi başlatır; warm_browsers kadar tarayıcıyı önceden açar."""
+        for _ in range(warm_browsers):
+            await self._launch()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        console.print(f"[bold green]🏊 Tarayıcı havuzu hazır: {self.host}:{self.port}[/bold green]")
+        try:
+            async with server:
+                while True:
+                    await asyncio.sleep(self.sweep_seconds)
+                    await self.sweep()
+        finally:
+            for pooled in list(self.browsers):
+                await self._retire(pooled)
+
+
+# --- İstemci tarafı (bot süreçleri) ---
+
+async def pool_request(payload: Dict[str, Any], host: str = DEFAULT_POOL_HOST, port: int = DEFAULT_POOL_PORT,
+                       timeout: float = 5.0) -> Dict[str, Any]:
+    """Havuz servisine tek bir JSON komutu gönderir ve yanıtı döner."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write((json.dumps(payload) + "\n").encode())
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        return json.loads(line)
+    finally:
+        writer.close()
+
+
+class PoolLease:
+    """
+    Havuzdan kiralanan tarayıcıya CDP ile bağlanır.
+    new_context() stealth scriptleri uygulanmış context döner ve açılan sayfaları sayar;
+    prewarm() ile aynı ayarlardaki context'ler önceden hazırlanırsa kurulum görev yolundan çıkar.
+    release() sayıyı havuza bildirir (geri dönüşüm kararı için).
+    """
+
+    def __init__(self, host: str = DEFAULT_POOL_HOST, port: int = DEFAULT_POOL_PORT):
+        self.host = host
+        self.port = port
+        self.lease_id: Optional[str] = None
+        self.browser: Optional[Browser] = None
+        self.pages = 0
+        # context ayarları (JSON anahtarı) -> hazırlanan / hazırlanmakta olan context'ler
+        self._warm: Dict[str, List[asyncio.Task]] = {}
+
+    async def acquire(self, playwright: Playwright) -> Browser:
+        response = await pool_request({'command': 'lease', 'pid': os.getpid()}, self.host, self.port)
+        if not response.get('ok'):
+            raise RuntimeError(f"Havuzdan tarayıcı alınamadı: {response.get('error')}")
+        self.lease_id = response['lease_id']
+        self.browser = await playwright.chromium.connect_over_cdp(response['cdp_url'])
+        console.print(f"[cyan]🏊 Havuzdan tarayıcı kiralandı (kira {self.lease_id})[/cyan]")
+        return self.browser
+
+    def _count_navigation(self, request):
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            self.pages += 1
+
+    async def _open_context(self, **kwargs) -> BrowserContext:
+        context = await self.browser.new_context(**kwargs)
+        await apply_stealth(context)
+        context.on("request", self._count_navigation)
+        return context
+
+    def prewarm(self, count: int, **kwargs):
+        """Verilen ayarlarla `count` context'i arka planda açmaya başlar (beklemez)."""
+        warm = self._warm.setdefault(json.dumps(kwargs, sort_keys=True), [])
+        for _ in range(max(0, count - len(warm))):
+            warm.append(asyncio.create_task(self._open_context(**kwargs)))
+
+    async def new_context(self, **kwargs) -> BrowserContext:
+        """Aynı ayarlarda sıcak context varsa onu verir (stok biterse bir yedek hazırlar); yoksa yeni açar."""
+        warm = self._warm.get(json.dumps(kwargs, sort_keys=True))
+        if warm:
+            task = warm.pop(0)
+            if not warm:
+                # Bir sonraki istek için tek yedek hazırla (boşta bekleyen context sayısı sınırlı kalsın)
+                warm.append(asyncio.create_task(self._open_context(**kwargs)))
+            try:
+                return await task
+            except Exception as e:
+                console.print(f"[dim]⚠️ Sıcak context hazırlanamadı, yenisi açılıyor: {e}[/dim]")
+        return await self._open_context(**kwargs)
+
+    async def _drop_warm(self):
+        tasks = [task for warm in self._warm.values() for task in warm]
+        self._warm.clear()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                context = await task
+                await context.close()
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def release(self):
+        await self._drop_warm()
+        if self.browser:
+            try:
+                # CDP bağlantısında close() yalnızca bu istemcinin context'lerini kapatıp bağlantıyı keser
+                await self.browser.close()
+            except Exception:
+                pass
+        if self.lease_id:
+            try:
+                await pool_request({'command': 'release', 'lease_id': self.lease_id, 'pages': self.pages},
+                                   self.host, self.port)
+            except Exception as e:
+                console.print(f"[dim]⚠️ Havuz kirası bırakılamadı: {e}[/dim]")
+            self.lease_id = None
+
+
+def print_pool_stats(stats: Dict[str, Any]):
+    """Havuz doluluk tablosunu ekrana basar."""
+    table = Table(title="🏊 Tarayıcı Havuzu", show_header=True, header_style="bold magenta")
+    table.add_column("Tarayıcı", justify="center")
+    table.add_column("CDP", justify="right")
+    table.add_column("Kira", justify="right", style="cyan")
+    table.add_column("Sayfa", justify="right")
+    table.add_column("Bellek (MB)", justify="right")
+    table.add_column("Durum")
+    for b in stats.get('browsers', []):
+        table.add_row(f"#{b['id']}", str(b['cdp_port']), str(b['leases']), str(b['pages_served']),
+                      f"{b['memory_mb']:.0f}", "boşaltılıyor" if b['draining'] else "aktif")
+    console.print(table)
+    console.print(
+        f"[cyan]   Doluluk: {stats.get('active_leases', 0)}/{stats.get('capacity', 0)} "
+        f"(%{stats.get('utilisation', 0) * 100:.0f}) | Toplam kira: {stats.get('total_leases', 0)} | "
+        f"Geri dönüşüm: {stats.get('recycled', 0)}[/cyan]"
+    )
@@ -0,0 +1,57 @@
+"""
+Linker -> Detay İşçileri Arası Bellek İçi Kuyruk
+- Besleyici scraping_queue satırlarını toplu kiralayıp işçilere devreder (işçi başına DB turu yok)
+- Sınırlı boyut sayesinde detay kazıma geride kalırsa besleyici bekler (back-pressure)
+- Akış bittiğinde her işçiye bitiş sinyali gönderilir
+Kuyruktaki her link bu süreç adına zaten kiralanmıştır.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LinkItem:
+    """Kuyruktaki tek bir link (scraping_queue satırı)"""
+    id: int
+    url: str
+
+
+class LinkQueue:
+    """Linker ile detay işçileri arasındaki sınırlı asyncio kuyruğu"""
+
+    _END = object()
+
+    def __init__(self, worker_count: int, maxsize: int = 100):
+        self.worker_count = worker_count
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._closed = False
+
+    async def put(self, item: LinkItem):
+        """Kuyruk doluysa işçiler yer açana kadar bekler."""
+        if self._closed:
+            raise RuntimeError("LinkQueue kapatıldıktan sonra eleman eklenemez")
+        await self._queue.put(item)
+
+    async def get(self) -> Optional[LinkItem]:
+        """Sıradaki linki döner; akış bittiyse None döner."""
+        item = await self._queue.get()
+        if item is self._END:
+            return None
+        return item
+
+    async def close(self):
+        """Akışın bittiğini her işçiye bildirir."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in range(self.worker_count):
+            await self._queue.put(self._END)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def free_slots(self) -> int:
+        """Beklemeden eklenebilecek link sayısı (kiralanıp bellekte bekleyen satır sayısını sınırlamak için)."""
+        return self._queue.maxsize - self._queue.qsize()
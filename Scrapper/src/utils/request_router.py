@@ -0,0 +1,114 @@
+"""
+İstek Yönlendirme (Resource Blocking) Profili
+platform_selectors.yaml -> <platform>.routing ayarına göre gereksiz kaynakları
+(görsel, font, video, tracker, reklam, üçüncü parti domainler) context seviyesinde iptal eder.
+Ürün / social-proof API'leri allow_url_patterns ile her zaman geçirilir.
+"""
+
+import re
+import urllib.parse
+from typing import Any, Dict, Optional
+
+from playwright.async_api import BrowserContext, Route
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# İptal edilen istekler hiç indirilmediği için boyutları bilinemez;
+# kazanç, kaynak tipi başına ortalama boyutla tahmin edilir (YAML'da ezilebilir).
+DEFAULT_ESTIMATED_BYTES = {
+    'image': 60_000,
+    'media': 500_000,
+    'font': 40_000,
+    'stylesheet': 30_000,
+    'script': 80_000,
+    'xhr': 5_000,
+    'fetch': 5_000,
+    'other': 10_000,
+}
+
+
+class RequestRouter:
+    """Bir platformun routing profilini bir veya daha fazla context'e uygular ve sayaç tutar."""
+
+    def __init__(self, profile: Dict[str, Any], platform: str = ""):
+        self.platform = platform
+        self.enabled = profile.get('enabled', True)
+        self.block_resource_types = set(profile.get('block_resource_types', []))
+        self.block_third_party = profile.get('block_third_party', False)
+        self.first_party_domains = [d.lower() for d in profile.get('first_party_domains', [])]
+        self.allow_patterns = [re.compile(p) for p in profile.get('allow_url_patterns', [])]
+        self.block_patterns = [re.compile(p) for p in profile.get('block_url_patterns', [])]
+        self.estimated_bytes = {**DEFAULT_ESTIMATED_BYTES, **profile.get('estimated_bytes', {})}
+
+        self.allowed_requests = 0
+        self.blocked_requests = 0
+        self.blocked_bytes_estimate = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        self.blocked_by_type: Dict[str, int] = {}
+
+    @classmethod
+    def from_selectors(cls, selectors: Dict[str, Any], platform: str = "") -> Optional["RequestRouter"]:
+        """Platform selectors içinde routing profili yoksa veya kapalıysa None döner."""
+        profile = selectors.get('routing')
+        if not profile or not profile.get('enabled', True):
+            return None
+        return cls(profile, platform)
+
+    async def attach(self, context: BrowserContext):
+        """Profili context'teki tüm sayfalara uygular."""
+        if self.enabled:
+            await context.route("**/*", self._handle)
+
+    def _is_first_party(self, url: str) -> bool:
+        if not self.first_party_domains:
+            return True
+        host = (urllib.parse.urlparse(url).hostname or "").lower()
+        return any(host == d or host.endswith("." + d) for d in self.first_party_domains)
+
+    def _block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        if url.startswith("data:"):
+            return None
+        if any(p.search(url) for p in self.allow_patterns):
+            return None
+        if any(p.search(url) for p in self.block_patterns):
+            return "pattern"
+        if resource_type in self.block_resource_types:
+            return "type"
+        if self.block_third_party and not self._is_first_party(url):
+            return "third_party"
+        return None
+
+    async def _handle(self, route: Route):
+        request = route.request
+        resource_type = request.resource_type
+        reason = self._block_reason(request.url, resource_type)
+        if reason is None:
+            self.allowed_requests += 1
+            await route.continue_()
+            return
+
+        self.blocked_requests += 1
+        self.blocked_bytes_estimate += self.estimated_bytes.get(resource_type, self.estimated_bytes.get('other', 0))
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        await route.abort()
+
+    def print_summary(self):
+        """Engellenen istek ve tahmini bant genişliği kazancını ekrana basar."""
+        total = self.allowed_requests + self.blocked_requests
+        if not total:
+            return
+        table = Table(title=f"🛡️ {self.platform.upper()} İstek Filtresi", show_header=True, header_style="bold magenta")
+        table.add_column("Kaynak Tipi")
+        table.add_column("Engellenen", justify="right")
+        for resource_type, count in sorted(self.blocked_by_type.items(), key=lambda x: -x[1]):
+            table.add_row(resource_type, str(count))
+        console.print(table)
+        console.print(
+            f"[cyan]   🚫 Engellenen: {self.blocked_requests}/{total} istek "
+            f"(%{self.blocked_requests * 100 / total:.0f}) | "
+            f"~{self.blocked_bytes_estimate / 1_048_576:.1f} MB tasarruf (tahmini) | "
+            f"Sebep: {self.blocked_by_reason}[/cyan]"
+        )
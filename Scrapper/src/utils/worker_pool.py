@@ -0,0 +1,131 @@
+"""
+Detay Kazıma İşçi Havuzu Yardımcıları
+- Platform ve host bazında eşzamanlılık limiti
+- İşçi başına verim (throughput) sayaçları
+"""
+
+import asyncio
+import time
+import urllib.parse
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+class ConcurrencyLimiter:
+    """
+    Aynı anda açık olan sayfa isteklerini platform ve host bazında sınırlar.
+    Limit 0 veya negatifse ilgili seviye sınırsız kabul edilir.
+    """
+
+    def __init__(self, per_platform: int = 0, per_host: int = 0):
+        self.per_platform = per_platform
+        self.per_host = per_host
+        self._platform_sems: Dict[str, asyncio.Semaphore] = {}
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_sem(self, store: Dict[str, asyncio.Semaphore], key: str, limit: int) -> Optional[asyncio.Semaphore]:
+        if limit <= 0:
+            return None
+        if key not in store:
+            store[key] = asyncio.Semaphore(limit)
+        return store[key]
+
+    @asynccontextmanager
+    async def slot(self, platform: str, url: str):
+        """Platform ve host slotu alınana kadar bekler."""
+        host = urllib.parse.urlparse(url).netloc or url
+        platform_sem = self._get_sem(self._platform_sems, platform, self.per_platform)
+        host_sem = self._get_sem(self._host_sems, host, self.per_host)
+
+        # Kilitlenmeyi önlemek için sıra hep platform -> host
+        if platform_sem:
+            await platform_sem.acquire()
+        try:
+            if host_sem:
+                await host_sem.acquire()
+            try:
+                yield
+            finally:
+                if host_sem:
+                    host_sem.release()
+        finally:
+            if platform_sem:
+                platform_sem.release()
+
+
+@dataclass
+class WorkerStats:
+    """Tek bir detay işçisinin verim sayaçları"""
+    worker_id: int
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    paths: Dict[str, int] = field(default_factory=dict)  # extraction_path -> adet (api / api+dom / dom)
+
+    def record(self, success: bool, elapsed: float, path: Optional[str] = None):
+        self.processed += 1
+        self.busy_seconds += elapsed
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if path:
+            self.paths[path] = self.paths.get(path, 0) + 1
+
+    @property
+    def products_per_hour(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.succeeded * 3600 / elapsed
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.busy_seconds / self.processed if self.processed else 0.0
+
+
+def print_worker_stats(stats: List[WorkerStats]):
+    """İşçi bazlı verim tablosunu ekrana basar."""
+    if not stats:
+        return
+
+    table = Table(title="⚙️ İşçi Verimi", show_header=True, header_style="bold magenta")
+    table.add_column("İşçi", justify="center")
+    table.add_column("İşlenen", justify="right")
+    table.add_column("✅", justify="right", style="green")
+    table.add_column("❌", justify="right", style="red")
+    table.add_column("Ort. sn/ürün", justify="right")
+    table.add_column("Ürün/saat", justify="right", style="cyan")
+    table.add_column("Yol (api/api+dom/dom)", justify="center")
+
+    for s in stats:
+        table.add_row(
+            f"#{s.worker_id}",
+            str(s.processed),
+            str(s.succeeded),
+            str(s.failed),
+            f"{s.avg_seconds:.1f}",
+            f"{s.products_per_hour:.0f}",
+            _format_paths(s.paths),
+        )
+
+    total_rate = sum(s.products_per_hour for s in stats)
+    total_paths: Dict[str, int] = {}
+    for s in stats:
+        for path, count in s.paths.items():
+            total_paths[path] = total_paths.get(path, 0) + count
+    table.add_row("Σ", str(sum(s.processed for s in stats)), str(sum(s.succeeded for s in stats)),
+                  str(sum(s.failed for s in stats)), "-", f"{total_rate:.0f}", _format_paths(total_paths))
+    console.print(table)
+
+
+def _format_paths(paths: Dict[str, int]) -> str:
+    return "/".join(str(paths.get(p, 0)) for p in ("api", "api+dom", "dom"))
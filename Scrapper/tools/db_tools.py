@@ -3,13 +3,18 @@ Database Tools - Unified module for all DB-related operations
 Updated for Product + DailyMetric model (Actual Schema)
 """
 
+import json
+import os
+import shutil
 from sqlalchemy import text
 from rich.console import Console
 from rich.table import Table
-from datetime import datetime
+from datetime import datetime, timedelta
 import pandas as pd
 
 from src.database import DatabaseManager
+from src.database.database_manager import engagement_score
+from src.database.partitions import convert_daily_metrics, ensure_metric_partitions
 from src.config import load_config
 
 console = Console()
@@ -55,10 +60,7 @@ def analyze():
         top = session.execute(text("""
             SELECT p.name, dm.discounted_price, dm.favorite_count, dm.avg_rating
             FROM products p
-            JOIN daily_metrics dm ON dm.product_id = p.id
-            WHERE dm.id IN (
-                SELECT MAX(id) FROM daily_metrics GROUP BY product_id
-            )
+            JOIN latest_metrics dm ON dm.product_id = p.id
             ORDER BY dm.favorite_count DESC NULLS LAST
             LIMIT 5
         """)).fetchall()
@@ -133,12 +135,9 @@ def export(filename: str = None):
             SELECT p.url, p.brand, p.name, 
                    dm.discounted_price, dm.price, dm.discount_rate,
                    dm.avg_rating, dm.rating_count, dm.favorite_count,
-                   dm.cart_count, dm.clicks_24h, dm."date"
+                   dm.cart_count, dm.clicks_24h, dm.recorded_at
             FROM products p
-            JOIN daily_metrics dm ON dm.product_id = p.id
-            WHERE dm.id IN (
-                SELECT MAX(id) FROM daily_metrics GROUP BY product_id
-            )
+            JOIN latest_metrics dm ON dm.product_id = p.id
             ORDER BY dm.favorite_count DESC NULLS LAST
         """)).fetchall()
         
@@ -200,9 +199,8 @@ def stats():
         products = session.execute(text("SELECT COUNT(*) FROM products")).scalar()
         metrics = session.execute(text("SELECT COUNT(*) FROM daily_metrics")).scalar()
         avg_price = session.execute(text("""
-            SELECT AVG(discounted_price) FROM daily_metrics 
-            WHERE id IN (SELECT MAX(id) FROM daily_metrics GROUP BY product_id)
-            AND discounted_price > 0
+            SELECT AVG(discounted_price) FROM latest_metrics
+            WHERE discounted_price > 0
         """)).scalar()
         
         console.print(f"\n📊 Ürün: {products} | Metrik: {metrics} | Ort. Fiyat: {avg_price or 0:.0f} TL\n")
@@ -255,3 +253,169 @@ def history(url: str):
         console.print(f"[red]❌ Hata: {e}[/red]")
     finally:
         db.close()
+
+
+def partition_metrics(months_ahead: int = 2):
+    """daily_metrics'i aylık partition'lı tabloya taşır (tek seferlik, sadece PostgreSQL)"""
+    db = get_db_manager()
+    console.print("\n[bold cyan]🧱 daily_metrics partition'lara taşınıyor...[/bold cyan]\n")
+    try:
+        copied, legacy = convert_daily_metrics(db.engine, months_ahead=months_ahead)
+        if legacy:
+            console.print(f"[bold green]✅ {copied:,} satır taşındı. Eski tablo: {legacy} (kontrol sonrası silinebilir)[/bold green]")
+        ensure_metric_partitions(db.engine, months_ahead=months_ahead)
+    except Exception as e:
+        console.print(f"[red]❌ Hata: {e}[/red]")
+    finally:
+        db.close()
+
+
+def backfill_latest_metrics():
+    """latest_metrics tablosunu daily_metrics geçmişinden yeniden doldurur"""
+    db = get_db_manager()
+    db.create_tables()
+    session = db.get_session()
+    columns = "product_id, recorded_at, price, discounted_price, discount_rate, avg_rating, " \
+              "rating_count, favorite_count, cart_count, clicks_24h"
+    try:
+        session.execute(text("DELETE FROM latest_metrics"))
+        if db.engine.dialect.name == "postgresql":
+            # Ürün başına en son satır: (product_id, recorded_at DESC) index'i ile DISTINCT ON
+            session.execute(text(f"""
+                INSERT INTO latest_metrics ({columns})
+                SELECT DISTINCT ON (product_id) {columns}
+                FROM daily_metrics
+                ORDER BY product_id, recorded_at DESC, id DESC
+            """))
+        else:
+            session.execute(text(f"""
+                INSERT INTO latest_metrics ({columns})
+                SELECT {columns} FROM daily_metrics
+                WHERE id IN (SELECT MAX(id) FROM daily_metrics GROUP BY product_id)
+            """))
+        session.commit()
+        count = session.execute(text("SELECT COUNT(*) FROM latest_metrics")).scalar()
+        console.print(f"[bold green]✅ latest_metrics dolduruldu: {count:,} ürün[/bold green]")
+    except Exception as e:
+        session.rollback()
+        console.print(f"[red]❌ Hata: {e}[/red]")
+    finally:
+        db.close()
+
+
+def backfill_product_summary(chunk_size: int = 5_000):
+    """products.last_price / last_discount_rate / last_engagement_score kolonlarını latest_metrics'ten doldurur"""
+    db = get_db_manager()
+    db.create_tables()
+    session = db.get_session()
+    update_stmt = text("""
+        UPDATE products
+        SET last_price = :last_price, last_discount_rate = :last_discount_rate,
+            last_engagement_score = :last_engagement_score
+        WHERE id = :product_id
+    """)
+    try:
+        if not session.execute(text("SELECT 1 FROM latest_metrics LIMIT 1")).first():
+            console.print("[yellow]⚠️ latest_metrics boş. Önce 'python cli.py latest' çalıştırın.[/yellow]")
+            return
+        last_id = 0
+        total = 0
+        # product_id üzerinden sayfalama: her parça ayrı transaction, tablo kilitlenmez
+        while True:
+            rows = session.execute(text("""
+                SELECT product_id, price, discount_rate, cart_count, favorite_count, clicks_24h
+                FROM latest_metrics
+                WHERE product_id > :last_id
+                ORDER BY product_id
+                LIMIT :limit
+            """), {"last_id": last_id, "limit": chunk_size}).fetchall()
+            if not rows:
+                break
+            session.execute(update_stmt, [
+                {
+                    "product_id": r.product_id,
+                    "last_price": r.price,
+                    "last_discount_rate": r.discount_rate,
+                    "last_engagement_score": engagement_score({
+                        "cart_count": r.cart_count, "favorite_count": r.favorite_count, "view_count": r.clicks_24h,
+                    }),
+                }
+                for r in rows
+            ])
+            session.commit()
+            total += len(rows)
+            last_id = rows[-1].product_id
+            console.print(f"[dim]   - {total:,} ürün güncellendi[/dim]")
+        console.print(f"[bold green]✅ Ürün özet kolonları dolduruldu: {total:,} ürün[/bold green]")
+    except Exception as e:
+        session.rollback()
+        console.print(f"[red]❌ Hata: {e}[/red]")
+    finally:
+        db.close()
+
+
+def export_parquet(output_dir: str = None, since: str = None, chunk_size: int = 200_000):
+    """
+    daily_metrics'i tarih ve kategoriye göre bölünmüş Parquet dosyalarına aktarır (date=YYYY-MM-DD/category=...).
+    Artımlı çalışır: since verilmezse son aktarılan günden sonrası, bugün hariç (tamamlanmış günler) aktarılır.
+    Aynı gün tekrar aktarılırsa o günün klasörü yeniden yazılır.
+    """
+    output_dir = output_dir or "exports/daily_metrics"
+    os.makedirs(output_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, "_export_state.json")
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+    db = get_db_manager()
+    session = db.get_session()
+    try:
+        if since:
+            start = datetime.strptime(since, "%Y-%m-%d").date()
+        elif state.get("last_date"):
+            start = datetime.strptime(state["last_date"], "%Y-%m-%d").date() + timedelta(days=1)
+        else:
+            first = session.execute(text("SELECT MIN(recorded_at) FROM daily_metrics")).scalar()
+            if not first:
+                console.print("[yellow]⚠️ Aktarılacak metrik yok.[/yellow]")
+                return
+            start = pd.Timestamp(first).date()
+        end = datetime.utcnow().date()  # Bugün henüz tamamlanmadı
+
+        console.print(f"\n[cyan]📦 Parquet aktarımı: {start} → {end - timedelta(days=1)} ({output_dir})[/cyan]\n")
+        day = start
+        total = 0
+        while day < end:
+            day_dir = os.path.join(output_dir, f"date={day.isoformat()}")
+            if os.path.exists(day_dir):
+                shutil.rmtree(day_dir)
+            rows = 0
+            # Gün aralığı sorgusu partition pruning ile tek partition'a iner
+            chunks = pd.read_sql_query(text("""
+                SELECT dm.product_id, dm.recorded_at, dm.price, dm.discounted_price, dm.discount_rate,
+                       dm.avg_rating, dm.rating_count, dm.favorite_count, dm.cart_count, dm.clicks_24h,
+                       COALESCE(NULLIF(p.category, ''), 'unknown') AS category
+                FROM daily_metrics dm
+                JOIN products p ON p.id = dm.product_id
+                WHERE dm.recorded_at >= :start AND dm.recorded_at < :end
+            """), db.engine, params={"start": day, "end": day + timedelta(days=1)}, chunksize=chunk_size)
+            for chunk in chunks:
+                if chunk.empty:
+                    continue
+                chunk["date"] = day.isoformat()
+                chunk.to_parquet(output_dir, engine="pyarrow", partition_cols=["date", "category"], index=False)
+                rows += len(chunk)
+            if rows:
+                console.print(f"[dim]   - {day}: {rows:,} satır[/dim]")
+            total += rows
+            state["last_date"] = day.isoformat()
+            with open(state_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            day += timedelta(days=1)
+
+        console.print(f"[bold green]✅ {total:,} metrik Parquet'e aktarıldı.[/bold green]")
+    except Exception as e:
+        console.print(f"[red]❌ Hata: {e}[/red]")
+    finally:
+        db.close()
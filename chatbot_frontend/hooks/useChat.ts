@@ -161,6 +161,22 @@ export const useChat = (isAuthenticatedProp?: boolean, isGuestModeProp?: boolean
             setIsLoading(false);
         });
 
+        // Akan mesajdaki yer tutucuyu düzelt (görsel hazır olunca [[VISUAL_CARD_x]] vb.)
+        socket.on('ai_message_patch', (data: { conversation_id: number | string; placeholder: string; content: string }) => {
+            if (cancellationRef.current) return;
+
+            setMessages(prev => {
+                const lastMsg = prev[prev.length - 1];
+                if (!lastMsg || lastMsg.id !== 'streaming-ai' || !lastMsg.content.includes(data.placeholder)) {
+                    return prev;
+                }
+                return [
+                    ...prev.slice(0, -1),
+                    { ...lastMsg, content: lastMsg.content.split(data.placeholder).join(data.content) }
+                ];
+            });
+        });
+
         // AI mesajını dinle (Final mesaj)
         socket.on('ai_message', (data: {
             id: number | string;
@@ -61,6 +61,42 @@ def migrate_db():
              connection.commit()
              print("'search_params' column added.")
 
+        # Check scraping_queue for lease columns (claim_queue_batch)
+        queue_columns = [c['name'] for c in inspector.get_columns('scraping_queue')]
+        if 'lease_owner' not in queue_columns:
+            print("Adding 'lease_owner' column to scraping_queue...")
+            connection.execute(text("ALTER TABLE scraping_queue ADD COLUMN lease_owner VARCHAR(100)"))
+            connection.commit()
+            print("'lease_owner' column added.")
+        if 'lease_expires_at' not in queue_columns:
+            print("Adding 'lease_expires_at' column to scraping_queue...")
+            connection.execute(text("ALTER TABLE scraping_queue ADD COLUMN lease_expires_at TIMESTAMP"))
+            connection.commit()
+            print("'lease_expires_at' column added.")
+
+        # Composite index for claim_queue_batch (task_id, status, discovered_at)
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_scraping_queue_task_status_discovered "
+            "ON scraping_queue (task_id, status, discovered_at)"
+        ))
+        connection.commit()
+        print("'ix_scraping_queue_task_status_discovered' index ensured.")
+
+        # Son metrik özeti kolonları (backend Product modeliyle aynı) + "şu an en iyi ürünler" index'i
+        product_columns = [c['name'] for c in inspector.get_columns('products')]
+        for column in ('last_price', 'last_discount_rate', 'last_engagement_score'):
+            if column not in product_columns:
+                print(f"Adding '{column}' column to products...")
+                connection.execute(text(f"ALTER TABLE products ADD COLUMN {column} DOUBLE PRECISION"))
+                connection.commit()
+                print(f"'{column}' column added.")
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_products_last_engagement_score "
+            "ON products (last_engagement_score DESC NULLS LAST)"
+        ))
+        connection.commit()
+        print("'ix_products_last_engagement_score' index ensured.")
+
 if __name__ == "__main__":
     try:
         migrate_db()